@@ -0,0 +1,115 @@
+# Benchmark de memoria del corpus de frases: almacén compacto vs. un diccionario por frase
+# 'dicts', 'compacto' y 'compilado' cargan el mismo archivo de texto y arman lo mismo (frases e
+# id de película por frase); la primera fila es el corpus real del repositorio y las demás son
+# sintéticas. Las filas 'juego' miden TriviaGame completo (además arma el índice de títulos y,
+# desde el texto, los vecinos de cada película), para separar ese costo del de las frases.
+# Las filas compiladas abren con mmap el corpus compilado desde ese mismo texto: sus páginas no
+# cuentan como memoria propia del proceso (se comparten por el page cache) y tracemalloc no las registra
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_frases [cantidades de frases...]
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from apps.benchmark_preguntas import write_corpus
+from modules.phrase_store import PhraseStore, compile_corpus, compiled_path_for, parse_lines
+from modules.trivia_game import TriviaGame
+
+REAL_CORPUS = 'data/frases_de_peliculas.txt'
+DEFAULT_SIZES = [5_000, 50_000, 200_000, 1_000_000]
+
+def load_legacy(path: str):
+    """Reproduce la carga anterior: lista de diccionarios e índice armado desde ella"""
+    with open(path, 'r', encoding='utf-8') as file:
+        phrases_data = [{'phrase': phrase, 'movie': movie} for phrase, movie in parse_lines(file)]
+    movie_names = sorted({item['movie'].lower() for item in phrases_data})
+    movie_ids = {name: movie_id for movie_id, name in enumerate(movie_names)}
+    phrase_movie_ids = [movie_ids[item['movie'].lower()] for item in phrases_data]
+    return phrases_data, movie_names, phrase_movie_ids
+
+def load_compact(path: str):
+    """Almacén compacto parseando el texto, con el mismo índice de películas"""
+    store = PhraseStore.from_file(path)
+    store.folded_movies()
+    return store
+
+def load_compiled(path: str):
+    """Almacén abierto con mmap desde el corpus compilado del mismo texto (trae el índice)"""
+    return PhraseStore.from_compiled(compiled_path_for(path))
+
+# (formato, función de carga, si necesita el corpus compilado al lado del texto)
+LOADERS = (
+    ('dicts', load_legacy, False),
+    ('compacto', load_compact, False),
+    ('juego (texto)', TriviaGame, False),
+    ('compilado', load_compiled, True),
+    ('juego (compilado)', TriviaGame, True),
+)
+
+def measure(loader, path: str):
+    """Carga el corpus con tracemalloc; retorna (segundos, memoria retenida, pico) en bytes"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = loader(path)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return elapsed, current, peak
+
+def count_phrases(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as file:
+        return sum(1 for _ in parse_lines(file))
+
+def main(sizes):
+    print(f"{'frases':>10} | {'formato':>17} | {'carga (s)':>9} | {'retenida (MB)':>13} | "
+          f"{'pico (MB)':>9} | {'bytes/frase':>11}")
+    results = []  # (frases, memoria retenida por formato)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_path = os.path.join(tmp_dir, 'corpus.txt')
+        # Una carga previa de cada formato, para no medir importaciones y costos de una sola vez
+        write_corpus(corpus_path, 100)
+        compile_corpus(corpus_path)
+        for _, loader, _ in LOADERS:
+            loader(corpus_path)
+        
+        inputs = [None] + sizes if os.path.exists(REAL_CORPUS) else sizes
+        for size in inputs:
+            if size is None:
+                shutil.copyfile(REAL_CORPUS, corpus_path)
+                size = count_phrases(corpus_path)
+            else:
+                write_corpus(corpus_path, size)
+            if os.path.exists(compiled_path_for(corpus_path)):
+                os.remove(compiled_path_for(corpus_path))
+
+            retained = {}
+            for name, loader, compiled in LOADERS:
+                if compiled and not os.path.exists(compiled_path_for(corpus_path)):
+                    compile_corpus(corpus_path)
+                elapsed, current, peak = measure(loader, corpus_path)
+                retained[name] = current
+                print(f"{size:>10} | {name:>17} | {elapsed:>9.2f} | {current / 2**20:>13.1f} | "
+                      f"{peak / 2**20:>9.1f} | {current / size:>11.0f}")
+            results.append((size, retained))
+
+    # Los formatos con costos fijos (tablas, índices, vecinos) sólo convienen desde cierto tamaño:
+    # el menor tamaño medido desde el cual retienen menos que los diccionarios en todos los siguientes
+    results.sort(key=lambda result: result[0])
+    for name, _, _ in LOADERS[1:]:
+        crossover = None
+        for size, retained in reversed(results):
+            if retained[name] >= retained['dicts']:
+                break
+            crossover = size
+        if crossover is None:
+            print(f"{name}: retiene más que los diccionarios con {results[-1][0]} frases (el mayor tamaño medido)")
+        else:
+            print(f"{name}: retiene menos que los diccionarios desde {crossover} frases (entre los tamaños medidos)")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,51 @@
+# Benchmark de generate_all_charts: preparación de datos y render secuencial vs. procesos en paralelo
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_graficas [cantidades de partidas...]
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from modules.charts import GameCharts
+from modules.history_stats import HistoryStats, START_TIME_FORMAT
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+
+def make_games(num_games: int):
+    """Genera un historial sintético con el formato de data/game_history.json"""
+    start = datetime(2025, 8, 11, 9, 0)
+    games = []
+    for i in range(num_games):
+        total = random.randint(3, 20)
+        games.append({
+            'username': f"jugador{random.randint(1, 50)}",
+            'score': f"{random.randint(0, total)}/{total}",
+            'start_time': (start + timedelta(minutes=7 * i)).strftime(START_TIME_FORMAT),
+            'num_phrases': total
+        })
+    return games
+
+def measure(func) -> float:
+    """Retorna los segundos que tarda en ejecutarse func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main(sizes):
+    logging.getLogger('matplotlib').setLevel(logging.ERROR)
+    print(f"CPUs disponibles: {os.cpu_count()}")
+    print(f"{'partidas':>9} | {'preparación (s)':>15} | {'secuencial (s)':>14} | {'paralelo (s)':>12} | {'speedup':>7}")
+    for size in sizes:
+        games = make_games(size)
+        stats = HistoryStats.from_games(games)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            charts = GameCharts(tmp_dir)
+            prepare = measure(lambda: charts._prepare_data_for_charts(games))
+            sequential = measure(lambda: charts.generate_all_charts(games, stats))
+            parallel = measure(lambda: charts.generate_all_charts(games, stats, parallel=True))
+        print(f"{size:>9} | {prepare:>15.3f} | {sequential:>14.2f} | {parallel:>12.2f} | {sequential / parallel:>6.2f}x")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
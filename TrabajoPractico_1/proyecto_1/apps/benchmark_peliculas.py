@@ -0,0 +1,59 @@
+# Benchmark de la búsqueda de películas: armado del índice y microsegundos por búsqueda
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_peliculas [cantidades de títulos...]
+import random
+import sys
+import time
+
+from apps.benchmark_preguntas import measure
+from modules.movie_index import MovieIndex
+
+DEFAULT_SIZES = [10_000, 100_000, 300_000]
+COMMON_WORDS = ['el', 'la', 'de', 'los', 'amor', 'noche', 'the', 'of', 'love', 'night']
+
+def make_titles(num_titles: int) -> list:
+    """Títulos sintéticos únicos, en minúsculas y ordenados como movies_list"""
+    rng = random.Random(42)
+    letters = 'abcdefghijklmnopqrstuvwxyzáéíóñ'
+    words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(num_titles // 10 + 50)]
+    titles = set()
+    while len(titles) < num_titles:
+        title = [rng.choice(COMMON_WORDS) if rng.random() < 0.3 else rng.choice(words)
+                 for _ in range(rng.randint(1, 5))]
+        titles.add(' '.join(title))
+    return sorted(titles)
+
+def legacy_get_movie_by_name(titles: list, movie_name: str):
+    """Reproduce la búsqueda anterior: recorrido lineal comparando en minúsculas"""
+    for movie in titles:
+        if movie.lower() == movie_name.lower():
+            return movie
+    return None
+
+def main(sizes):
+    print(f"{'títulos':>9} | {'índice (s)':>10} | {'trigramas (s)':>13} | {'búsqueda':>22} | {'µs/búsqueda':>11}")
+    for size in sizes:
+        titles = make_titles(size)
+        start = time.perf_counter()
+        index = MovieIndex(titles)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        index.trigrams()
+        trigram_time = time.perf_counter() - start
+
+        sample = titles[len(titles) // 2]
+        rare = sample.split()[-1][1:5]
+        cases = [
+            ('exacta', lambda: index.find(sample.upper())),
+            ('exacta (anterior)', lambda: legacy_get_movie_by_name(titles, sample.upper())),
+            ('prefijo', lambda: index.search(sample[:2])),
+            ('subcadena común', lambda: index.search('amor')),
+            ('subcadena rara', lambda: index.search(rare)),
+            ('dos palabras comunes', lambda: index.search('noche de')),
+            ('página 50', lambda: index.search('the', offset=49 * 60)),
+        ]
+        for name, func in cases:
+            micros = 1e6 / measure(func)
+            print(f"{size:>9} | {build_time:>10.2f} | {trigram_time:>13.2f} | {name:>22} | {micros:>11.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
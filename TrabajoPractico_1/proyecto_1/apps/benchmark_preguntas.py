@@ -0,0 +1,59 @@
+# Microbenchmark de generación de preguntas (preguntas por segundo)
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_preguntas [tamaños...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from modules.trivia_game import TriviaGame
+
+DEFAULT_SIZES = [50, 50_000, 5_000_000]
+TIME_BUDGET = 2.0  # segundos de medición por caso
+
+def write_corpus(path: str, num_phrases: int):
+    """Escribe un corpus sintético con el formato 'frase;película'"""
+    num_movies = max(3, num_phrases // 5)
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(num_phrases):
+            file.write(f"Frase sintética número {i};Película {i % num_movies}\n")
+
+def legacy_generate_question(game: TriviaGame):
+    """Reproduce el algoritmo anterior: copia filtrada de movies_list por pregunta"""
+    correct_answer = random.choice(game.phrases_data)
+    correct_movie = correct_answer['movie'].lower()
+    options = [correct_movie]
+    available_movies = [m for m in game.movies_list if m != correct_movie]
+    options.extend(random.sample(available_movies, 2))
+    random.shuffle(options)
+    return options.index(correct_movie)
+
+def measure(func) -> float:
+    """Ejecuta func durante TIME_BUDGET segundos y retorna llamadas por segundo"""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < TIME_BUDGET:
+        for _ in range(50):
+            func()
+        calls += 50
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def main(sizes):
+    print(f"{'frases':>10} | {'carga (s)':>9} | {'índice (q/s)':>13} | {'anterior (q/s)':>14}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corpus_path = os.path.join(tmp_dir, 'corpus.txt')
+            write_corpus(corpus_path, size)
+
+            start = time.perf_counter()
+            game = TriviaGame(corpus_path)
+            load_time = time.perf_counter() - start
+
+            indexed = measure(game.generate_question)
+            legacy = measure(lambda: legacy_generate_question(game))
+            print(f"{size:>10} | {load_time:>9.2f} | {indexed:>13,.0f} | {legacy:>14,.0f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
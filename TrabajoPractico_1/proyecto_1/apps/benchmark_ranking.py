@@ -0,0 +1,53 @@
+# Benchmark del ranking de jugadores: microsegundos por partida nueva y por consulta del top-K
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_ranking [cantidades de jugadores...]
+import bisect
+import random
+import sys
+import time
+
+from apps.benchmark_preguntas import measure
+from modules.player_index import LEADERBOARD_SIZE, PlayerIndex
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+def make_rows(num_players: int):
+    """Una partida por jugador: (número, jugador, aciertos, total, fecha)"""
+    rng = random.Random(42)
+    for number in range(1, num_players + 1):
+        yield number, f'jugador{number}', rng.randint(0, 10), 10, None
+
+def legacy_update(ranking: list, old_key: tuple, new_key: tuple):
+    """Reproduce la actualización anterior: lista ordenada con del + insort (O(N) por corrimientos)"""
+    del ranking[bisect.bisect_left(ranking, old_key)]
+    bisect.insort(ranking, new_key)
+
+def main(sizes):
+    print(f"{'jugadores':>10} | {'armado (s)':>10} | {'µs/partida':>10} | {'µs/partida (anterior)':>21} | "
+          f"{'µs/top-' + str(LEADERBOARD_SIZE):>10}")
+    for size in sizes:
+        start = time.perf_counter()
+        index = PlayerIndex.from_values(make_rows(size))
+        build_time = time.perf_counter() - start
+
+        rng = random.Random(7)
+        number = size
+        def add_game():
+            nonlocal number
+            number += 1
+            index.add_values(number, f'jugador{rng.randint(1, size)}', rng.randint(0, 10), 10, None)
+
+        legacy_keys = {username: profile.rank_key for username, profile in index.profiles.items()}
+        legacy = sorted(legacy_keys.values())
+        def legacy_add_game():
+            username = f'jugador{rng.randint(1, size)}'
+            old_key = legacy_keys[username]
+            new_key = legacy_keys[username] = (-rng.uniform(0, 100), old_key[1] - 1, username)
+            legacy_update(legacy, old_key, new_key)
+
+        add_micros = 1e6 / measure(add_game)
+        legacy_micros = 1e6 / measure(legacy_add_game)
+        top_micros = 1e6 / measure(lambda: index.leaderboard(LEADERBOARD_SIZE))
+        print(f"{size:>10} | {build_time:>10.2f} | {add_micros:>10.1f} | {legacy_micros:>21.1f} | {top_micros:>10.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
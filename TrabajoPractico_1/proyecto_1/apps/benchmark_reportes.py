@@ -0,0 +1,51 @@
+# Benchmark del reporte PDF completo: páginas por segundo y memoria máxima según el tamaño del historial
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_reportes [cantidades de partidas...]
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from apps.benchmark_graficas import make_games
+from modules.history_stats import HistoryStats
+from modules.pdf_generator import GameReportPDF
+from modules.trivia_game import GameHistory
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+def make_history(tmp_dir: str, num_games: int) -> GameHistory:
+    """Historial en memoria con partidas sintéticas (no se escribe a disco)"""
+    history = GameHistory(os.path.join(tmp_dir, 'game_history.json'))
+    history.history = make_games(num_games)
+    history.stats = HistoryStats.from_games(history.history)
+    return history
+
+def render(history: GameHistory, traced: bool = False):
+    """Genera el reporte completo en un directorio nuevo; retorna (segundos, páginas, pico de memoria)"""
+    with tempfile.TemporaryDirectory() as reports_dir:
+        generator = GameReportPDF(reports_dir)
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        path = generator.generate_full_report(history.iter_games(), history.stats)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if traced else 0
+        if traced:
+            tracemalloc.stop()
+        with open(path, 'rb') as file:
+            pages = len(re.findall(rb'/Type\s*/Page\b(?!s)', file.read()))
+    return elapsed, pages, peak
+
+def main(sizes):
+    print(f"{'partidas':>9} | {'páginas':>7} | {'segundos':>8} | {'páginas/s':>9} | {'pico (MB)':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history = make_history(tmp_dir, size)
+            elapsed, pages, _ = render(history)
+            # La memoria se mide en una segunda pasada: tracemalloc hace más lento el render
+            _, _, peak = render(history, traced=True)
+        print(f"{size:>9} | {pages:>7} | {elapsed:>8.2f} | {pages / elapsed:>9.0f} | {peak / 2**20:>9.1f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
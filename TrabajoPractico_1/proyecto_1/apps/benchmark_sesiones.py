@@ -0,0 +1,67 @@
+# Benchmark de /responder (peticiones por segundo) con cada backend de sesiones
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_sesiones [backends...]
+#
+# Usa una aplicación Flask mínima con la misma sesión de partida que el servidor: importar
+# server cargaría el historial, arrancaría el pool de gráficas y escribiría en static/.
+import os
+import sys
+import tempfile
+import time
+
+from flask import Flask, session
+
+from modules.config import app as server_app, configure_session_backend
+from modules.trivia_game import NUM_OPTIONS, GameSession
+
+DEFAULT_BACKENDS = ['filesystem', 'memory', 'sqlite']
+TIME_BUDGET = 3.0  # segundos de medición por backend
+NUM_PHRASES = 100
+
+def make_app(backend: str, tmp_dir: str) -> Flask:
+    """Aplicación con /iniciar_juego y /responder que sólo leen y escriben la sesión"""
+    app = Flask(__name__)
+    for key in ('SECRET_KEY', 'PERMANENT_SESSION_LIFETIME', 'SESSION_TYPE', 'SESSION_FILE_THRESHOLD'):
+        app.config[key] = server_app.config[key]
+    app.config['SESSION_FILE_DIR'] = os.path.join(tmp_dir, 'sessions')
+    app.config['SESSION_SQLITE_PATH'] = os.path.join(tmp_dir, 'sessions.sqlite3')
+    configure_session_backend(app, backend)
+
+    @app.route('/iniciar_juego', methods=['POST'])
+    def iniciar_juego():
+        game_session = GameSession('benchmark', NUM_PHRASES)
+        game_session.set_questions(list(range(NUM_PHRASES)), list(range(NUM_PHRASES * NUM_OPTIONS)), 'benchmark')
+        session['game_session'] = game_session.to_session_dict()
+        return ''
+
+    @app.route('/responder', methods=['POST'])
+    def responder():
+        game_session = GameSession.from_session_dict(session.get('game_session'))
+        game_session.add_answer(game_session.current_question % 2 == 0)
+        if game_session.is_finished():
+            session.pop('game_session', None)
+        else:
+            session['game_session'] = game_session.to_session_dict()
+        return ''
+
+    return app
+
+def measure(backend: str, tmp_dir: str) -> float:
+    """Mide cuántas respuestas por segundo procesa /responder con el backend dado"""
+    client = make_app(backend, tmp_dir).test_client()
+    answered = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIME_BUDGET:
+        if answered % NUM_PHRASES == 0:
+            client.post('/iniciar_juego')
+        client.post('/responder')
+        answered += 1
+    return answered / (time.perf_counter() - start)
+
+def main(backends):
+    print(f"{'backend':>10} | {'respuestas/s':>12}")
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            print(f"{backend:>10} | {measure(backend, tmp_dir):>12,.0f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_BACKENDS)
@@ -0,0 +1,86 @@
+# Benchmark del índice de similitud: tiempo de armado y costo por pregunta según la dificultad
+# Uso (desde la raíz del proyecto): python -m apps.benchmark_similitud [cantidades de frases...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from apps.benchmark_preguntas import measure
+from modules.phrase_store import PhraseStore
+from modules.similarity_index import NEIGHBORS_PER_MOVIE, build_neighbors
+from modules.trivia_game import DIFFICULTY_SIMILAR_OPTIONS, TriviaGame
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+PHRASES_PER_MOVIE = 10
+MOVIES_PER_TOPIC = 20
+
+def write_topic_corpus(path: str, num_phrases: int) -> int:
+    """Escribe un corpus sintético donde las películas de un mismo tema comparten vocabulario
+
+    Returns:
+        int: cantidad de temas (la película i pertenece al tema i % temas)
+    """
+    num_movies = max(3, num_phrases // PHRASES_PER_MOVIE)
+    num_topics = max(1, num_movies // MOVIES_PER_TOPIC)
+    rng = random.Random(42)
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(num_phrases):
+            movie = i % num_movies
+            topic = movie % num_topics
+            words = [f"tema{topic}palabra{rng.randrange(40)}" for _ in range(4)]
+            words += [f"comun{rng.randrange(50)}" for _ in range(3)]
+            file.write(f"{' '.join(words)} frase{i};Película {movie}\n")
+    return num_topics
+
+def topic_of(movie_name: str, num_topics: int) -> int:
+    """Tema de una película sintética a partir de su nombre ('película N')"""
+    return int(movie_name.split()[-1]) % num_topics
+
+def neighbor_precision(game: TriviaGame, num_topics: int) -> float:
+    """Fracción de los vecinos guardados que son del mismo tema que la película"""
+    index = game.index
+    neighbors_k, neighbors = index.movie_neighbors()
+    same = total = 0
+    for movie_id, name in enumerate(index.movie_names):
+        start = movie_id * neighbors_k
+        for neighbor in neighbors[start:start + neighbors_k]:
+            if neighbor >= 0:
+                total += 1
+                same += topic_of(index.movie_names[neighbor], num_topics) == topic_of(name, num_topics)
+    return same / total if total else 0.0
+
+def distractor_precision(game: TriviaGame, num_topics: int, difficulty: str, samples: int = 2000) -> float:
+    """Fracción de los distractores sorteados que son del mismo tema que la respuesta correcta"""
+    same = 0
+    for _ in range(samples):
+        question = game.generate_question(difficulty)
+        topic = topic_of(question['correct_movie'], num_topics)
+        same += sum(topic_of(option, num_topics) == topic for option in question['options']) - 1
+    return same / (samples * (len(question['options']) - 1))
+
+def main(sizes):
+    print(f"{'frases':>10} | {'películas':>9} | {'armado (s)':>10} | {'vecinos del tema':>16} | "
+          f"{'dificultad':>10} | {'preguntas/s':>11} | {'distractores del tema':>21}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corpus_path = os.path.join(tmp_dir, 'corpus.txt')
+            num_topics = write_topic_corpus(corpus_path, size)
+
+            # Armado del índice sobre el corpus ya cargado (sin contar la lectura del archivo)
+            store = PhraseStore.from_file(corpus_path)
+            movie_names, _ = store.folded_movies()
+            start = time.perf_counter()
+            build_neighbors(store.movie_documents(), movie_names, NEIGHBORS_PER_MOVIE)
+            build_time = time.perf_counter() - start
+
+            game = TriviaGame(corpus_path)
+            precision = neighbor_precision(game, num_topics)
+            for difficulty in DIFFICULTY_SIMILAR_OPTIONS:
+                rate = measure(lambda: game.generate_question(difficulty))
+                distractors = distractor_precision(game, num_topics, difficulty)
+                print(f"{size:>10} | {len(movie_names):>9} | {build_time:>10.2f} | {precision:>16.0%} | "
+                      f"{difficulty:>10} | {rate:>11,.0f} | {distractors:>21.0%}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,103 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from modules.chart_profiles import DEFAULT_PROFILE
+from modules.history_stats import HistoryStats
+
+class ChartCache:
+    """Caché en disco de las gráficas, indexada por la versión del historial y el perfil
+
+    Sólo maneja rutas y metadata: no importa matplotlib, que se carga en los procesos de render.
+    """
+    def __init__(self, charts_dir: str = "static/charts", metadata_file: Optional[str] = None):
+        self.charts_dir = charts_dir
+        os.makedirs(charts_dir, exist_ok=True)
+        self.metadata_file = metadata_file or os.path.join(charts_dir, 'charts_cache.json')
+        self.metadata = self._load_metadata()
+
+    def _load_metadata(self) -> Dict:
+        """Lee la metadata guardada (versión y archivos de cada perfil generado)"""
+        try:
+            with open(self.metadata_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_metadata(self):
+        """Guarda la metadata de forma atómica para que sobreviva a reinicios"""
+        tmp_file = self.metadata_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.metadata, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.metadata_file)
+
+    def is_fresh(self, version: str, profile: str = DEFAULT_PROFILE) -> bool:
+        """Verifica con un stat() por archivo que las gráficas cacheadas sigan vigentes"""
+        cached = self.metadata.get(profile, {})
+        if cached.get('version') != version or cached.get('stale'):
+            return False
+        for entry in cached['charts'].values():
+            if entry is None:
+                continue
+            try:
+                if os.stat(entry['path']).st_mtime != entry['mtime']:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def get_charts(self, version: str, games: List[Dict], stats: HistoryStats = None,
+                   profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """Retorna las rutas de las gráficas, regenerándolas sólo si cambió el historial"""
+        if self.is_fresh(version, profile):
+            return self.get_cached_paths(profile)
+
+        from modules.charts import GameCharts  # render en el proceso actual: carga matplotlib
+        charts_paths = GameCharts(self.charts_dir).generate_charts(games, stats, profile)
+        self.store(version, charts_paths, profile)
+        return charts_paths
+
+    def get_cached_paths(self, profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """Retorna las rutas de la última generación guardada (puede estar desactualizada)"""
+        return {name: entry['path'] if entry else None
+                for name, entry in self.metadata.get(profile, {}).get('charts', {}).items()}
+
+    def get_chart_urls(self, profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """URLs de las gráficas cacheadas, con la versión para evitar la caché del navegador"""
+        version = self.metadata.get(profile, {}).get('version', '')
+        urls = {}
+        for name, path in self.get_cached_paths(profile).items():
+            url = self.get_chart_url(path)
+            urls[name] = f"{url}?v={version}" if url else None
+        return urls
+
+    def get_chart_url(self, chart_path: str) -> Optional[str]:
+        """Convierte la ruta del archivo en URL para Flask"""
+        if chart_path and os.path.exists(chart_path):
+            return f'/static/charts/{os.path.basename(chart_path)}'
+        return None
+
+    def store(self, version: str, charts_paths: Dict[str, str], profile: str = DEFAULT_PROFILE):
+        """Registra las gráficas generadas de un perfil para una versión del historial
+
+        Cada perfil guarda su propia versión: los que no se regeneraron siguen sirviéndose
+        hasta que se pidan de nuevo.
+        """
+        self.metadata[profile] = {
+            'version': version,
+            'charts': {
+                name: {'path': path, 'mtime': os.stat(path).st_mtime} if path else None
+                for name, path in charts_paths.items()
+            }
+        }
+        self._save_metadata()
+
+    def mark_stale(self):
+        """Fuerza a regenerar todos los perfiles en el próximo pedido
+
+        Las gráficas anteriores se siguen sirviendo (get_cached_paths) hasta que store()
+        registre las nuevas, aunque el render falle.
+        """
+        for cached in self.metadata.values():
+            cached['stale'] = True
+        self._save_metadata()
@@ -0,0 +1,10 @@
+# Perfiles de salida de las gráficas. Está separado de modules/charts.py para que el
+# servidor pueda usarlos sin importar matplotlib (sólo lo cargan los procesos de render).
+
+# 'web' para la página (liviano), 'print' para el PDF y 'svg' vectorial
+RENDER_PROFILES = {
+    'web': {'format': 'webp', 'dpi': 100, 'pil_kwargs': {'quality': 85, 'method': 6}},
+    'print': {'format': 'png', 'dpi': 200, 'pil_kwargs': {'optimize': True}},
+    'svg': {'format': 'svg', 'dpi': 72},
+}
+DEFAULT_PROFILE = 'print'
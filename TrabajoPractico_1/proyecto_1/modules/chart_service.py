@@ -0,0 +1,205 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from modules.chart_cache import ChartCache
+from modules.chart_profiles import DEFAULT_PROFILE
+from modules.history_stats import HistoryStats
+
+# Gráficas que muestra la página de resultados y método de GameCharts que genera cada una
+CHART_RENDERERS = {
+    'line_chart': 'generate_performance_dashboard',
+    'pie_chart': 'generate_circular_performance_chart',
+}
+
+# Instancia de GameCharts de cada proceso del pool (se crea una sola vez por proceso)
+_worker_charts = None
+
+def _init_worker(charts_dir: str):
+    """Inicializa un proceso del pool: importa matplotlib/seaborn y aplica el tema una vez"""
+    global _worker_charts
+    from modules.charts import GameCharts
+    _worker_charts = GameCharts(charts_dir)
+
+def _ping() -> bool:
+    """Tarea vacía para forzar el arranque de los procesos del pool"""
+    return True
+
+def _prepare_chart_data(games: List[Dict]) -> Tuple:
+    """Prepara una sola vez, dentro de un proceso del pool, los datos que usan todas las gráficas"""
+    return _worker_charts._prepare_data_for_charts(games)
+
+def _render_chart(chart_name: str, data: Tuple, stats: HistoryStats, profile: str) -> str:
+    """Renderiza una gráfica dentro de un proceso del pool a partir de los datos ya preparados"""
+    return getattr(_worker_charts, CHART_RENDERERS[chart_name])(None, stats, data, profile)
+
+class ChartRenderService:
+    """Renderiza las gráficas en segundo plano con un pool de procesos
+
+    matplotlib consume CPU y el estado de pyplot no es seguro entre hilos, por eso cada
+    gráfica se dibuja en un proceso aparte. Se renderiza un pedido (versión y perfil) a la
+    vez; los que llegan mientras tanto se agrupan por perfil y sólo se renderiza el último.
+
+    Los procesos son persistentes y son los únicos que cargan matplotlib y seaborn, así el
+    servidor arranca rápido y no carga el stack de gráficas en memoria.
+    """
+    def __init__(self, chart_cache: ChartCache, max_workers: int = len(CHART_RENDERERS)):
+        self.chart_cache = chart_cache
+        self.max_workers = max_workers
+        self._executor = None
+        self._cond = threading.Condition()
+        self._running = None  # (versión, perfil) que se está renderizando
+        self._pending = {}  # perfil -> (versión, partidas, stats) del pedido más reciente en espera
+        self._failed = {}  # perfil -> versión cuyo render falló
+        self.last_error = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Crea el pool de procesos la primera vez que se necesita"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(self.chart_cache.charts_dir,))
+        return self._executor
+
+    def _reset_executor(self):
+        """Descarta un pool roto (murió uno de sus procesos); el próximo pedido crea otro
+
+        Un pool roto ya terminó sus procesos, así que alcanza con soltarlo (esto puede
+        correr en un callback del propio pool, donde no conviene llamar a shutdown).
+        """
+        self._executor = None
+
+    def warm_up(self):
+        """Arranca los procesos de render en segundo plano sin esperar a que terminen
+
+        Así el primer pedido de gráficas no paga la importación de matplotlib.
+        """
+        with self._cond:
+            try:
+                self._get_executor().submit(_ping)
+            except Exception as e:
+                print(f"Error al arrancar los procesos de gráficas: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_executor()
+
+    def status(self, version: str, profile: str = DEFAULT_PROFILE) -> str:
+        """Retorna 'ready', 'rendering' o 'error' para una versión del historial"""
+        with self._cond:
+            if self.chart_cache.is_fresh(version, profile):
+                return 'ready'
+            if self._failed.get(profile) == version:
+                return 'error'
+            return 'rendering'
+
+    def request_render(self, version: str, games: List[Dict], stats: HistoryStats = None,
+                       profile: str = DEFAULT_PROFILE) -> str:
+        """Pide renderizar una versión sin bloquear; retorna el estado resultante"""
+        with self._cond:
+            if self.chart_cache.is_fresh(version, profile):
+                return 'ready'
+            if self._running == (version, profile):
+                return 'rendering'
+            if self._running is not None:
+                # Ya hay un render en curso: sólo se recuerda el pedido más reciente del perfil
+                self._pending[profile] = (version, games, stats)
+                return 'rendering'
+            self._start(version, games, stats, profile)
+            return 'rendering'
+
+    def _start(self, version: str, games: List[Dict], stats: HistoryStats, profile: str):
+        """Lanza un pedido (con el lock tomado): primero se preparan los datos y después
+        se dibujan en paralelo todas las gráficas con esos mismos datos (_on_prepared)
+
+        Si el pool está roto se reemplaza y se reintenta una vez; si vuelve a fallar, o el
+        pool rechaza la tarea por otro motivo (p. ej. ya se cerró), la versión queda marcada
+        con error y quien espera usa las gráficas anteriores.
+        """
+        job = (version, profile)
+        self._failed.pop(profile, None)
+        for attempt in range(2):
+            try:
+                prepared = self._get_executor().submit(_prepare_chart_data, games)
+                break
+            except BrokenProcessPool as e:
+                self._reset_executor()
+                if attempt == 1:
+                    self._mark_failed(job, e)
+                    return
+            except Exception as e:
+                # RuntimeError si el pool ya se cerró: no hay nada que reintentar
+                self._mark_failed(job, e)
+                return
+        # Recién ahora hay un render en curso (el callback puede correr en este mismo hilo)
+        self._running = job
+        prepared.add_done_callback(lambda future: self._on_prepared(job, future, stats))
+
+    def _on_prepared(self, job: Tuple[str, str], prepared, stats: HistoryStats):
+        """Reparte los datos preparados entre las gráficas del pedido"""
+        with self._cond:
+            if self._running != job:
+                return
+            try:
+                data = prepared.result()
+                executor = self._get_executor()
+                futures = {name: executor.submit(_render_chart, name, data, stats, job[1])
+                           for name in CHART_RENDERERS}
+            except Exception as e:
+                # Incluye BrokenProcessPool: el pool se reemplaza en el próximo pedido
+                self._mark_failed(job, e)
+                self._start_next()
+                return
+            for future in futures.values():
+                future.add_done_callback(lambda _, f=futures: self._on_done(job, f))
+
+    def _mark_failed(self, job: Tuple[str, str], error: Exception):
+        """Registra el error de un pedido y despierta a quien lo espera (con el lock tomado)"""
+        version, profile = job
+        print(f"Error al renderizar gráficas: {error}")
+        self.last_error = str(error)
+        self._failed[profile] = version
+        if isinstance(error, BrokenProcessPool):
+            self._reset_executor()
+        self._cond.notify_all()
+
+    def _on_done(self, job: Tuple[str, str], futures: Dict):
+        """Registra el resultado cuando terminaron todas las gráficas de un pedido"""
+        if not all(future.done() for future in futures.values()):
+            return
+        with self._cond:
+            if self._running != job:
+                return
+            version, profile = job
+            try:
+                charts_paths = {name: future.result() for name, future in futures.items()}
+                self.chart_cache.store(version, charts_paths, profile)
+            except Exception as e:
+                # Incluye BrokenProcessPool: el pool se reemplaza en el próximo pedido
+                self._mark_failed(job, e)
+            self._start_next()
+
+    def _start_next(self):
+        """Termina el pedido en curso y sigue con el pendiente más antiguo que todavía haga falta
+        (con el lock tomado)"""
+        self._running = None
+        while self._pending and self._running is None:
+            pending_profile = next(iter(self._pending))
+            pending_version, games, stats = self._pending.pop(pending_profile)
+            if not self.chart_cache.is_fresh(pending_version, pending_profile):
+                self._start(pending_version, games, stats, pending_profile)
+        self._cond.notify_all()
+
+    def get_last_good_charts(self, profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """Retorna las últimas gráficas completas, aunque correspondan a una versión anterior"""
+        with self._cond:
+            return self.chart_cache.get_cached_paths(profile)
+
+    def render_and_wait(self, version: str, games: List[Dict], stats: HistoryStats = None,
+                        timeout: Optional[float] = None, profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """Pide renderizar una versión y espera a que esté lista (p. ej. para el reporte PDF)"""
+        with self._cond:
+            self.request_render(version, games, stats, profile)
+            self._cond.wait_for(lambda: self.chart_cache.is_fresh(version, profile)
+                                or self._failed.get(profile) == version, timeout=timeout)
+            if not self.chart_cache.is_fresh(version, profile):
+                return {}
+            return self.chart_cache.get_cached_paths(profile)
@@ -1,29 +1,66 @@
 import matplotlib
 matplotlib.use('Agg')  # Backend no interactivo para servidores web
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import matplotlib.patches as patches
 from matplotlib.patches import Circle, FancyBboxPatch
 import seaborn as sns
 import numpy as np
-from datetime import datetime
 import os
 from typing import List, Dict, Tuple
-import io
-import base64
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+from modules.chart_profiles import RENDER_PROFILES, DEFAULT_PROFILE
+from modules.history_stats import HistoryStats
 
-# Configurar estilo moderno con efectos visuales avanzados
-plt.style.use('default')
-sns.set_style("white")
+# El tema de pyplot es global al proceso: se aplica una sola vez, con la primera instancia
+_theme_applied = False
 
-# Configurar fuentes modernas y elegantes
-plt.rcParams['font.family'] = ['SF Pro Display', 'Roboto', 'Helvetica Neue', 'Arial', 'DejaVu Sans']
-plt.rcParams['font.size'] = 11
-plt.rcParams['axes.titlesize'] = 20
-plt.rcParams['axes.labelsize'] = 14
-plt.rcParams['xtick.labelsize'] = 11
-plt.rcParams['ytick.labelsize'] = 11
-plt.rcParams['legend.fontsize'] = 12
+# Límites para historiales grandes: por encima se agregan o submuestrean los datos
+MAX_BARS = 30            # barras individuales por partida en el dashboard
+TOP_PLAYERS = 10         # jugadores que se muestran al agregar por jugador
+MAX_LINE_POINTS = 500    # puntos de las líneas de tendencia (submuestreo LTTB)
+MAX_RADIAL_BARS = 60     # barras radiales (promedio por tramo de partidas)
+
+
+def _lttb(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: índices de los puntos que conservan la forma de la serie"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.arange(n, dtype=float)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Promedio del tramo siguiente como tercer vértice del triángulo
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:max(next_end, next_start + 1)].mean()
+        next_y = y[next_start:max(next_end, next_start + 1)].mean()
+        
+        areas = np.abs((x[prev] - next_x) * (y[start:end] - y[prev])
+                       - (x[prev] - x[start:end]) * (next_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+    return selected
+
+def _bucket_means(values: List[float], num_buckets: int) -> np.ndarray:
+    """Promedia una serie en num_buckets tramos consecutivos de igual tamaño"""
+    return np.array([chunk.mean() for chunk in np.array_split(np.asarray(values, dtype=float), num_buckets)])
+
+def _parse_iso_minute(value: str) -> np.datetime64:
+    """Convierte 'aaaa-mm-ddThh:mm' a datetime64[m]; NaT si la fecha no existe"""
+    try:
+        return np.datetime64(value, 'm')
+    except ValueError:
+        return np.datetime64('NaT', 'm')
+
+def _render_in_worker(charts_dir: str, method: str, games: List[Dict], stats: HistoryStats,
+                      data: Tuple, profile: str) -> str:
+    """Dibuja una gráfica en un proceso del pool con los datos ya preparados"""
+    return getattr(GameCharts(charts_dir), method)(games, stats, data, profile)
 
 class GameCharts:
     def __init__(self, charts_dir: str = "static/charts"):
@@ -56,6 +93,27 @@ class GameCharts:
             'shadow': '#000000',                # Negro para sombras
         }
         
+        self._apply_theme()
+    
+    def _apply_theme(self):
+        """Configura el estilo global de pyplot una vez por proceso"""
+        global _theme_applied
+        if _theme_applied:
+            return
+        
+        # Configurar estilo moderno con efectos visuales avanzados
+        plt.style.use('default')
+        sns.set_style("white")
+        
+        # Configurar fuentes modernas y elegantes
+        plt.rcParams['font.family'] = ['SF Pro Display', 'Roboto', 'Helvetica Neue', 'Arial', 'DejaVu Sans']
+        plt.rcParams['font.size'] = 11
+        plt.rcParams['axes.titlesize'] = 20
+        plt.rcParams['axes.labelsize'] = 14
+        plt.rcParams['xtick.labelsize'] = 11
+        plt.rcParams['ytick.labelsize'] = 11
+        plt.rcParams['legend.fontsize'] = 12
+        
         # Configurar tema oscuro moderno
         plt.rcParams['figure.facecolor'] = self.colors['background']
         plt.rcParams['axes.facecolor'] = self.colors['surface']
@@ -63,88 +121,145 @@ class GameCharts:
         plt.rcParams['axes.labelcolor'] = self.colors['text_primary']
         plt.rcParams['xtick.color'] = self.colors['text_secondary']
         plt.rcParams['ytick.color'] = self.colors['text_secondary']
+        _theme_applied = True
+        
+    def _prepare_columns(self, games: List[Dict]) -> Dict[str, np.ndarray]:
+        """Prepara los datos en columnas NumPy con el parseo vectorizado
+        
+        Se calcula una sola vez por render y se reutiliza entre gráficas: los métodos
+        generate_* reciben el resultado en data y en ese caso no necesitan las partidas.
+        Las partidas con fecha inválida (formato o calendario) se descartan.
         
-    def _parse_score(self, score_str: str) -> Tuple[int, int]:
-        """Convierte un string de puntuación '3/5' en tupla (aciertos, total)"""
+        Returns:
+            dict: 'dates' (datetime64[m]), 'aciertos'/'desaciertos'/'totales' (int16),
+                  'porcentajes' (float32), 'user_codes' (int32) y 'user_names' (categorías)
+        """
+        start_times = np.array([game.get('start_time') or '' for game in games], dtype='U14')
+        scores = np.array([game.get('score') or '' for game in games], dtype='U16')
+        names = np.array([game.get('username', 'Usuario') for game in games], dtype=object)
+        
+        # Fechas 'dd/mm/aa hh:mm' -> '20aa-mm-ddThh:mm' reordenando columnas de caracteres
+        chars = start_times.view('U1').reshape(len(games), 14)
+        valid = ((np.char.str_len(start_times) == 14) & (chars[:, 2] == '/') & (chars[:, 5] == '/')
+                 & (chars[:, 8] == ' ') & (chars[:, 11] == ':'))
+        digits = chars[:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13]]
+        valid &= np.all(np.char.isdigit(digits), axis=1)
+        chars = chars[valid]
+        iso = np.full((len(chars), 16), '-', dtype='U1')
+        iso[:, 0], iso[:, 1] = '2', '0'
+        iso[:, [2, 3]] = chars[:, [6, 7]]
+        iso[:, [5, 6]] = chars[:, [3, 4]]
+        iso[:, [8, 9]] = chars[:, [0, 1]]
+        iso[:, 10] = 'T'
+        iso[:, [11, 12]] = chars[:, [9, 10]]
+        iso[:, 13] = ':'
+        iso[:, [14, 15]] = chars[:, [12, 13]]
+        iso_strings = np.ascontiguousarray(iso).view('U16').ravel()
         try:
-            aciertos, total = map(int, score_str.split('/'))
-            return aciertos, total
-        except:
-            return 0, 0
+            dates = iso_strings.astype('datetime64[m]')
+        except ValueError:
+            # Alguna fecha con buen formato no existe en el calendario (p. ej. 31/02): NaT y se descarta
+            dates = np.array([_parse_iso_minute(value) for value in iso_strings], dtype='datetime64[m]')
+        valid[valid] = ~np.isnat(dates)
+        dates = dates[~np.isnat(dates)]
+        if not valid.all():
+            print(f"Error procesando juego: {int((~valid).sum())} fechas inválidas descartadas")
+        
+        # Puntuaciones 'aciertos/total'; las mal formadas cuentan como 0/0
+        aciertos = np.zeros(len(dates), dtype=np.int16)
+        totales = np.zeros(len(dates), dtype=np.int16)
+        if len(dates) > 0:
+            parts = np.char.partition(scores[valid], '/')
+            hits_str, totals_str = parts[:, 0], parts[:, 2]
+            ok = np.char.isdigit(hits_str) & np.char.isdigit(totals_str)
+            aciertos[ok] = hits_str[ok].astype(np.int16)
+            totales[ok] = totals_str[ok].astype(np.int16)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            porcentajes = np.where(totales > 0, aciertos / totales * 100, 0).astype(np.float32)
+        
+        # Usuarios como categorías: códigos enteros sobre la tabla de nombres únicos
+        user_names, user_codes = np.unique(names[valid].astype(str), return_inverse=True)
+        
+        return {
+            'dates': dates,
+            'aciertos': aciertos,
+            'desaciertos': totales - aciertos,
+            'totales': totales,
+            'porcentajes': porcentajes,
+            'user_codes': user_codes.astype(np.int32),
+            'user_names': user_names,
+        }
     
-    def _prepare_data_for_charts(self, games: List[Dict]) -> Tuple[List, List, List, List, List, List]:
-        """Prepara los datos para las gráficas con mejor estructura"""
-        dates = []
-        aciertos = []
-        desaciertos = []
-        totales = []
-        porcentajes = []
-        usernames = []
-        
-        for game in games:
-            try:
-                # Parsear fecha
-                date_obj = datetime.strptime(game['start_time'], '%d/%m/%y %H:%M')
-                dates.append(date_obj)
-                
-                # Obtener nombre de usuario
-                username = game.get('username', 'Usuario')
-                usernames.append(username)
-                
-                # Parsear puntuación
-                aciertos_count, total = self._parse_score(game['score'])
-                desaciertos_count = total - aciertos_count
-                
-                aciertos.append(aciertos_count)
-                desaciertos.append(desaciertos_count)
-                totales.append(total)
-                
-                # Calcular porcentaje de aciertos
-                porcentaje = (aciertos_count / total * 100) if total > 0 else 0
-                porcentajes.append(porcentaje)
-                
-            except Exception as e:
-                print(f"Error procesando juego: {e}")
-                continue
+    def _prepare_data_for_charts(self, games: List[Dict]) -> Tuple:
+        """Prepara los datos para las gráficas como arrays NumPy
         
-        return dates, aciertos, desaciertos, totales, porcentajes, usernames
+        Returns:
+            tuple: (fechas, aciertos, desaciertos, totales, porcentajes, usuarios), todos arrays
+        """
+        columns = self._prepare_columns(games)
+        usernames = columns['user_names'][columns['user_codes']]
+        return (columns['dates'], columns['aciertos'], columns['desaciertos'],
+                columns['totales'], columns['porcentajes'], usernames)
     
-    def _create_gradient_bars(self, ax, x_pos, values, color_start, color_end, width=0.35, alpha=0.9):
-        """Crea barras con efecto gradiente"""
-        bars = []
-        for i, (x, height) in enumerate(zip(x_pos, values)):
-            if height > 0:
-                # Crear gradiente vertical
-                gradient = np.linspace(0, 1, 256).reshape(256, -1)
-                gradient = np.hstack((gradient, gradient))
-                
-                # Crear la barra base
-                bar = ax.bar(x, height, width, alpha=alpha, 
-                           color=color_start, edgecolor='white', 
-                           linewidth=2, capstyle='round')
-                bars.extend(bar)
-                
-                # Agregar efecto de sombra
-                shadow = ax.bar(x + 0.01, height, width, alpha=0.3,
-                              color='black', zorder=0)
+    def _dashboard_bars(self, dates, aciertos, desaciertos, usernames, stats: HistoryStats = None):
+        """Datos de la gráfica principal: una barra por partida o, si son muchas, por jugador
+        
+        Returns:
+            tuple: (etiquetas, aciertos, desaciertos, título)
+        """
+        if len(dates) <= MAX_BARS:
+            labels = [f"{username}\n{date.strftime('%d/%m %H:%M')}" for username, date in zip(usernames, dates.tolist())]
+            return labels, aciertos, desaciertos, 'Rendimiento Individual por Jugador'
         
-        return bars
+        # Agregado por jugador: se usa HistoryStats (O(jugadores)) si está disponible
+        if stats is not None:
+            player_games, player_hits, player_totals = stats.player_games, stats.player_hits, stats.player_totals
+        else:
+            names, codes = np.unique(usernames, return_inverse=True)
+            player_games = dict(zip(names, np.bincount(codes).tolist()))
+            player_hits = dict(zip(names, np.bincount(codes, weights=aciertos).astype(int).tolist()))
+            player_totals = dict(zip(names, np.bincount(codes, weights=aciertos + desaciertos).astype(int).tolist()))
+        
+        top = heapq.nlargest(TOP_PLAYERS, player_games, key=player_games.get)
+        labels = [f"{name}\n({player_games[name]} partidas)" for name in top]
+        hits = np.array([player_hits[name] for name in top])
+        misses = np.array([player_totals[name] - player_hits[name] for name in top])
+        return labels, hits, misses, f'Top {len(top)} Jugadores (totales acumulados)'
     
-    def _add_glow_effect(self, ax, artist, glow_color, glow_radius=3):
-        """Agrega efecto de resplandor a elementos gráficos"""
-        for i in range(glow_radius):
-            alpha = 0.1 * (glow_radius - i) / glow_radius
-            # Implementar efecto de resplandor usando múltiples capas
-            pass
+    def _save_figure(self, name: str, profile: str = DEFAULT_PROFILE, metadata: Dict = None) -> str:
+        """Guarda la figura actual en charts_dir con el perfil indicado y la cierra
+        
+        Se escribe primero a un archivo temporal y luego se reemplaza, para que nunca
+        se sirva una imagen a medio escribir mientras se regenera en segundo plano.
+        """
+        options = RENDER_PROFILES[profile]
+        chart_path = os.path.join(self.charts_dir, f"{name}_{profile}.{options['format']}")
+        tmp_path = f"{chart_path}.{os.getpid()}.tmp"
+        savefig_kwargs = {'pil_kwargs': options['pil_kwargs']} if 'pil_kwargs' in options else {}
+        if metadata and options['format'] == 'png':
+            savefig_kwargs['metadata'] = metadata
+        plt.savefig(tmp_path, format=options['format'], dpi=options['dpi'],
+                   bbox_inches='tight', facecolor=self.colors['background'],
+                   edgecolor='none', transparent=False, **savefig_kwargs)
+        plt.close()
+        os.replace(tmp_path, chart_path)
+        return chart_path
     
-    def generate_performance_dashboard(self, games: List[Dict]) -> str:
-        """Genera un dashboard completo con múltiples visualizaciones"""
-        if not games:
-            return None
-            
-        dates, aciertos, desaciertos, totales, porcentajes, usernames = self._prepare_data_for_charts(games)
+    def generate_performance_dashboard(self, games: List[Dict], stats: HistoryStats = None, data: Tuple = None,
+                                       profile: str = DEFAULT_PROFILE) -> str:
+        """Genera un dashboard completo con múltiples visualizaciones
+        
+        Los totales del encabezado y de las tarjetas se leen de stats cuando se pasa y
+        data permite reutilizar los datos ya preparados con _prepare_data_for_charts.
+        """
+        if data is None:
+            if not games:
+                return None
+            data = self._prepare_data_for_charts(games)
+        dates, aciertos, desaciertos, totales, porcentajes, usernames = data
         
-        if not dates:
+        if len(dates) == 0:
             return None
         
         # Crear figura principal con diseño de dashboard
@@ -165,9 +280,14 @@ class GameCharts:
                     y=0.95, fontfamily='SF Pro Display')
         
         # Estadísticas rápidas en el header
-        total_games = len(games)
-        total_questions = sum(totales)
-        avg_score = np.mean(porcentajes) if porcentajes else 0
+        if stats is not None:
+            total_games = stats.total_games
+            total_questions = stats.total_hits + stats.total_misses
+            avg_score = stats.average_percent()
+        else:
+            total_games = len(dates)
+            total_questions = int(totales.sum())
+            avg_score = float(porcentajes.mean())
         
         header_text = f"📊 {total_games} Partidas  |  🎯 {total_questions} Preguntas  |  📈 {avg_score:.1f}% Promedio"
         ax_header.text(0.5, 0.3, header_text, transform=ax_header.transAxes, 
@@ -178,22 +298,25 @@ class GameCharts:
         ax_main = fig.add_subplot(gs[1, :3])
         ax_main.set_facecolor(self.colors['surface'])
         
-        x_pos = np.arange(len(dates))
+        # Con historiales grandes se agregan los datos para que el costo no dependa del tamaño
+        bar_labels, bar_aciertos, bar_desaciertos, main_title = self._dashboard_bars(
+            dates, aciertos, desaciertos, usernames, stats)
+        x_pos = np.arange(len(bar_labels))
         width = 0.35
         
-        # Barras con efecto gradiente y sombras
-        bars_aciertos = ax_main.bar(x_pos - width/2, aciertos, width, 
+        # Barras agrupadas: una sola llamada vectorizada a ax.bar por serie
+        bars_aciertos = ax_main.bar(x_pos - width/2, bar_aciertos, width, 
                                    color=self.colors['aciertos_primary'],
                                    alpha=0.9, label='✅ Aciertos',
                                    edgecolor='white', linewidth=2)
         
-        bars_desaciertos = ax_main.bar(x_pos + width/2, desaciertos, width,
+        bars_desaciertos = ax_main.bar(x_pos + width/2, bar_desaciertos, width,
                                       color=self.colors['desaciertos_primary'],
                                       alpha=0.9, label='❌ Desaciertos',
                                       edgecolor='white', linewidth=2)
         
-        # Agregar valores con estilo moderno
-        for i, (bar_a, bar_d, acierto, desacierto) in enumerate(zip(bars_aciertos, bars_desaciertos, aciertos, desaciertos)):
+        # Agregar valores con estilo moderno (la cantidad de barras está acotada)
+        for i, (bar_a, bar_d, acierto, desacierto) in enumerate(zip(bars_aciertos, bars_desaciertos, bar_aciertos, bar_desaciertos)):
             if acierto > 0:
                 ax_main.text(bar_a.get_x() + bar_a.get_width()/2, acierto + 0.1,
                            str(acierto), ha='center', va='bottom', fontweight='bold',
@@ -206,13 +329,12 @@ class GameCharts:
         # Configurar ejes y estilo
         ax_main.set_xlabel('👥 Jugadores', fontsize=14, fontweight='600', color=self.colors['text_primary'])
         ax_main.set_ylabel('📊 Respuestas', fontsize=14, fontweight='600', color=self.colors['text_primary'])
-        ax_main.set_title('Rendimiento Individual por Jugador', fontsize=18, fontweight='bold', 
+        ax_main.set_title(main_title, fontsize=18, fontweight='bold', 
                          color=self.colors['text_primary'], pad=20)
         
         # Etiquetas del eje X con formato mejorado
         ax_main.set_xticks(x_pos)
-        labels = [f"{username}\n{date.strftime('%d/%m %H:%M')}" for username, date in zip(usernames, dates)]
-        ax_main.set_xticklabels(labels, fontsize=11, color=self.colors['text_secondary'])
+        ax_main.set_xticklabels(bar_labels, fontsize=11, color=self.colors['text_secondary'])
         
         # Grid sutil y elegante
         ax_main.grid(True, alpha=0.2, color=self.colors['grid'], axis='y', linestyle='-', linewidth=1)
@@ -273,15 +395,18 @@ class GameCharts:
         ax_trend = fig.add_subplot(gs[2, :2])
         ax_trend.set_facecolor(self.colors['surface'])
         
-        # Línea de tendencia con gradiente
-        line = ax_trend.plot(range(len(porcentajes)), porcentajes, 
+        # Línea de tendencia submuestreada (LTTB) para historiales grandes
+        trend_x = _lttb(np.asarray(porcentajes, dtype=float), MAX_LINE_POINTS)
+        trend_y = np.asarray(porcentajes, dtype=float)[trend_x]
+        line = ax_trend.plot(trend_x, trend_y, 
                             linewidth=4, color=self.colors['accent'], 
-                            marker='o', markersize=8, markerfacecolor=self.colors['accent_light'],
+                            marker='o' if len(trend_x) <= MAX_BARS else None,
+                            markersize=8, markerfacecolor=self.colors['accent_light'],
                             markeredgecolor='white', markeredgewidth=2,
                             label='📈 Tendencia de Aciertos')
         
         # Área bajo la curva
-        ax_trend.fill_between(range(len(porcentajes)), porcentajes, alpha=0.2, 
+        ax_trend.fill_between(trend_x, trend_y, alpha=0.2, 
                              color=self.colors['accent'])
         
         # Línea de referencia del 50%
@@ -341,14 +466,19 @@ class GameCharts:
         ax_stats.axis('off')
         
         # Crear tarjetas de estadísticas
-        total_aciertos = sum(aciertos)
-        total_desaciertos = sum(desaciertos)
-        mejor_jugador = usernames[np.argmax(porcentajes)] if porcentajes else "N/A"
-        mejor_score = max(porcentajes) if porcentajes else 0
+        if stats is not None:
+            total_aciertos = stats.total_hits
+            total_desaciertos = stats.total_misses
+            mejor_score, mejor_jugador = stats.best
+        else:
+            total_aciertos = int(aciertos.sum())
+            total_desaciertos = int(desaciertos.sum())
+            mejor_jugador = usernames[np.argmax(porcentajes)]
+            mejor_score = float(porcentajes.max())
         
         stats_cards = [
             {"title": "🏆 Mejor Jugador", "value": f"{mejor_jugador}", "subtitle": f"{mejor_score:.1f}%"},
-            {"title": "✅ Total Aciertos", "value": f"{total_aciertos}", "subtitle": f"{len(games)} partidas"},
+            {"title": "✅ Total Aciertos", "value": f"{total_aciertos}", "subtitle": f"{total_games} partidas"},
             {"title": "❌ Total Errores", "value": f"{total_desaciertos}", "subtitle": "respuestas"},
             {"title": "📊 Promedio General", "value": f"{avg_score:.1f}%", "subtitle": "rendimiento"},
         ]
@@ -379,22 +509,21 @@ class GameCharts:
                          fontsize=10, color=self.colors['text_muted'])
         
         # Guardar con máxima calidad
-        chart_path = os.path.join(self.charts_dir, 'modern_dashboard.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight', 
-                   facecolor=self.colors['background'], edgecolor='none',
-                   transparent=False, metadata={'Software': 'Modern Game Analytics'})
-        plt.close()
+        chart_path = self._save_figure('modern_dashboard', profile,
+                                       metadata={'Software': 'Modern Game Analytics'})
         
         return chart_path
     
-    def generate_circular_performance_chart(self, games: List[Dict]) -> str:
+    def generate_circular_performance_chart(self, games: List[Dict], stats: HistoryStats = None, data: Tuple = None,
+                                            profile: str = DEFAULT_PROFILE) -> str:
         """Genera una gráfica circular moderna con diseño glassmorphism"""
-        if not games:
-            return None
-            
-        dates, aciertos, desaciertos, totales, porcentajes, usernames = self._prepare_data_for_charts(games)
+        if data is None:
+            if not games:
+                return None
+            data = self._prepare_data_for_charts(games)
+        dates, aciertos, desaciertos, totales, porcentajes, usernames = data
         
-        if not dates:
+        if len(dates) == 0:
             return None
         
         # Crear figura circular con diseño moderno
@@ -404,8 +533,12 @@ class GameCharts:
         # === DONUT CHART PRINCIPAL ===
         ax1.set_facecolor(self.colors['surface'])
         
-        total_aciertos = sum(aciertos)
-        total_desaciertos = sum(desaciertos)
+        if stats is not None:
+            total_aciertos = stats.total_hits
+            total_desaciertos = stats.total_misses
+        else:
+            total_aciertos = int(aciertos.sum())
+            total_desaciertos = int(desaciertos.sum())
         
         # Datos para el donut chart
         sizes = [total_aciertos, total_desaciertos]
@@ -444,7 +577,7 @@ class GameCharts:
             angles += angles[:1]  # Completar el círculo
             
             # Normalizar porcentajes para el radar
-            values = porcentajes + [porcentajes[0]]  # Completar el círculo
+            values = np.append(porcentajes, porcentajes[0])  # Completar el círculo
             
             ax2 = plt.subplot(2, 2, 2, projection='polar', facecolor=self.colors['surface'])
             ax2.plot(angles, values, 'o-', linewidth=3, color=self.colors['accent'], 
@@ -471,23 +604,20 @@ class GameCharts:
         ax3.set_facecolor(self.colors['surface'])
         ax3 = plt.subplot(2, 2, 3, projection='polar')
         
-        # Crear barras radiales
-        theta = np.linspace(0.0, 2 * np.pi, len(porcentajes), endpoint=False)
-        radii = [p/100 for p in porcentajes]  # Normalizar a 0-1
-        width = 2 * np.pi / len(porcentajes) * 0.8
-        
-        bars = ax3.bar(theta, radii, width=width, bottom=0.0, alpha=0.8)
+        # Crear barras radiales (con muchas partidas, promedio por tramo de partidas)
+        if len(porcentajes) > MAX_RADIAL_BARS:
+            radial_values = _bucket_means(porcentajes, MAX_RADIAL_BARS)
+        else:
+            radial_values = np.asarray(porcentajes, dtype=float)
+        theta = np.linspace(0.0, 2 * np.pi, len(radial_values), endpoint=False)
+        radii = radial_values / 100  # Normalizar a 0-1
+        width = 2 * np.pi / len(radial_values) * 0.8
         
-        # Colorear barras según rendimiento
-        for bar, porcentaje in zip(bars, porcentajes):
-            if porcentaje >= 80:
-                bar.set_facecolor(self.colors['aciertos_primary'])
-            elif porcentaje >= 60:
-                bar.set_facecolor(self.colors['desaciertos_primary'])
-            else:
-                bar.set_facecolor('#EF4444')
-            bar.set_edgecolor('white')
-            bar.set_linewidth(2)
+        # Colorear barras según rendimiento, en la misma llamada a ax.bar
+        bar_colors = np.where(radial_values >= 80, self.colors['aciertos_primary'],
+                              np.where(radial_values >= 60, self.colors['desaciertos_primary'], '#EF4444'))
+        bars = ax3.bar(theta, radii, width=width, bottom=0.0, alpha=0.8,
+                       color=bar_colors, edgecolor='white', linewidth=2)
         
         ax3.set_ylim(0, 1)
         ax3.set_title('🎪 Rendimiento Circular', fontsize=16, 
@@ -517,8 +647,8 @@ class GameCharts:
         """
         
         # Crear ranking de jugadores
-        rankings = sorted(zip(usernames, porcentajes), key=lambda x: x[1], reverse=True)
-        for i, (name, score) in enumerate(rankings[:5]):  # Top 5
+        rankings = heapq.nlargest(5, zip(usernames, porcentajes), key=lambda x: x[1])
+        for i, (name, score) in enumerate(rankings):  # Top 5
             medal = ["🥇", "🥈", "🥉", "🏅", "🎖️"][i] if i < 5 else "🏅"
             metrics_text += f"\n        {medal} {name}: {score:.1f}%"
         
@@ -535,22 +665,20 @@ class GameCharts:
         plt.tight_layout()
         
         # Guardar con máxima calidad
-        chart_path = os.path.join(self.charts_dir, 'circular_performance.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight', 
-                   facecolor=self.colors['background'], edgecolor='none',
-                   transparent=False)
-        plt.close()
+        chart_path = self._save_figure('circular_performance', profile)
         
         return chart_path
     
-    def generate_interactive_timeline(self, games: List[Dict]) -> str:
+    def generate_interactive_timeline(self, games: List[Dict], stats: HistoryStats = None, data: Tuple = None,
+                                      profile: str = DEFAULT_PROFILE) -> str:
         """Genera una línea de tiempo interactiva con eventos y milestones"""
-        if not games:
-            return None
-            
-        dates, aciertos, desaciertos, totales, porcentajes, usernames = self._prepare_data_for_charts(games)
+        if data is None:
+            if not games:
+                return None
+            data = self._prepare_data_for_charts(games)
+        dates, aciertos, desaciertos, totales, porcentajes, usernames = data
         
-        if not dates:
+        if len(dates) == 0:
             return None
         
         # Crear figura de línea de tiempo
@@ -561,21 +689,23 @@ class GameCharts:
         # === LÍNEA DE TIEMPO PRINCIPAL ===
         ax1.set_facecolor(self.colors['surface'])
         
-        # Crear línea temporal con gradiente
-        x_timeline = range(len(dates))
+        # Crear línea temporal con gradiente, submuestreada (LTTB) si hay muchas partidas
+        x_timeline = _lttb(np.asarray(porcentajes, dtype=float), MAX_LINE_POINTS)
+        y_timeline = np.asarray(porcentajes, dtype=float)[x_timeline]
         
         # Línea principal con marcadores especiales
-        line_main = ax1.plot(x_timeline, porcentajes, linewidth=4, 
+        line_main = ax1.plot(x_timeline, y_timeline, linewidth=4, 
                             color=self.colors['accent'], alpha=0.8, 
-                            marker='o', markersize=10, markerfacecolor=self.colors['accent_light'],
+                            marker='o' if len(x_timeline) <= MAX_BARS else None,
+                            markersize=10, markerfacecolor=self.colors['accent_light'],
                             markeredgecolor='white', markeredgewidth=3,
                             label='📈 Evolución del Rendimiento')
         
         # Área bajo la curva con gradiente
-        ax1.fill_between(x_timeline, porcentajes, alpha=0.2, color=self.colors['accent'])
+        ax1.fill_between(x_timeline, y_timeline, alpha=0.2, color=self.colors['accent'])
         
         # Marcar eventos especiales (mejores y peores puntuaciones)
-        if porcentajes:
+        if len(porcentajes) > 0:
             best_idx = np.argmax(porcentajes)
             worst_idx = np.argmin(porcentajes)
             
@@ -606,10 +736,11 @@ class GameCharts:
         ax1.set_title('📈 EVOLUCIÓN TEMPORAL DEL RENDIMIENTO', fontsize=18, 
                      fontweight='bold', pad=20)
         
-        # Etiquetas personalizadas en el eje X
-        ax1.set_xticks(x_timeline)
-        timeline_labels = [f"{username}\n{date.strftime('%d/%m\n%H:%M')}" 
-                          for username, date in zip(usernames, dates)]
+        # Etiquetas personalizadas en el eje X (como máximo MAX_BARS etiquetas)
+        tick_idx = np.unique(np.linspace(0, len(dates) - 1, min(len(dates), MAX_BARS)).astype(int))
+        ax1.set_xticks(tick_idx)
+        timeline_labels = [f"{usernames[i]}\n{date.strftime('%d/%m')}\n{date.strftime('%H:%M')}" 
+                          for i, date in zip(tick_idx, dates[tick_idx].tolist())]
         ax1.set_xticklabels(timeline_labels, fontsize=10)
         
         ax1.set_ylim(0, 100)
@@ -626,21 +757,15 @@ class GameCharts:
         # === HEATMAP DE ACTIVIDAD POR HORA ===
         ax2.set_facecolor(self.colors['surface'])
         
-        # Extraer horas de las fechas
-        hours = [date.hour for date in dates]
-        hour_performance = {}
-        
-        for hour, perf in zip(hours, porcentajes):
-            if hour not in hour_performance:
-                hour_performance[hour] = []
-            hour_performance[hour].append(perf)
-        
-        # Calcular promedio por hora
-        hour_avg = {hour: np.mean(perfs) for hour, perfs in hour_performance.items()}
-        
-        # Crear heatmap por horas
+        # Crear heatmap por horas (el promedio por hora ya está agregado en stats)
         all_hours = list(range(24))
-        hour_values = [hour_avg.get(hour, 0) for hour in all_hours]
+        if stats is not None:
+            hour_values = stats.hourly_average()
+        else:
+            hours = (dates.astype('datetime64[h]').astype(np.int64) % 24).astype(int)
+            hour_games = np.bincount(hours, minlength=24)
+            hour_sums = np.bincount(hours, weights=porcentajes, minlength=24)
+            hour_values = np.divide(hour_sums, hour_games, out=np.zeros(24), where=hour_games > 0).tolist()
         
         # Crear barras coloreadas por rendimiento
         bars_hours = ax2.bar(all_hours, [1]*24, color='lightgray', alpha=0.3, width=0.8)
@@ -689,16 +814,17 @@ class GameCharts:
             progress_text = f"{'📈 +' if progress > 0 else '📉 '}{progress:.1f}%"
             progress_desc = "Mejorando" if progress > 0 else "Descendiendo" if progress < 0 else "Estable"
         else:
+            progress = 0
             progress_text = "➖ 0.0%"
             progress_desc = "Datos insuficientes"
         
         # Crear panel de estadísticas como tarjetas
         stats_data = [
-            {"icon": "🎮", "label": "Total Partidas", "value": str(len(games)), "color": self.colors['text_primary']},
+            {"icon": "🎮", "label": "Total Partidas", "value": str(len(dates)), "color": self.colors['text_primary']},
             {"icon": "📊", "label": "Promedio Global", "value": f"{np.mean(porcentajes):.1f}%", "color": self.colors['accent']},
             {"icon": "🚀", "label": "Progreso", "value": progress_text, "color": self.colors['aciertos_primary'] if progress > 0 else self.colors['desaciertos_primary']},
             {"icon": "🎯", "label": "Consistencia", "value": f"{100 - np.std(porcentajes):.1f}%", "color": self.colors['text_primary']},
-            {"icon": "⭐", "label": "Mejor Jugador", "value": usernames[np.argmax(porcentajes)] if porcentajes else "N/A", "color": self.colors['aciertos_primary']},
+            {"icon": "⭐", "label": "Mejor Jugador", "value": usernames[np.argmax(porcentajes)], "color": self.colors['aciertos_primary']},
         ]
         
         # Dibujar tarjetas de estadísticas
@@ -732,36 +858,45 @@ class GameCharts:
         plt.tight_layout()
         
         # Guardar gráfica
-        chart_path = os.path.join(self.charts_dir, 'interactive_timeline.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight', 
-                   facecolor=self.colors['background'], edgecolor='none',
-                   transparent=False)
-        plt.close()
+        chart_path = self._save_figure('interactive_timeline', profile)
         
         return chart_path
     
-    def generate_charts(self, games: List[Dict]) -> Dict[str, str]:
+    def generate_charts(self, games: List[Dict], stats: HistoryStats = None,
+                        profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
         """Genera las gráficas básicas compatibles con el servidor actual"""
-        # Generar los gráficos modernos pero con nombres compatibles
-        dashboard_path = self.generate_performance_dashboard(games)
-        circular_path = self.generate_circular_performance_chart(games)
+        # Generar los gráficos modernos pero con nombres compatibles (datos preparados una vez)
+        data = self._prepare_data_for_charts(games) if games else None
+        dashboard_path = self.generate_performance_dashboard(games, stats, data, profile)
+        circular_path = self.generate_circular_performance_chart(games, stats, data, profile)
         
         return {
             'line_chart': dashboard_path,  # El dashboard moderno como 'line_chart'
             'pie_chart': circular_path     # El análisis circular como 'pie_chart'
         }
     
-    def generate_all_charts(self, games: List[Dict]) -> Dict[str, str]:
-        """Genera todas las gráficas mejoradas y retorna las rutas"""
-        dashboard_path = self.generate_performance_dashboard(games)
-        circular_path = self.generate_circular_performance_chart(games)
-        timeline_path = self.generate_interactive_timeline(games)
+    def generate_all_charts(self, games: List[Dict], stats: HistoryStats = None,
+                            parallel: bool = False, max_workers: int = None,
+                            profile: str = DEFAULT_PROFILE) -> Dict[str, str]:
+        """Genera todas las gráficas mejoradas y retorna las rutas
         
-        return {
-            'dashboard': dashboard_path,
-            'circular': circular_path,
-            'timeline': timeline_path
+        Los datos se preparan una sola vez. Con parallel=True cada gráfica se dibuja en
+        un proceso distinto (pyplot no es seguro entre hilos).
+        """
+        data = self._prepare_data_for_charts(games) if games else None
+        renderers = {
+            'dashboard': 'generate_performance_dashboard',
+            'circular': 'generate_circular_performance_chart',
+            'timeline': 'generate_interactive_timeline',
         }
+        
+        if not parallel:
+            return {name: getattr(self, method)(games, stats, data, profile) for name, method in renderers.items()}
+        
+        with ProcessPoolExecutor(max_workers=max_workers or len(renderers)) as executor:
+            futures = {name: executor.submit(_render_in_worker, self.charts_dir, method, games, stats, data, profile)
+                       for name, method in renderers.items()}
+            return {name: future.result() for name, future in futures.items()}
     
     def get_chart_url(self, chart_path: str) -> str:
         """Convierte la ruta del archivo en URL para Flask"""
@@ -1,11 +1,50 @@
+import os
+from datetime import timedelta
 from flask import Flask
 from flask_session import Session
+from modules.session_backends import CacheSessionInterface, MemorySessionCache, SQLiteSessionCache
 
 app = Flask("server")
 app.config['SECRET_KEY'] = 'tu_clave_secreta_aqui_2024'
+app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)
+
+# Backend de sesiones: 'memory' (un solo proceso), 'sqlite' (varios procesos) o 'filesystem'
+app.config['SESSION_BACKEND'] = os.environ.get('TRIVIA_SESSION_BACKEND', 'memory')
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SESSION_FILE_DIR'] = 'data/sessions'
 app.config['SESSION_FILE_THRESHOLD'] = 500
+app.config['SESSION_SQLITE_PATH'] = 'data/sessions.sqlite3'
+
+# Almacenamiento del historial: 'json' (snapshot + diario) o 'sqlite'
+app.config['HISTORY_BACKEND'] = os.environ.get('TRIVIA_HISTORY_BACKEND', 'json')
+
+# Cada cuántos segundos se verifica si cambió el archivo de frases ('0' desactiva la recarga)
+app.config['CORPUS_RELOAD_INTERVAL'] = float(os.environ.get('TRIVIA_CORPUS_RELOAD_INTERVAL', '5'))
+
+# Calcular al cargar el corpus las películas parecidas de las dificultades media y difícil
+# ('0' las calcula recién con la primera pregunta que las usa)
+app.config['SIMILAR_DISTRACTORS'] = os.environ.get('TRIVIA_SIMILAR_DISTRACTORS', '1') == '1'
+
+# Directorio de los reportes PDF (dentro de static/ para poder enlazar el último generado)
+app.config['REPORTS_DIR'] = os.environ.get('TRIVIA_REPORTS_DIR', 'static/reports')
+
+# Arrancar al inicio los procesos que renderizan gráficas ('0' para arrancarlos al primer pedido)
+app.config['CHARTS_WARM_UP'] = os.environ.get('TRIVIA_CHARTS_WARM_UP', '1') == '1'
+
+def configure_session_backend(app: Flask, backend: str):
+    """Instala en la aplicación el backend de sesiones indicado"""
+    timeout = int(app.config['PERMANENT_SESSION_LIFETIME'].total_seconds())
+    if backend == 'memory':
+        cache = MemorySessionCache(threshold=app.config['SESSION_FILE_THRESHOLD'],
+                                   default_timeout=timeout)
+        app.session_interface = CacheSessionInterface(cache)
+    elif backend == 'sqlite':
+        cache = SQLiteSessionCache(app.config['SESSION_SQLITE_PATH'], default_timeout=timeout)
+        app.session_interface = CacheSessionInterface(cache)
+    elif backend == 'filesystem':
+        # Inicializar la extensión de sesiones
+        Session(app)
+    else:
+        raise ValueError(f"Backend de sesiones desconocido: {backend}")
 
-# Inicializar la extensión de sesiones
-Session(app)
\ No newline at end of file
+configure_session_backend(app, app.config['SESSION_BACKEND'])
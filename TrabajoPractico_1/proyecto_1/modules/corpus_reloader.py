@@ -0,0 +1,49 @@
+import threading
+
+from modules.trivia_game import TriviaGame
+
+class CorpusReloader:
+    """Vigila el archivo de frases y recarga el corpus en un hilo aparte cuando cambia
+
+    La lectura del archivo y el armado del índice ocurren en este hilo; los pedidos siguen
+    usando la generación anterior hasta que la nueva se publica con un solo reemplazo.
+    """
+    def __init__(self, trivia_game: TriviaGame, interval: float = 5.0):
+        self.trivia_game = trivia_game
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Arranca el hilo de verificación (daemon: no impide cerrar el servidor)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='corpus-reloader', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de verificación"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> bool:
+        """Verifica una vez si el corpus cambió y lo recarga; retorna True si hubo recarga"""
+        try:
+            if self.trivia_game.reload_if_changed():
+                self.reloads += 1
+                print(f"Corpus recargado: generación {self.trivia_game.generation}, "
+                      f"{len(self.trivia_game.phrases_data)} frases")
+                return True
+        except Exception as e:
+            # Si la recarga falla se sigue usando la generación vigente
+            print(f"Error al recargar el corpus: {e}")
+            self.last_error = str(e)
+        return False
+
+    def _run(self):
+        """Bucle del hilo: verifica cada interval segundos hasta que se detenga"""
+        while not self._stop.wait(self.interval):
+            self.check()
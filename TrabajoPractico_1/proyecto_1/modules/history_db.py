@@ -0,0 +1,249 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from modules.history_index import PAGE_SIZE, decode_cursor, encode_cursor
+from modules.player_index import PlayerIndex, LEADERBOARD_SIZE
+from modules.history_stats import HistoryStats, START_TIME_FORMAT, parse_score, parse_start_time
+from modules.trivia_game import GameHistory, GameSession
+
+# Expresión SQL de cada orden del historial paginado (iguales a las claves de HistoryIndex)
+SORT_EXPRESSIONS = {
+    'date': "(started_at / 60)",
+    'score': "(CASE WHEN total > 0 THEN hits * 100.0 / total ELSE 0.0 END)",
+    'player': "username",
+}
+
+class SQLiteGameHistory:
+    """Historial de juegos en SQLite con columnas tipadas e índices por jugador y fecha
+
+    La base es la fuente de verdad: los agregados en memoria (stats y ranking) se ponen al
+    día con las partidas que insertó cualquier proceso antes de cada lectura, en orden de id,
+    así todos los procesos del servidor ven los mismos agregados y la misma versión.
+    """
+    def __init__(self, db_file: str = "data/game_history.sqlite3"):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+        self._stats, self._players, self._last_id = self._load_aggregates()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna la conexión del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=10)
+            # WAL permite lectores concurrentes mientras otro proceso escribe
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """Crea la tabla de partidas y sus índices si no existen"""
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    hits INTEGER NOT NULL,
+                    total INTEGER NOT NULL,
+                    started_at INTEGER NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_username ON games (username, started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_started_at ON games (started_at)")
+            # Un índice por orden (por expresión para fecha y porcentaje) para paginar sin ordenar la tabla
+            for sort, expression in SORT_EXPRESSIONS.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_games_sort_{sort} ON games ({expression})")
+
+    def _load_aggregates(self) -> Tuple[HistoryStats, PlayerIndex, int]:
+        """Construye los agregados y el índice por jugador con una sola pasada sobre la tabla
+
+        Returns:
+            tuple: (stats, índice por jugador, id de la última partida incorporada)
+        """
+        stats = HistoryStats()
+        last_id = 0
+        rows = self._connection().execute(
+            "SELECT id, username, hits, total, started_at FROM games ORDER BY id")
+
+        def parsed_rows():
+            nonlocal last_id
+            for game_id, username, hits, total, started_at in rows:
+                started_at = datetime.fromtimestamp(started_at)
+                stats.add_values(username, hits, total, started_at)
+                last_id = game_id
+                yield game_id, username, hits, total, started_at
+
+        players = PlayerIndex.from_values(parsed_rows())
+        return stats, players, last_id
+
+    def _catch_up(self):
+        """Incorpora a los agregados las partidas nuevas de la base (con el lock tomado)
+
+        Las partidas pueden venir de otros procesos; se aplican en orden de id, el mismo
+        orden de la carga inicial, para que la versión del historial coincida entre procesos.
+        """
+        rows = self._connection().execute(
+            "SELECT id, username, hits, total, started_at FROM games WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+        for game_id, username, hits, total, started_at in rows:
+            started_at = datetime.fromtimestamp(started_at)
+            self._stats.add_values(username, hits, total, started_at)
+            self._players.add_values(game_id, username, hits, total, started_at)
+            self._last_id = game_id
+
+    @property
+    def stats(self) -> HistoryStats:
+        """Agregados del historial, al día con la base"""
+        with self._lock:
+            self._catch_up()
+            return self._stats
+
+    @property
+    def players(self) -> PlayerIndex:
+        """Índice por jugador, al día con la base"""
+        with self._lock:
+            self._catch_up()
+            return self._players
+
+    @staticmethod
+    def _row_to_record(row) -> Dict:
+        """Convierte una fila en el diccionario que usa el resto de la aplicación"""
+        _, username, hits, total, started_at = row
+        return {
+            'username': username,
+            'score': f"{hits}/{total}",
+            'start_time': datetime.fromtimestamp(started_at).strftime(START_TIME_FORMAT),
+            'num_phrases': total
+        }
+
+    def _insert(self, conn: sqlite3.Connection, username: str, hits: int, total: int,
+                started_at: datetime) -> int:
+        """Inserta una partida y retorna su id (la transacción la maneja quien llama)"""
+        cursor = conn.execute(
+            "INSERT INTO games (username, hits, total, started_at) VALUES (?, ?, ?, ?)",
+            (username, hits, total, int(started_at.timestamp()))
+        )
+        return cursor.lastrowid
+
+    def add_game(self, session: GameSession):
+        """Agrega una nueva sesión al historial"""
+        with self._connection() as conn:
+            self._insert(conn, session.username, session.score, session.num_phrases, session.start_time)
+        # Los agregados se actualizan desde la base (incluye lo que insertaron otros procesos)
+        with self._lock:
+            self._catch_up()
+
+    def get_all_games(self) -> List[Dict]:
+        """Retorna todo el historial de juegos"""
+        rows = self._connection().execute(
+            "SELECT id, username, hits, total, started_at FROM games ORDER BY id"
+        ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def get_page(self, sort: str = 'date', descending: bool = True, cursor: Optional[str] = None,
+                 limit: int = PAGE_SIZE) -> Dict:
+        """Retorna una página del historial ordenado y el cursor de la página siguiente
+
+        Pagina por (clave, id) con comparación de filas, así cada página usa el índice del orden.
+        """
+        expression = SORT_EXPRESSIONS[sort]
+        direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+        after = decode_cursor(cursor, sort) if cursor else None
+        where = f"WHERE ({expression}, id) {comparison} (?, ?)" if after else ""
+        rows = self._connection().execute(
+            f"SELECT id, username, hits, total, started_at, {expression} FROM games {where} "
+            f"ORDER BY {expression} {direction}, id {direction} LIMIT ?",
+            (*(after or ()), limit + 1)
+        ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        games = [dict(self._row_to_record(row[:5]), number=row[0]) for row in rows]
+        next_cursor = encode_cursor(rows[-1][5], rows[-1][0]) if has_more else None
+        return {'games': games, 'next_cursor': next_cursor}
+
+    def get_leaderboard(self, k: int = LEADERBOARD_SIZE, min_games: int = 1) -> List[Dict]:
+        """Retorna los k mejores jugadores según el ranking del índice por jugador"""
+        with self._lock:
+            self._catch_up()
+            return self._players.leaderboard(k, min_games)
+
+    def get_player(self, username: str, recent: int = 10) -> Optional[Dict]:
+        """Retorna el perfil de un jugador con sus últimas partidas, o None si no existe
+
+        Las partidas se buscan por id (los números guardados en el índice del jugador).
+        """
+        with self._lock:
+            self._catch_up()
+            profile = self._players.get(username)
+            if profile is None:
+                return None
+            player = profile.to_dict()
+            ids = profile.numbers[-recent:].tolist() if recent > 0 else []
+        rows = self._connection().execute(
+            f"SELECT id, username, hits, total, started_at FROM games "
+            f"WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id DESC", ids
+        ).fetchall() if ids else []
+        recent_games = [dict(self._row_to_record(row), number=row[0]) for row in rows]
+        return dict(player, recent_games=recent_games)
+
+    def iter_games(self, chunk_size: int = 1000, limit: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Recorre el historial en bloques de chunk_size partidas, en orden de llegada
+
+        Pagina por id (keyset) para que cada bloque sea una consulta por índice, sin OFFSET.
+        """
+        last_id, remaining = 0, limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            rows = self._connection().execute(
+                "SELECT id, username, hits, total, started_at FROM games WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+            yield [self._row_to_record(row) for row in rows]
+
+    def count_games(self) -> int:
+        """Retorna la cantidad de partidas guardadas"""
+        return self._connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def migrate_from_json(self, history_file: str = "data/game_history.json") -> int:
+        """Importa el historial JSON (snapshot y diario) si la base está vacía
+
+        Returns:
+            int: cantidad de partidas importadas
+        """
+        if self.count_games() > 0:
+            print("La base de datos ya tiene partidas; no se migra nada")
+            return 0
+
+        games = GameHistory(history_file, journal=True).get_all_games()
+        with self._connection() as conn:
+            for game in games:
+                hits, total = parse_score(game.get('score'))
+                started_at = parse_start_time(game.get('start_time')) or datetime.fromtimestamp(0)
+                self._insert(conn, game.get('username', 'Usuario'), hits, total, started_at)
+        with self._lock:
+            self._stats, self._players, self._last_id = self._load_aggregates()
+        return len(games)
+
+# Migración única: python -m modules.history_db [data/game_history.json] [data/game_history.sqlite3]
+if __name__ == "__main__":
+    json_file = sys.argv[1] if len(sys.argv) > 1 else "data/game_history.json"
+    db_file = sys.argv[2] if len(sys.argv) > 2 else "data/game_history.sqlite3"
+
+    migrated = SQLiteGameHistory(db_file).migrate_from_json(json_file)
+    print(f"✅ {migrated} partidas migradas de {json_file} a {db_file}")
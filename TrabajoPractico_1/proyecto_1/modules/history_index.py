@@ -0,0 +1,93 @@
+import base64
+import bisect
+import json
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from modules.history_stats import parse_score, parse_start_time
+
+# Ordenamientos disponibles para el historial paginado
+SORT_FIELDS = ('date', 'score', 'player')
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(key, seq: int) -> str:
+    """Codifica la última fila de una página (clave de orden, número) como cursor opaco"""
+    return base64.urlsafe_b64encode(json.dumps([key, seq]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Tuple]:
+    """Decodifica un cursor; retorna None si es inválido o no corresponde al orden pedido"""
+    try:
+        key, seq = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    expected = str if sort == 'player' else (int, float)
+    if not isinstance(key, expected) or isinstance(key, bool) or not isinstance(seq, int):
+        return None
+    return key, seq
+
+def game_sort_keys(game: Dict) -> Tuple[float, float, str]:
+    """Claves de orden de una partida: fecha (minutos desde 1970), porcentaje y jugador"""
+    started_at = parse_start_time(game.get('start_time'))
+    hits, total = parse_score(game.get('score'))
+    date_key = started_at.timestamp() // 60 if started_at else 0.0
+    score_key = hits / total * 100 if total > 0 else 0.0
+    return date_key, score_key, game.get('username', 'Usuario')
+
+class HistoryIndex:
+    """Índices ordenados del historial en memoria para paginar con cursores (keyset)
+
+    Por cada orden se guarda un array con los números de partida ordenados por
+    (clave, número); las búsquedas son bisect y cada partida nueva se inserta en su lugar.
+    """
+    def __init__(self):
+        self.date_keys = array('d')
+        self.score_keys = array('d')
+        self.players = []
+        self.order = {field: array('l') for field in SORT_FIELDS}
+
+    @classmethod
+    def from_games(cls, games: List[Dict]) -> 'HistoryIndex':
+        """Construye los índices ordenando una sola vez todas las partidas"""
+        index = cls()
+        for game in games:
+            date_key, score_key, player = game_sort_keys(game)
+            index.date_keys.append(date_key)
+            index.score_keys.append(score_key)
+            index.players.append(player)
+        for field in SORT_FIELDS:
+            index.order[field] = array('l', sorted(range(len(games)), key=index._key_function(field)))
+        return index
+
+    def _key_function(self, field: str):
+        """Función de clave (valor, número) de un orden, usada para ordenar y para bisect"""
+        keys = {'date': self.date_keys, 'score': self.score_keys, 'player': self.players}[field]
+        return lambda seq: (keys[seq], seq)
+
+    def add(self, game: Dict):
+        """Agrega la partida siguiente del historial a todos los índices"""
+        seq = len(self.players)
+        date_key, score_key, player = game_sort_keys(game)
+        self.date_keys.append(date_key)
+        self.score_keys.append(score_key)
+        self.players.append(player)
+        for field in SORT_FIELDS:
+            bisect.insort(self.order[field], seq, key=self._key_function(field))
+
+    def page(self, sort: str = 'date', descending: bool = True, after: Optional[Tuple] = None,
+             limit: int = PAGE_SIZE) -> Tuple[List[int], Optional[str]]:
+        """Retorna los números de partida de una página y el cursor de la siguiente (o None)"""
+        order = self.order[sort]
+        key_function = self._key_function(sort)
+        if descending:
+            end = len(order) if after is None else bisect.bisect_left(order, tuple(after), key=key_function)
+            start = max(0, end - limit)
+            seqs = order[start:end][::-1].tolist()
+            has_more = start > 0
+        else:
+            start = 0 if after is None else bisect.bisect_right(order, tuple(after), key=key_function)
+            seqs = order[start:start + limit].tolist()
+            has_more = start + limit < len(order)
+
+        next_cursor = encode_cursor(*key_function(seqs[-1])) if seqs and has_more else None
+        return seqs, next_cursor
@@ -0,0 +1,149 @@
+import copy
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Formato de fecha con que se guardan las partidas en el historial
+START_TIME_FORMAT = "%d/%m/%y %H:%M"
+
+def parse_score(score_str: str) -> Tuple[int, int]:
+    """Convierte un string de puntuación '3/5' en tupla (aciertos, total)"""
+    try:
+        hits, total = map(int, score_str.split('/'))
+        return hits, total
+    except (ValueError, AttributeError):
+        return 0, 0
+
+def parse_start_time(start_time: str) -> Optional[datetime]:
+    """Convierte la fecha 'dd/mm/aa hh:mm' del historial en datetime"""
+    try:
+        return datetime.strptime(start_time, START_TIME_FORMAT)
+    except (ValueError, TypeError):
+        return None
+
+class HistoryStats:
+    """Estadísticas agregadas del historial, actualizadas con cada partida nueva"""
+    def __init__(self):
+        self.total_games = 0
+        self.total_hits = 0
+        self.total_misses = 0
+        self.total_phrases = 0
+        self.percent_sum = 0.0
+
+        # Sumas y conteos por jugador
+        self.player_games = {}
+        self.player_hits = {}
+        self.player_totals = {}
+
+        # Mejor y peor partida como (porcentaje, jugador)
+        self.best = None
+        self.worst = None
+
+        # Histograma de partidas y suma de porcentajes por hora del día
+        self.hourly_games = [0] * 24
+        self.hourly_percent_sum = [0.0] * 24
+
+        # Hash encadenado de todas las partidas: identifica el contenido del historial
+        self._digest = hashlib.sha1()
+        self._frozen_version = None
+
+    def __getstate__(self) -> Dict:
+        """Permite enviar las estadísticas a otro proceso (el hash no se puede serializar)"""
+        state = self.__dict__.copy()
+        state['_frozen_version'] = self.version()
+        state['_digest'] = None
+        return state
+
+    @classmethod
+    def from_games(cls, games: List[Dict]) -> 'HistoryStats':
+        """Construye las estadísticas recorriendo una sola vez una lista de partidas"""
+        stats = cls()
+        for game in games:
+            stats.add(game)
+        return stats
+
+    def add(self, game: Dict):
+        """Incorpora una partida con el formato del historial ('3/5', 'dd/mm/aa hh:mm')"""
+        hits, total = parse_score(game.get('score'))
+        self.add_values(game.get('username', 'Usuario'), hits, total,
+                        parse_start_time(game.get('start_time')),
+                        game.get('num_phrases', total))
+
+    def add_values(self, username: str, hits: int, total: int, started_at: Optional[datetime],
+                   num_phrases: Optional[int] = None):
+        """Incorpora una partida ya parseada"""
+        percent = (hits / total * 100) if total > 0 else 0
+
+        self.total_games += 1
+        self.total_hits += hits
+        self.total_misses += total - hits
+        self.total_phrases += total if num_phrases is None else num_phrases
+        self.percent_sum += percent
+
+        self.player_games[username] = self.player_games.get(username, 0) + 1
+        self.player_hits[username] = self.player_hits.get(username, 0) + hits
+        self.player_totals[username] = self.player_totals.get(username, 0) + total
+
+        if self.best is None or percent > self.best[0]:
+            self.best = (percent, username)
+        if self.worst is None or percent < self.worst[0]:
+            self.worst = (percent, username)
+
+        if started_at is not None:
+            self.hourly_games[started_at.hour] += 1
+            self.hourly_percent_sum[started_at.hour] += percent
+
+        if self._digest is not None:
+            stamp = started_at.strftime('%Y%m%d%H%M') if started_at else ''
+            self._digest.update(f"{username}|{hits}|{total}|{stamp}\n".encode('utf-8'))
+
+    def snapshot(self) -> 'HistoryStats':
+        """Copia fija de las estadísticas actuales (no cambia al agregar partidas)"""
+        return copy.deepcopy(self)
+
+    def version(self) -> str:
+        """Retorna un identificador del contenido actual del historial
+
+        Cambia con cada partida agregada y es igual entre reinicios si el historial no cambió.
+        """
+        if self._digest is None:
+            return self._frozen_version
+        return f"{self.total_games}-{self._digest.hexdigest()[:16]}"
+
+    def unique_players(self) -> int:
+        """Retorna la cantidad de jugadores distintos"""
+        return len(self.player_games)
+
+    def accuracy(self) -> float:
+        """Retorna el porcentaje global de aciertos sobre todas las respuestas"""
+        answered = self.total_hits + self.total_misses
+        return (self.total_hits / answered * 100) if answered > 0 else 0
+
+    def average_percent(self) -> float:
+        """Retorna el promedio de los porcentajes de aciertos por partida"""
+        return self.percent_sum / self.total_games if self.total_games else 0
+
+    def player_accuracy(self, username: str) -> float:
+        """Retorna el porcentaje de aciertos acumulado de un jugador"""
+        total = self.player_totals.get(username, 0)
+        return (self.player_hits.get(username, 0) / total * 100) if total > 0 else 0
+
+    def hourly_average(self) -> List[float]:
+        """Retorna el porcentaje promedio por hora del día (0 si no hubo partidas)"""
+        return [percent_sum / games if games else 0
+                for games, percent_sum in zip(self.hourly_games, self.hourly_percent_sum)]
+
+    def to_dict(self) -> Dict:
+        """Resumen serializable para plantillas y respuestas JSON"""
+        return {
+            'total_games': self.total_games,
+            'unique_players': self.unique_players(),
+            'total_hits': self.total_hits,
+            'total_misses': self.total_misses,
+            'total_phrases': self.total_phrases,
+            'accuracy': self.accuracy(),
+            'average_percent': self.average_percent(),
+            'best': self.best,
+            'worst': self.worst,
+            'version': self.version()
+        }
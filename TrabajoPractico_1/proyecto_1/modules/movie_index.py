@@ -0,0 +1,131 @@
+import bisect
+import threading
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Títulos por página en /listar_peliculas y /api/movies
+MOVIES_PAGE_SIZE = 60
+MAX_MOVIES_PAGE_SIZE = 500
+# Largo máximo de una búsqueda (más largo no aporta y encarece la verificación)
+MAX_QUERY_LENGTH = 100
+TRIGRAM = 3
+# Si el trigrama más raro de la búsqueda está en más títulos que esto, se intersecta con el segundo
+INTERSECT_MIN_POSTINGS = 64
+
+def fold_title(text: str) -> str:
+    """Forma normalizada de un título para buscar: sin tildes, casefold y espacios simples"""
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
+
+class MovieIndex:
+    """Índice de títulos: búsqueda exacta, por prefijo y por subcadena (trigramas)
+
+    Los ids son las posiciones en movie_names; el índice no cambia una vez armado.
+    """
+    def __init__(self, movie_names: List[str]):
+        self.movie_names = movie_names
+        # Búsqueda exacta sin distinguir mayúsculas
+        self.exact_ids: Dict[str, int] = {}
+        for movie_id, name in enumerate(movie_names):
+            self.exact_ids.setdefault(name.casefold(), movie_id)
+
+        # Títulos normalizados ordenados para buscar por prefijo con bisect
+        self.folded = [fold_title(name) for name in movie_names]
+        order = sorted(range(len(movie_names)), key=self.folded.__getitem__)
+        self.sorted_keys = [self.folded[movie_id] for movie_id in order]
+        self.sorted_ids = array('i', order)
+
+        # Trigramas -> ids en orden ascendente; se arman aparte (warm_up) o al primer uso
+        self._trigrams: Optional[Dict[str, array]] = None
+        self._trigrams_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.movie_names)
+
+    def find(self, name: str) -> Optional[int]:
+        """Id de la película con ese nombre exacto, sin distinguir mayúsculas"""
+        return self.exact_ids.get(name.casefold())
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Posiciones [desde, hasta) en sorted_keys de los títulos que empiezan con prefix (normalizado)"""
+        first = bisect.bisect_left(self.sorted_keys, prefix)
+        last = bisect.bisect_left(self.sorted_keys, prefix + '\U0010ffff', first)
+        return first, last
+
+    def trigrams(self) -> Dict[str, array]:
+        """Índice invertido de trigramas de los títulos normalizados"""
+        if self._trigrams is None:
+            with self._trigrams_lock:
+                if self._trigrams is None:
+                    postings = {}
+                    for movie_id, key in enumerate(self.folded):
+                        for trigram in {key[i:i + TRIGRAM] for i in range(len(key) - TRIGRAM + 1)}:
+                            ids = postings.get(trigram)
+                            if ids is None:
+                                postings[trigram] = ids = []
+                            ids.append(movie_id)
+                    self._trigrams = {trigram: array('i', ids) for trigram, ids in postings.items()}
+        return self._trigrams
+
+    def warm_up(self):
+        """Arma el índice de trigramas en un hilo aparte para que la primera búsqueda no lo espere"""
+        threading.Thread(target=self.trigrams, daemon=True).start()
+
+    def _candidates(self, key: str):
+        """Ids (ascendentes) que tienen todos los trigramas de key; hay que verificarlos"""
+        trigrams = self.trigrams()
+        postings = []
+        for i in range(len(key) - TRIGRAM + 1):
+            ids = trigrams.get(key[i:i + TRIGRAM])
+            if ids is None:
+                return ()
+            postings.append(ids)
+        postings.sort(key=len)
+        if len(postings) > 1 and len(postings[0]) > INTERSECT_MIN_POSTINGS:
+            return sorted(set(postings[0]).intersection(postings[1]))
+        return postings[0]
+
+    def search(self, query: str, offset: int = 0, limit: int = MOVIES_PAGE_SIZE) -> Tuple[List[int], bool]:
+        """Busca títulos que contengan query (sin tildes ni mayúsculas)
+
+        Primero van los que empiezan con query, en orden alfabético, y después el resto de
+        los que lo contienen, en el orden de movie_names. Sin query se recorre el catálogo.
+        El costo depende del tamaño de la página, no de la cantidad de coincidencias.
+
+        Returns:
+            tuple: (ids de la página, si hay más resultados después de ella)
+        """
+        key = fold_title(query[:MAX_QUERY_LENGTH])
+        if not key:
+            end = min(offset + limit, len(self))
+            return list(range(offset, end)), end < len(self)
+
+        # Por prefijo: un rango contiguo de los títulos ordenados
+        first, last = self.prefix_range(key)
+        page = self.sorted_ids[min(first + offset, last):min(first + offset + limit, last)].tolist()
+        if first + offset + limit < last:
+            return page, True
+        if len(key) < TRIGRAM:
+            return page, False
+
+        # Por subcadena: los candidatos de los trigramas que contienen key sin empezar con ella;
+        # se busca uno más de los que entran en la página para saber si hay más
+        skip = max(offset - (last - first), 0)
+        wanted = limit - len(page) + 1
+        folded = self.folded
+        matches = []
+        for movie_id in self._candidates(key):
+            title = folded[movie_id]
+            if key in title and not title.startswith(key):
+                if skip:
+                    skip -= 1
+                    continue
+                matches.append(movie_id)
+                if len(matches) == wanted:
+                    break
+        has_more = len(matches) == wanted
+        page.extend(matches[:wanted - 1])
+        return page, has_more
@@ -4,15 +4,230 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.pdfgen import canvas
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict, Optional
+from modules.history_stats import HistoryStats
+
+# Cambiar al modificar el contenido o el diseño del reporte: invalida los PDFs cacheados
+TEMPLATE_VERSION = 1
+
+# Retención de reportes: se desalojan los usados hace más tiempo (LRU)
+MAX_REPORTS = 20
+MAX_REPORTS_BYTES = 50 * 1024 * 1024
+
+# Diseño de las tablas del reporte completo (en puntos; A4 mide 595 x 842)
+FULL_REPORT_MARGIN = 50
+FULL_REPORT_ROW_HEIGHT = 16
+FULL_REPORT_COLUMNS = [('#', 0.9*inch), ('Jugador', 1.8*inch), ('Puntuación', 1*inch),
+                       ('Frases', 0.8*inch), ('Fecha', 1.3*inch)]
+FULL_REPORT_SUMMARY_HEIGHT = 130  # espacio del título y el resumen en la primera página
+
+try:
+    import fcntl
+except ImportError:  # Windows: se bloquea el primer byte del archivo con msvcrt
+    fcntl = None
+    import msvcrt
+
+def _lock_file(file):
+    """Bloqueo exclusivo entre procesos sobre un archivo abierto (espera si otro lo tiene)"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+def _unlock_file(file):
+    """Libera el bloqueo tomado con _lock_file"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
 
 class GameReportPDF:
-    def __init__(self, output_dir: str = "static/reports"):
+    def __init__(self, output_dir: str = "static/reports", max_reports: int = MAX_REPORTS,
+                 max_bytes: int = MAX_REPORTS_BYTES):
         self.output_dir = output_dir
+        self.max_reports = max_reports
+        self.max_bytes = max_bytes
         os.makedirs(output_dir, exist_ok=True)
         
+        # Índice de reportes: nombre -> datos, ordenado del usado hace más tiempo al más reciente.
+        # Lo comparten todos los procesos del servidor: cada cambio se hace con el archivo de
+        # bloqueo tomado y sobre el índice recién leído del disco, así nadie pisa al otro
+        self.manifest_file = os.path.join(output_dir, 'reports_manifest.json')
+        self.lock_file = os.path.join(output_dir, 'reports_manifest.lock')
+        self._lock = threading.Lock()
+        self._reports = OrderedDict()
+        self._latest = {}  # tipo -> nombre del último reporte generado
+        self._total_bytes = 0
+        self._manifest_stamp = None  # (mtime, tamaño) del índice leído por última vez
+        self._load_manifest()
+    
+    @contextmanager
+    def _manifest_update(self):
+        """Bloquea el índice entre procesos, lo relee del disco y lo guarda al salir"""
+        with self._lock, open(self.lock_file, 'a+b') as lock:
+            _lock_file(lock)
+            try:
+                self._refresh_manifest(force=True)
+                yield
+                self._save_manifest()
+            finally:
+                _unlock_file(lock)
+    
+    def _read_manifest(self) -> Optional[Dict]:
+        """Lee el índice del disco; None si no existe o está dañado"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            return {'reports': list(manifest['reports']), 'latest': dict(manifest.get('latest', {}))}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+    
+    def _apply_manifest(self, manifest: Dict):
+        """Reemplaza el índice en memoria por el leído del disco (con el lock tomado)"""
+        self._reports = OrderedDict((report['filename'], report) for report in manifest['reports'])
+        self._total_bytes = sum(report['size'] for report in self._reports.values())
+        self._latest = {kind: name for kind, name in manifest['latest'].items() if name in self._reports}
+    
+    def _manifest_changed(self) -> bool:
+        """Indica si otro proceso reescribió el índice desde la última lectura"""
+        try:
+            info = os.stat(self.manifest_file)
+        except FileNotFoundError:
+            return False
+        return (info.st_mtime_ns, info.st_size) != self._manifest_stamp
+    
+    def _refresh_manifest(self, force: bool = False):
+        """Relee el índice si cambió en el disco (con el lock tomado)
+
+        Antes de modificarlo se relee siempre: la fecha de modificación puede no
+        distinguir dos escrituras muy seguidas del mismo tamaño.
+        """
+        if force or self._manifest_changed():
+            manifest = self._read_manifest()
+            if manifest is not None:
+                self._apply_manifest(manifest)
+                info = os.stat(self.manifest_file)
+                self._manifest_stamp = (info.st_mtime_ns, info.st_size)
+    
+    def _load_manifest(self):
+        """Carga el índice de reportes; si no existe lo reconstruye una vez desde el directorio"""
+        with self._manifest_update():
+            if self._manifest_stamp is None:
+                reports = []
+                with os.scandir(self.output_dir) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('reporte_') and entry.name.endswith('.pdf') and entry.is_file():
+                            info = entry.stat()
+                            reports.append({'filename': entry.name, 'version': None,
+                                            'kind': entry.name.split('_')[1], 'size': info.st_size,
+                                            'created_at': info.st_mtime, 'last_used': info.st_mtime})
+                reports.sort(key=lambda report: report['last_used'])
+                self._apply_manifest({'reports': reports,
+                                      'latest': {report['kind']: report['filename'] for report in reports}})
+            
+            for filename in list(self._reports):
+                if not os.path.exists(os.path.join(self.output_dir, filename)):
+                    self._forget(filename)
+    
+    def _save_manifest(self):
+        """Guarda el índice de forma atómica (con el lock y el archivo de bloqueo tomados)"""
+        tmp_file = f"{self.manifest_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump({'reports': list(self._reports.values()), 'latest': self._latest}, file, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+        info = os.stat(self.manifest_file)
+        self._manifest_stamp = (info.st_mtime_ns, info.st_size)
+    
+    def get_report_path(self, version: str, kind: str = 'trivia') -> str:
+        """Ruta del reporte de una versión del historial (direccionada por contenido)"""
+        key = hashlib.sha1(f"{version}|{TEMPLATE_VERSION}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.output_dir, f"reporte_{kind}_{key}.pdf")
+    
+    def get_cached_report(self, version: str, kind: str = 'trivia') -> Optional[str]:
+        """Retorna el reporte ya generado para la versión, marcándolo como usado, o None"""
+        filepath = self.get_report_path(version, kind)
+        filename = os.path.basename(filepath)
+        with self._lock:
+            # Sin cambios en el disco y sin el reporte no hace falta bloquear el índice
+            if filename not in self._reports and not self._manifest_changed():
+                return None
+        with self._manifest_update():
+            report = self._reports.get(filename)
+            if report is None:
+                return None
+            if not os.path.exists(filepath):
+                # Borrado desde afuera: se olvida
+                self._forget(filename)
+                return None
+            report['last_used'] = time.time()
+            self._reports.move_to_end(filename)
+        return filepath
+    
+    def get_latest_report(self, kind: str = 'trivia') -> Optional[Dict]:
+        """Retorna los datos del último reporte generado de un tipo (sin recorrer el directorio)"""
+        with self._lock:
+            self._refresh_manifest()
+            report = self._reports.get(self._latest.get(kind))
+            return dict(report, path=os.path.join(self.output_dir, report['filename'])) if report else None
+    
+    def _forget(self, filename: str):
+        """Quita un reporte del índice (con el lock tomado)"""
+        report = self._reports.pop(filename)
+        self._total_bytes -= report['size']
+        for kind, latest in list(self._latest.items()):
+            if latest == filename:
+                del self._latest[kind]
+    
+    def _discard_tmp(self, tmp_path: str):
+        """Borra el temporal de un reporte que no llegó a renombrarse (falló la generación)"""
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error al borrar el temporal {tmp_path}: {e}")
+    
+    def _register_report(self, filepath: str, version: str, kind: str):
+        """Agrega un reporte recién generado al índice y aplica la política de retención
+        
+        Se borran los reportes usados hace más tiempo hasta respetar los límites de cantidad y
+        tamaño; como el índice se relee antes, cuentan también los usos de los otros procesos.
+        """
+        filename = os.path.basename(filepath)
+        now = time.time()
+        with self._manifest_update():
+            if filename in self._reports:
+                self._forget(filename)
+            self._reports[filename] = {'filename': filename, 'version': version, 'kind': kind,
+                                       'size': os.path.getsize(filepath), 'created_at': now, 'last_used': now}
+            self._total_bytes += self._reports[filename]['size']
+            self._latest[kind] = filename
+            
+            for old_name in list(self._reports):
+                if len(self._reports) <= self.max_reports and self._total_bytes <= self.max_bytes:
+                    break
+                if old_name == filename:
+                    continue
+                try:
+                    os.remove(os.path.join(self.output_dir, old_name))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Error al borrar el reporte {old_name}: {e}")
+                    continue
+                self._forget(old_name)
+        
     def _create_title_style(self):
         """Crea estilo para títulos principales"""
         title_style = ParagraphStyle(
@@ -66,18 +281,28 @@ class GameReportPDF:
         ])
         return table_style
     
-    def generate_report(self, games: List[Dict], charts_paths: Dict[str, str]) -> str:
-        """Genera un reporte PDF completo con gráficas y estadísticas"""
+    def generate_report(self, games: List[Dict], charts_paths: Dict[str, str],
+                        stats: HistoryStats = None) -> str:
+        """Genera un reporte PDF completo con gráficas y estadísticas
+        
+        Si se pasan los agregados del historial (stats) no se recorre la lista de partidas
+        para calcular los totales. El archivo se identifica por la versión del historial y
+        TEMPLATE_VERSION: si ya existe se retorna sin volver a generarlo.
+        """
         if not games:
             return None
-            
-        # Crear nombre del archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"reporte_trivia_{timestamp}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
+        if stats is None:
+            stats = HistoryStats.from_games(games)
+        
+        # Reutilizar el reporte si el historial no cambió
+        filepath = self.get_cached_report(stats.version())
+        if filepath:
+            return filepath
+        filepath = self.get_report_path(stats.version())
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
         
-        # Crear documento PDF
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        # Crear documento PDF (en un temporal, para no servir nunca un archivo a medias)
+        doc = SimpleDocTemplate(tmp_path, pagesize=A4)
         story = []
         
         # Estilos
@@ -101,8 +326,8 @@ class GameReportPDF:
         subtitle1 = Paragraph("📊 Resumen Ejecutivo", subtitle_style)
         story.append(subtitle1)
         
-        total_games = len(games)
-        unique_players = len(set(game['username'] for game in games))
+        total_games = stats.total_games
+        unique_players = stats.unique_players()
         
         summary_text = f"""
         Este reporte presenta un análisis completo de la actividad del juego Trivia de Películas.
@@ -200,23 +425,11 @@ class GameReportPDF:
         subtitle6 = Paragraph("📈 Estadísticas Detalladas", subtitle_style)
         story.append(subtitle6)
         
-        # Calcular estadísticas
-        total_phrases = sum(game['num_phrases'] for game in games)
-        total_aciertos = 0
-        total_desaciertos = 0
-        
-        for game in games:
-            try:
-                aciertos, total = map(int, game['score'].split('/'))
-                total_aciertos += aciertos
-                total_desaciertos += (total - aciertos)
-            except:
-                continue
-        
-        if total_aciertos + total_desaciertos > 0:
-            porcentaje_aciertos = (total_aciertos / (total_aciertos + total_desaciertos)) * 100
-        else:
-            porcentaje_aciertos = 0
+        # Estadísticas ya agregadas
+        total_phrases = stats.total_phrases
+        total_aciertos = stats.total_hits
+        total_desaciertos = stats.total_misses
+        porcentaje_aciertos = stats.accuracy()
         
         stats_text = f"""
         • Total de frases respondidas: {total_phrases}
@@ -238,14 +451,125 @@ class GameReportPDF:
         )
         story.append(footer)
         
-        # Construir PDF
-        doc.build(story)
+        # Construir PDF; si falla no queda el temporal a medias
+        try:
+            doc.build(story)
+            os.replace(tmp_path, filepath)
+        finally:
+            self._discard_tmp(tmp_path)
+        self._register_report(filepath, stats.version(), 'trivia')
+        
+        return filepath
+    
+    def _iter_pages(self, chunks: Iterable[List[Dict]], first_page_rows: int,
+                    rows_per_page: int) -> Iterator[List[Dict]]:
+        """Reagrupa los bloques del historial en páginas; nunca guarda más de una página"""
+        page, capacity = [], first_page_rows
+        for chunk in chunks:
+            for game in chunk:
+                page.append(game)
+                if len(page) == capacity:
+                    yield page
+                    page, capacity = [], rows_per_page
+        if page or capacity == first_page_rows:
+            yield page
+    
+    def _create_full_table_style(self):
+        """Crea estilo para las tablas del reporte completo (filas de alto fijo, letra chica)"""
+        table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ])
+        return table_style
+    
+    def _draw_table_page(self, pdf: canvas.Canvas, games: List[Dict], first_number: int, top: float,
+                         table_style: TableStyle):
+        """Dibuja una tabla de partidas desde la altura top, con la cabecera de columnas"""
+        rows = [[header for header, _ in FULL_REPORT_COLUMNS]]
+        rows.extend([str(first_number + offset), str(game.get('username', ''))[:24], str(game.get('score', '')),
+                     str(game.get('num_phrases', '')), str(game.get('start_time', ''))]
+                    for offset, game in enumerate(games))
+        table = Table(rows, colWidths=[width for _, width in FULL_REPORT_COLUMNS],
+                      rowHeights=FULL_REPORT_ROW_HEIGHT)
+        table.setStyle(table_style)
+        table_width, table_height = table.wrapOn(pdf, A4[0], A4[1])
+        table.drawOn(pdf, (A4[0] - table_width) / 2, top - table_height)
+    
+    def generate_full_report(self, chunks: Iterable[List[Dict]], stats: HistoryStats) -> str:
+        """Genera un PDF con todas las partidas del historial, una tabla por página
+        
+        Las partidas se leen por bloques (p. ej. game_history.iter_games()) y sólo se arma
+        la tabla de una página a la vez: el canvas conserva hasta el final únicamente el
+        contenido ya comprimido de cada página, así que la memoria casi no crece con el historial.
+        """
+        filepath = self.get_cached_report(stats.version(), 'completo')
+        if filepath:
+            return filepath
+        filepath = self.get_report_path(stats.version(), 'completo')
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        
+        page_width, page_height = A4
+        table_top = page_height - FULL_REPORT_MARGIN
+        usable_height = table_top - FULL_REPORT_MARGIN - 20  # 20 para el pie de página
+        rows_per_page = int(usable_height // FULL_REPORT_ROW_HEIGHT) - 1
+        first_page_rows = int((usable_height - FULL_REPORT_SUMMARY_HEIGHT) // FULL_REPORT_ROW_HEIGHT) - 1
+        table_style = self._create_full_table_style()
+        
+        try:
+            pdf = canvas.Canvas(tmp_path, pagesize=A4, pageCompression=1)
+            pdf.setTitle("Historial completo - Trivia de Películas")
+            number = 1
+            top = table_top - FULL_REPORT_SUMMARY_HEIGHT
+            for page_number, games in enumerate(self._iter_pages(chunks, first_page_rows, rows_per_page), 1):
+                if page_number == 1:
+                    # Título y resumen en la primera página
+                    pdf.setFont('Helvetica-Bold', 20)
+                    pdf.setFillColor(colors.darkblue)
+                    pdf.drawCentredString(page_width / 2, table_top - 20, "Historial Completo de Partidas")
+                    pdf.setFont('Helvetica', 11)
+                    pdf.setFillColor(colors.black)
+                    summary = [
+                        f"Generado el: {datetime.now().strftime('%d/%m/%Y a las %H:%M')}",
+                        f"Total de partidas: {stats.total_games}  ·  Jugadores únicos: {stats.unique_players()}",
+                        f"Porcentaje de aciertos: {stats.accuracy():.1f}%",
+                    ]
+                    for line_number, line in enumerate(summary):
+                        pdf.drawString(FULL_REPORT_MARGIN, table_top - 55 - line_number * 18, line)
+                
+                if games:
+                    self._draw_table_page(pdf, games, number, top, table_style)
+                    number += len(games)
+                else:
+                    pdf.setFont('Helvetica', 12)
+                    pdf.drawCentredString(page_width / 2, top - 20, "No hay partidas registradas")
+                pdf.setFont('Helvetica', 8)
+                pdf.setFillColor(colors.grey)
+                pdf.drawCentredString(page_width / 2, FULL_REPORT_MARGIN / 2, f"Página {page_number}")
+                pdf.setFillColor(colors.black)
+                pdf.showPage()
+                top = table_top
+            pdf.save()
         
+            os.replace(tmp_path, filepath)
+        finally:
+            self._discard_tmp(tmp_path)
+        self._register_report(filepath, stats.version(), 'completo')
         return filepath
     
     def get_report_url(self, report_path: str) -> str:
-        """Convierte la ruta del archivo en URL para Flask"""
+        """Convierte la ruta del archivo en URL para Flask (None si no está dentro de static/)"""
         if report_path and os.path.exists(report_path):
-            filename = os.path.basename(report_path)
-            return f'/static/reports/{filename}'
+            relative = os.path.relpath(report_path, 'static')
+            if not relative.startswith(os.pardir):
+                return '/static/' + relative.replace(os.sep, '/')
         return None
@@ -0,0 +1,339 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from modules.similarity_index import NEIGHBORS_PER_MOVIE, build_neighbors
+
+# Corpus compilado: encabezado, offsets de las frases, ids de título y de película por
+# frase, vecinos de cada película, texto de las frases y tablas de títulos y películas
+# separadas por '\n' (little-endian, cada sección alineada a 8 bytes)
+CORPUS_MAGIC = b'TRIVCORP'
+CORPUS_FORMAT_VERSION = 2
+# magic, versión, vecinos por película, frases, títulos, películas, bytes de las tablas de
+# títulos y películas, tamaño y mtime (ns) del texto fuente
+CORPUS_HEADER = struct.Struct('<8sIIQQQQQQq')
+
+def compiled_path_for(text_path: str) -> str:
+    """Ruta del corpus compilado que corresponde a un archivo de texto"""
+    return os.path.splitext(text_path)[0] + '.bin'
+
+class PhraseStore(Sequence):
+    """Frases del corpus en memoria compacta, direccionables por id entero
+
+    El texto de todas las frases va en un único buffer UTF-8 con un array de offsets,
+    y cada frase guarda un id int32 en la tabla de títulos de película (cada título se
+    guarda una sola vez). Se comporta como la lista de diccionarios {'phrase', 'movie'}
+    anterior, pero cada diccionario se arma recién al pedirlo.
+
+    Cargado desde un corpus compilado, el buffer y los arrays son vistas de un mmap de
+    sólo lectura: los procesos que abren el mismo archivo comparten esas páginas.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array('q', [0])
+        self.title_ids = array('i')
+        self.movie_titles = []
+        self._title_lookup = {}
+
+        # (nombres en minúsculas ordenados, id de película por frase) y (k, vecinos de cada
+        # película), calculados al pedirlos o precalculados en el corpus compilado
+        self._folded = None
+        self._neighbors = None
+        self._mmap = None
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, str]]) -> 'PhraseStore':
+        """Construye el almacén a partir de pares (frase, película)"""
+        store = cls()
+        for phrase, movie in pairs:
+            store.append(phrase, movie)
+        return store
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PhraseStore':
+        """Lee un archivo de texto con una línea 'frase;película' por frase"""
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls.from_pairs(parse_lines(file))
+
+    @classmethod
+    def from_compiled(cls, path: str) -> 'PhraseStore':
+        """Abre un corpus compilado con mmap (sin copiar frases ni offsets a memoria propia)
+
+        Raises:
+            ValueError: si el archivo no es un corpus compilado válido
+        """
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if sys.byteorder != 'little':
+                raise ValueError("los arrays del corpus compilado son little-endian")
+            view = memoryview(mapped)
+            header = read_header(view)
+            if header is None:
+                raise ValueError(f"{path} no es un corpus compilado de esta versión")
+            neighbors_k = header[2]
+            num_phrases, num_titles, num_movies, titles_bytes, movies_bytes = header[3:8]
+
+            reader = _SectionReader(view, CORPUS_HEADER.size)
+            offsets = reader.array('q', num_phrases + 1)
+            title_ids = reader.array('i', num_phrases)
+            movie_ids = reader.array('i', num_phrases)
+            neighbors = reader.array('i', num_movies * neighbors_k)
+            buffer = reader.bytes(offsets[-1])
+            movie_titles = _split_lines(reader.bytes(titles_bytes), num_titles)
+            movie_names = _split_lines(reader.bytes(movies_bytes), num_movies)
+        except (ValueError, TypeError, IndexError, struct.error) as e:
+            # El mmap se libera junto con las vistas (no se puede cerrar mientras existan)
+            raise ValueError(f"Corpus compilado inválido {path}: {e}")
+
+        store = cls()
+        store._mmap = mapped
+        store._buffer = buffer
+        store._offsets = offsets
+        store.title_ids = title_ids
+        store.movie_titles = movie_titles
+        store._folded = (movie_names, movie_ids)
+        store._neighbors = (neighbors_k, neighbors)
+        return store
+
+    @classmethod
+    def load(cls, text_path: str, compiled_path: Optional[str] = None) -> 'PhraseStore':
+        """Carga el corpus compilado si está al día con el texto; si no, parsea el texto"""
+        compiled_path = compiled_path or compiled_path_for(text_path)
+        if os.path.exists(compiled_path):
+            if is_compiled_fresh(text_path, compiled_path):
+                try:
+                    return cls.from_compiled(compiled_path)
+                except (OSError, ValueError) as e:
+                    print(f"Error al abrir el corpus compilado: {e}")
+            else:
+                print(f"Aviso: {compiled_path} está desactualizado; se lee {text_path}")
+        return cls.from_file(text_path)
+
+    @property
+    def is_compiled(self) -> bool:
+        """Indica si las frases se leen de un corpus compilado (mmap)"""
+        return self._mmap is not None
+
+    def append(self, phrase: str, movie: str):
+        """Agrega una frase al final del almacén"""
+        if self._mmap is not None:
+            raise TypeError("El corpus compilado es de sólo lectura")
+        title_id = self._title_lookup.get(movie)
+        if title_id is None:
+            title_id = self._title_lookup[movie] = len(self.movie_titles)
+            self.movie_titles.append(movie)
+        self._buffer += phrase.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+        self.title_ids.append(title_id)
+        self._folded = None
+        self._neighbors = None
+
+    def __len__(self) -> int:
+        return len(self.title_ids)
+
+    def __getitem__(self, phrase_id):
+        if isinstance(phrase_id, slice):
+            return [self[i] for i in range(*phrase_id.indices(len(self)))]
+        if phrase_id < 0:
+            phrase_id += len(self)
+        if not 0 <= phrase_id < len(self):
+            raise IndexError('id de frase fuera de rango')
+        return {'phrase': self.phrase(phrase_id), 'movie': self.movie(phrase_id)}
+
+    def phrase(self, phrase_id: int) -> str:
+        """Retorna el texto de una frase (se decodifica del buffer al pedirlo)"""
+        return str(self._buffer[self._offsets[phrase_id]:self._offsets[phrase_id + 1]], 'utf-8')
+
+    def movie(self, phrase_id: int) -> str:
+        """Retorna el título de la película de una frase"""
+        return self.movie_titles[self.title_ids[phrase_id]]
+
+    def folded_movies(self) -> Tuple[List[str], Sequence]:
+        """Películas únicas sin distinguir mayúsculas: (nombres ordenados, id de película por frase)
+
+        Se arma desde la tabla de títulos, sin recorrer el texto de las frases; el corpus
+        compilado ya la trae calculada.
+        """
+        if self._folded is None:
+            movie_names = sorted({title.lower() for title in self.movie_titles})
+            movie_ids = {name: movie_id for movie_id, name in enumerate(movie_names)}
+            title_movie_ids = [movie_ids[title.lower()] for title in self.movie_titles]
+            phrase_movie_ids = array('i', (title_movie_ids[title_id] for title_id in self.title_ids))
+            self._folded = (movie_names, phrase_movie_ids)
+        return self._folded
+
+    def movie_neighbors(self) -> Tuple[int, Sequence]:
+        """Películas parecidas a cada una: (k, ids) con k vecinos por película (-1 si faltan)
+
+        Se calculan con el TF-IDF de las frases de cada película; el corpus compilado ya
+        los trae calculados.
+        """
+        if self._neighbors is None:
+            movie_names, _ = self.folded_movies()
+            self._neighbors = (NEIGHBORS_PER_MOVIE,
+                               build_neighbors(self.movie_documents(), movie_names, NEIGHBORS_PER_MOVIE))
+        return self._neighbors
+
+    def movie_documents(self) -> Iterator[Tuple[int, str]]:
+        """Recorre las películas (ids sin distinguir mayúsculas) con el texto de todas sus frases
+
+        El buffer se decodifica una sola vez; los offsets en bytes se pasan a offsets en
+        caracteres descontando los bytes de continuación de UTF-8.
+        """
+        import numpy as np
+
+        _, phrase_movie_ids = self.folded_movies()
+        if not len(self):
+            return
+        text = str(self._buffer, 'utf-8')
+        raw = np.frombuffer(self._buffer, dtype=np.uint8)
+        continuation = np.concatenate(([0], np.cumsum((raw & 0xC0) == 0x80)))
+        byte_offsets = np.frombuffer(self._offsets, dtype=np.int64)
+        offsets = (byte_offsets - continuation[byte_offsets]).tolist()
+
+        movie_ids = np.frombuffer(phrase_movie_ids, dtype=np.int32)
+        order = np.argsort(movie_ids, kind='stable')
+        sorted_movies = movie_ids[order]
+        starts = np.flatnonzero(np.diff(sorted_movies)) + 1
+        bounds = [0, *starts.tolist(), len(order)]
+        order = order.tolist()
+        for first, last in zip(bounds, bounds[1:]):
+            yield int(sorted_movies[first]), '\n'.join(
+                text[offsets[phrase_id]:offsets[phrase_id + 1]] for phrase_id in order[first:last])
+
+class _SectionReader:
+    """Lee secciones consecutivas (alineadas a 8 bytes) de un corpus compilado"""
+    def __init__(self, view: memoryview, position: int):
+        self.view = view
+        self.position = position
+
+    def bytes(self, size: int) -> memoryview:
+        """Retorna la siguiente sección como vista de bytes"""
+        start = self.position
+        if size < 0 or start + size > len(self.view):
+            raise ValueError("el archivo está truncado")
+        self.position = _align(start + size)
+        return self.view[start:start + size]
+
+    def array(self, typecode: str, count: int) -> memoryview:
+        """Retorna la siguiente sección como vista de count enteros del tipo pedido"""
+        return self.bytes(count * struct.calcsize(typecode)).cast(typecode)
+
+def _align(position: int) -> int:
+    """Redondea una posición al múltiplo de 8 siguiente"""
+    return (position + 7) & ~7
+
+def _split_lines(blob: memoryview, count: int) -> List[str]:
+    """Decodifica una tabla de textos separados por '\n' (un decode y un split en total)"""
+    texts = str(blob, 'utf-8').split('\n') if count else []
+    if len(texts) != count:
+        raise ValueError("la tabla de textos no coincide con el encabezado")
+    return texts
+
+def read_header(data) -> Optional[Tuple]:
+    """Lee el encabezado de un corpus compilado; None si no es del formato y versión actuales"""
+    if len(data) < CORPUS_HEADER.size:
+        return None
+    header = CORPUS_HEADER.unpack_from(data, 0)
+    if header[0] != CORPUS_MAGIC or header[1] != CORPUS_FORMAT_VERSION:
+        return None
+    return header
+
+def is_compiled_fresh(text_path: str, compiled_path: str) -> bool:
+    """Indica si el corpus compilado corresponde al archivo de texto actual (tamaño y mtime)
+
+    Sin archivo de texto se usa el compilado tal como está.
+    """
+    try:
+        with open(compiled_path, 'rb') as file:
+            header = read_header(file.read(CORPUS_HEADER.size))
+    except OSError:
+        return False
+    if header is None:
+        return False
+    try:
+        source = os.stat(text_path)
+    except FileNotFoundError:
+        return True
+    return header[8] == source.st_size and header[9] == source.st_mtime_ns
+
+def source_stamp(text_path: str, compiled_path: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """Tamaño y mtime (ns) del texto fuente; sin texto, los que registró el corpus compilado"""
+    try:
+        source = os.stat(text_path)
+        return source.st_size, source.st_mtime_ns
+    except FileNotFoundError:
+        pass
+    try:
+        with open(compiled_path or compiled_path_for(text_path), 'rb') as file:
+            header = read_header(file.read(CORPUS_HEADER.size))
+    except OSError:
+        return None
+    return (header[8], header[9]) if header else None
+
+def corpus_fingerprint(text_path: str, compiled_path: Optional[str] = None) -> Tuple:
+    """Estado en disco del texto y del corpus compilado, para detectar si hay que recargar"""
+    try:
+        compiled = os.stat(compiled_path or compiled_path_for(text_path))
+        compiled_stamp = (compiled.st_size, compiled.st_mtime_ns, compiled.st_ino)
+    except FileNotFoundError:
+        compiled_stamp = None
+    return source_stamp(text_path, compiled_path), compiled_stamp
+
+def compile_corpus(text_path: str, compiled_path: Optional[str] = None) -> Tuple[str, int]:
+    """Convierte el corpus de texto en un corpus compilado
+
+    Se escribe a un temporal y se reemplaza: los procesos que tienen mapeado el archivo
+    anterior lo siguen leyendo sin errores.
+
+    Returns:
+        tuple: (ruta del corpus compilado, cantidad de frases)
+    """
+    compiled_path = compiled_path or compiled_path_for(text_path)
+    source = os.stat(text_path)
+    store = PhraseStore.from_file(text_path)
+    movie_names, movie_ids = store.folded_movies()
+    neighbors_k, neighbors = store.movie_neighbors()
+
+    # Los títulos vienen de líneas del archivo de texto, así que no contienen '\n'
+    titles_blob = '\n'.join(store.movie_titles).encode('utf-8')
+    movies_blob = '\n'.join(movie_names).encode('utf-8')
+    header = CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_FORMAT_VERSION, neighbors_k, len(store),
+                                len(store.movie_titles), len(movie_names), len(titles_blob),
+                                len(movies_blob), source.st_size, source.st_mtime_ns)
+    sections = [header, store._offsets.tobytes(), store.title_ids.tobytes(), movie_ids.tobytes(),
+                neighbors.tobytes(), bytes(store._buffer), titles_blob, movies_blob]
+
+    tmp_path = compiled_path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        for section in sections:
+            file.write(section)
+            file.write(b'\0' * (_align(len(section)) - len(section)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, compiled_path)
+    return compiled_path, len(store)
+
+def parse_lines(lines: Iterable[str]) -> Iterable[Tuple[str, str]]:
+    """Recorre líneas 'frase;película' y genera los pares limpios (ignora líneas sin ';')"""
+    for line in lines:
+        line = line.strip()
+        if line and ';' in line:
+            phrase, movie = line.split(';', 1)
+            yield phrase.strip(), movie.strip()
+
+# Compilación del corpus: python -m modules.phrase_store compilar [data/frases_de_peliculas.txt] [salida.bin]
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'compilar':
+        print("Uso: python -m modules.phrase_store compilar [archivo.txt] [archivo.bin]")
+        sys.exit(1)
+    text_file = sys.argv[2] if len(sys.argv) > 2 else "data/frases_de_peliculas.txt"
+    output_file = sys.argv[3] if len(sys.argv) > 3 else None
+
+    output_file, compiled = compile_corpus(text_file, output_file)
+    print(f"✅ {compiled} frases compiladas de {text_file} a {output_file}")
@@ -0,0 +1,174 @@
+import heapq
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.history_stats import START_TIME_FORMAT, parse_score, parse_start_time
+
+# Porcentaje mínimo para que una partida cuente como ganada en las rachas
+STREAK_MIN_PERCENT = 60.0
+LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+
+class PlayerProfile:
+    """Resumen de un jugador: sus partidas, aciertos, mejor partida y rachas"""
+    __slots__ = ('username', 'numbers', 'hits', 'total', 'percent_sum', 'best', 'best_number',
+                 'current_streak', 'best_streak', 'last_played', 'rank_key')
+
+    def __init__(self, username: str):
+        self.username = username
+        self.numbers = array('l')  # números de partida del jugador, en orden de llegada
+        self.hits = 0
+        self.total = 0
+        self.percent_sum = 0.0
+        self.best = None
+        self.best_number = None
+        self.current_streak = 0
+        self.best_streak = 0
+        self.last_played = None
+        self.rank_key = None  # clave con que está guardado en el ranking
+
+    def add(self, number: int, hits: int, total: int, started_at: Optional[datetime]):
+        """Incorpora una partida del jugador"""
+        percent = (hits / total * 100) if total > 0 else 0
+        self.numbers.append(number)
+        self.hits += hits
+        self.total += total
+        self.percent_sum += percent
+
+        if self.best is None or percent > self.best:
+            self.best = percent
+            self.best_number = number
+
+        if percent >= STREAK_MIN_PERCENT:
+            self.current_streak += 1
+            self.best_streak = max(self.best_streak, self.current_streak)
+        else:
+            self.current_streak = 0
+
+        if started_at is not None:
+            self.last_played = started_at
+
+    def games(self) -> int:
+        """Retorna la cantidad de partidas jugadas"""
+        return len(self.numbers)
+
+    def accuracy(self) -> float:
+        """Retorna el porcentaje de aciertos sobre todas sus respuestas"""
+        return (self.hits / self.total * 100) if self.total > 0 else 0
+
+    def average_percent(self) -> float:
+        """Retorna el promedio de los porcentajes de sus partidas"""
+        return self.percent_sum / len(self.numbers) if self.numbers else 0
+
+    def to_dict(self) -> Dict:
+        """Resumen serializable para plantillas y respuestas JSON"""
+        return {
+            'username': self.username,
+            'games': self.games(),
+            'hits': self.hits,
+            'total': self.total,
+            'accuracy': self.accuracy(),
+            'average_percent': self.average_percent(),
+            'best': self.best,
+            'best_number': self.best_number,
+            'current_streak': self.current_streak,
+            'best_streak': self.best_streak,
+            'last_played': self.last_played.strftime(START_TIME_FORMAT) if self.last_played else None
+        }
+
+class PlayerIndex:
+    """Índice del historial por jugador y ranking ordenado, actualizados con cada partida
+
+    El ranking es un heap de claves (-aciertos, -partidas, jugador) con invalidación
+    perezosa: cada partida nueva agrega la clave actual del jugador en O(log N) y la vieja
+    queda en el heap hasta la próxima compactación. El top-K recorre el heap de menor a
+    mayor sin modificarlo, salteando las claves viejas, en O((K + salteadas) log N).
+    """
+    def __init__(self):
+        self.profiles = {}
+        self._ranking = []  # heap de claves de orden; sólo es vigente la rank_key de cada perfil
+
+    @classmethod
+    def from_games(cls, games: List[Dict]) -> 'PlayerIndex':
+        """Construye el índice a partir de las partidas del historial (numeradas desde 1)"""
+        return cls.from_values(
+            (seq + 1, game.get('username', 'Usuario'), *parse_score(game.get('score')),
+             parse_start_time(game.get('start_time')))
+            for seq, game in enumerate(games))
+
+    @classmethod
+    def from_values(cls, rows: Iterable[Tuple[int, str, int, int, Optional[datetime]]]) -> 'PlayerIndex':
+        """Construye el índice con una pasada sobre (número, jugador, aciertos, total, fecha)
+
+        El ranking se ordena una sola vez al final en lugar de reubicarlo en cada partida.
+        """
+        index = cls()
+        for number, username, hits, total, started_at in rows:
+            index._add_to_profile(number, username, hits, total, started_at)
+        index._rebuild_ranking()
+        return index
+
+    @staticmethod
+    def _rank_key(profile: PlayerProfile) -> Tuple[float, int, str]:
+        """Clave de orden del ranking: más aciertos, luego más partidas, luego por nombre"""
+        return -profile.accuracy(), -profile.games(), profile.username
+
+    def _add_to_profile(self, number: int, username: str, hits: int, total: int,
+                        started_at: Optional[datetime]) -> PlayerProfile:
+        """Agrega la partida al perfil del jugador (sin tocar el ranking)"""
+        profile = self.profiles.get(username)
+        if profile is None:
+            profile = self.profiles[username] = PlayerProfile(username)
+        profile.add(number, hits, total, started_at)
+        return profile
+
+    def _rebuild_ranking(self):
+        """Arma el heap con la clave vigente de cada jugador, en O(N)
+
+        Se usa al construir el índice y para descartar las claves viejas cuando
+        ya son tantas como las vigentes (así el costo se reparte entre las partidas).
+        """
+        for profile in self.profiles.values():
+            profile.rank_key = self._rank_key(profile)
+        self._ranking = [profile.rank_key for profile in self.profiles.values()]
+        heapq.heapify(self._ranking)
+
+    def add_values(self, number: int, username: str, hits: int, total: int,
+                   started_at: Optional[datetime]):
+        """Incorpora una partida ya parseada y agrega la nueva clave del jugador al ranking"""
+        profile = self._add_to_profile(number, username, hits, total, started_at)
+        profile.rank_key = self._rank_key(profile)
+        heapq.heappush(self._ranking, profile.rank_key)
+        if len(self._ranking) > 2 * len(self.profiles):
+            self._rebuild_ranking()
+
+    def add(self, number: int, game: Dict):
+        """Incorpora una partida con el formato del historial ('3/5', 'dd/mm/aa hh:mm')"""
+        hits, total = parse_score(game.get('score'))
+        self.add_values(number, game.get('username', 'Usuario'), hits, total,
+                        parse_start_time(game.get('start_time')))
+
+    def get(self, username: str) -> Optional[PlayerProfile]:
+        """Retorna el perfil de un jugador o None si no jugó nunca"""
+        return self.profiles.get(username)
+
+    def leaderboard(self, k: int = LEADERBOARD_SIZE, min_games: int = 1) -> List[Dict]:
+        """Retorna los k mejores jugadores con al menos min_games partidas
+
+        Recorre el heap en orden con una frontera de posiciones: cada clave que sale
+        agrega a sus dos hijos, que nunca son menores que ella.
+        """
+        ranking = self._ranking
+        top = []
+        frontier = [(ranking[0], 0)] if ranking else []
+        while frontier and len(top) < k:
+            rank_key, position = heapq.heappop(frontier)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(ranking):
+                    heapq.heappush(frontier, (ranking[child], child))
+            profile = self.profiles[rank_key[2]]
+            if profile.rank_key != rank_key or profile.games() < min_games:
+                continue
+            top.append(dict(profile.to_dict(), rank=len(top) + 1))
+        return top
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from modules.chart_service import ChartRenderService, CHART_RENDERERS
+from modules.history_stats import HistoryStats
+from modules.pdf_generator import GameReportPDF
+
+# Etapas de un trabajo y el avance aproximado que representan
+JOB_PROGRESS = {
+    'queued': 0.0,
+    'charts': 0.2,
+    'pdf': 0.7,
+    'done': 1.0,
+    'error': 1.0,
+}
+MAX_JOBS = 100  # trabajos terminados que se recuerdan para consultar su estado
+
+# Tipos de reporte: 'trivia' (gráficas y últimas partidas) o 'completo' (todas las partidas)
+REPORT_KINDS = ('trivia', 'completo')
+
+class ReportJob:
+    """Trabajo de generación de un reporte PDF para una versión del historial"""
+    def __init__(self, version: str, kind: str = 'trivia'):
+        self.id = uuid.uuid4().hex
+        self.version = version
+        self.kind = kind
+        self.status = 'queued'
+        self.path = None
+        self.error = None
+        self.created_at = time.time()
+
+    def is_finished(self) -> bool:
+        """Indica si el trabajo terminó, bien o con error"""
+        return self.status in ('done', 'error')
+
+    def to_dict(self) -> Dict:
+        """Estado serializable para la respuesta JSON"""
+        return {
+            'job_id': self.id,
+            'version': self.version,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': JOB_PROGRESS[self.status],
+            'error': self.error
+        }
+
+class ReportJobQueue:
+    """Cola de generación de reportes PDF fuera del ciclo de la petición HTTP
+
+    Los pedidos del mismo tipo para la misma versión del historial comparten un único trabajo.
+    """
+    def __init__(self, chart_service: ChartRenderService, pdf_generator: GameReportPDF,
+                 max_workers: int = 1, charts_timeout: float = 120):
+        self.chart_service = chart_service
+        self.pdf_generator = pdf_generator
+        self.charts_timeout = charts_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='reportes')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # id -> ReportJob, del más viejo al más nuevo
+        self._by_version = {}  # (versión, tipo) -> id del trabajo vigente
+
+    def submit(self, game_history, kind: str = 'trivia') -> ReportJob:
+        """Encola el reporte de la versión actual del historial o retorna el trabajo que ya la cubre
+
+        Acepta GameHistory o SQLiteGameHistory; las partidas se leen en el hilo de la cola.
+        """
+        with self._lock:
+            job = self._jobs.get(self._by_version.get((game_history.stats.version(), kind)))
+            if job and job.status != 'error' and (not job.is_finished() or os.path.exists(job.path)):
+                return job
+
+            # Copia fija de los agregados: el historial puede seguir creciendo mientras tanto
+            stats = game_history.stats.snapshot()
+            job = ReportJob(stats.version(), kind)
+            self._jobs[job.id] = job
+            self._by_version[(job.version, kind)] = job.id
+            self._trim()
+
+            cached_path = self.pdf_generator.get_cached_report(job.version, kind)
+            if cached_path:
+                job.status, job.path = 'done', cached_path
+            else:
+                self._executor.submit(self._run, job, game_history, stats)
+            return job
+
+    def _run(self, job: ReportJob, game_history, stats: HistoryStats):
+        """Genera las gráficas y el PDF de un trabajo (en el hilo de la cola)"""
+        try:
+            if job.kind == 'completo':
+                # Sólo las partidas incluidas en la copia de stats, leídas por bloques
+                job.status = 'pdf'
+                job.path = self.pdf_generator.generate_full_report(
+                    game_history.iter_games(limit=stats.total_games), stats)
+            else:
+                games = game_history.get_all_games()[:stats.total_games]
+                job.status = 'charts'
+                charts_paths = self.chart_service.render_and_wait(job.version, games, stats,
+                                                                  timeout=self.charts_timeout, profile='print')
+                # Sin todas las gráficas (vencido el tiempo o con error) no se arma ni se cachea el PDF
+                missing = [name for name in CHART_RENDERERS if name not in charts_paths]
+                if missing:
+                    failed = self.chart_service.status(job.version, 'print') == 'error'
+                    reason = self.chart_service.last_error if failed else 'tiempo de espera agotado'
+                    raise RuntimeError(f"No se pudieron generar las gráficas {', '.join(missing)}: {reason}")
+                job.status = 'pdf'
+                job.path = self.pdf_generator.generate_report(games, charts_paths, stats)
+            job.status = 'done'
+        except Exception as e:
+            print(f"Error al generar el reporte: {e}")
+            job.error = str(e)
+            job.status = 'error'
+
+    def _trim(self):
+        """Olvida los trabajos terminados más viejos cuando hay demasiados (con el lock tomado)"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= MAX_JOBS:
+                break
+            job = self._jobs[job_id]
+            if job.is_finished():
+                del self._jobs[job_id]
+                if self._by_version.get((job.version, job.kind)) == job_id:
+                    del self._by_version[(job.version, job.kind)]
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        """Retorna un trabajo por su id, o None si no existe"""
+        with self._lock:
+            return self._jobs.get(job_id)
@@ -0,0 +1,210 @@
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer, want_bytes
+from werkzeug.datastructures import CallbackDict
+
+class MemorySessionCache:
+    """Almacén de sesiones en memoria con política LRU y expiración (TTL)
+
+    Los datos se guardan serializados con pickle, como en SQLite: cada pedido recibe su
+    propia copia (con listas anidadas incluidas) y sólo save_session cambia lo guardado.
+    """
+    def __init__(self, threshold: int = 500, default_timeout: int = 3600, sweep_every: int = 100):
+        self.threshold = threshold
+        self.default_timeout = default_timeout
+        self.sweep_every = sweep_every
+        self._data = OrderedDict()  # clave -> (expira_en, datos)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna los datos de la sesión o None si no existe o expiró"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Dict, timeout: Optional[int] = None) -> bool:
+        """Guarda la sesión, desalojando las menos usadas si se supera el umbral"""
+        expires = time.time() + (timeout or self.default_timeout)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                self._sweep()
+            while len(self._data) > self.threshold:
+                self._data.popitem(last=False)
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Elimina una sesión"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def _sweep(self):
+        """Elimina las sesiones expiradas (se llama con el lock tomado)"""
+        now = time.time()
+        expired = [key for key, (expires, _) in self._data.items() if expires < now]
+        for key in expired:
+            del self._data[key]
+
+class SQLiteSessionCache:
+    """Almacén de sesiones en SQLite, compartido entre varios procesos del servidor"""
+    def __init__(self, db_path: str = "data/sessions.sqlite3", default_timeout: int = 3600,
+                 sweep_every: int = 100):
+        self.db_path = db_path
+        self.default_timeout = default_timeout
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expiry REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions (expiry)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna la conexión del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna los datos de la sesión o None si no existe o expiró"""
+        row = self._connection().execute(
+            "SELECT value FROM sessions WHERE key = ? AND expiry >= ?", (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict, timeout: Optional[int] = None) -> bool:
+        """Guarda la sesión y cada cierta cantidad de escrituras barre las expiradas"""
+        expires = time.time() + (timeout or self.default_timeout)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, expiry) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+            )
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                conn.execute("DELETE FROM sessions WHERE expiry < ?", (time.time(),))
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Elimina una sesión"""
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+class CacheSession(CallbackDict, SessionMixin):
+    """Sesión del lado del servidor: los datos viven en el almacén y la cookie lleva sólo el id"""
+    def __init__(self, initial: Optional[Dict] = None, sid: Optional[str] = None, permanent: bool = False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        if permanent:
+            self.permanent = permanent
+        self.modified = False
+
+class CacheSessionInterface(SessionInterface):
+    """Interfaz de sesiones de Flask sobre cualquier almacén con get/set/delete
+
+    Usa sólo los métodos públicos de flask.sessions.SessionInterface (nombre, dominio y
+    opciones de la cookie), así no depende de la versión de Flask-Session. El id de la
+    cookie se firma por defecto y nunca se adopta un id que no esté en el almacén.
+    """
+    session_class = CacheSession
+
+    def __init__(self, cache, key_prefix: str = "session:", use_signer: bool = True,
+                 permanent: bool = True):
+        self.cache = cache
+        self.key_prefix = key_prefix
+        self.use_signer = use_signer
+        self.permanent = permanent
+
+    def _generate_sid(self) -> str:
+        """Genera un id de sesión aleatorio"""
+        return secrets.token_urlsafe(32)
+
+    def _get_signer(self, app) -> Optional[Signer]:
+        """Firmador del id de la cookie, o None si la aplicación no tiene SECRET_KEY"""
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt='flask-session', key_derivation='hmac')
+
+    def _new_session(self) -> CacheSession:
+        """Sesión vacía con un id nuevo"""
+        return self.session_class(sid=self._generate_sid(), permanent=self.permanent)
+
+    def open_session(self, app, request) -> Optional[CacheSession]:
+        """Carga la sesión del almacén a partir del id de la cookie"""
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return self._new_session()
+        if self.use_signer:
+            signer = self._get_signer(app)
+            if signer is None:
+                return None
+            try:
+                sid = signer.unsign(sid).decode()
+            except BadSignature:
+                return self._new_session()
+
+        data = self.cache.get(self.key_prefix + sid)
+        if data is not None:
+            return self.session_class(data, sid=sid)
+        # Id desconocido o expirado: se emite uno nuevo (evita fijar la sesión desde afuera)
+        return self._new_session()
+
+    def save_session(self, app, session: CacheSession, response):
+        """Guarda la sesión en el almacén (o la borra si quedó vacía) y actualiza la cookie"""
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified:
+                self.cache.delete(self.key_prefix + session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not self.should_set_cookie(app, session):
+            return
+
+        self.cache.set(self.key_prefix + session.sid, dict(session),
+                       int(app.permanent_session_lifetime.total_seconds()))
+        session_id = session.sid
+        if self.use_signer:
+            session_id = self._get_signer(app).sign(want_bytes(session.sid)).decode()
+        response.set_cookie(name, session_id,
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=domain, path=path,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
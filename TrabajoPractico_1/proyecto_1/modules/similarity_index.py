@@ -0,0 +1,140 @@
+import re
+from array import array
+from collections import defaultdict
+from typing import Iterable, List, Tuple
+
+# Vecinos más parecidos que se guardan por película (distractores del modo difícil)
+NEIGHBORS_PER_MOVIE = 8
+# Términos de mayor peso TF-IDF con que se representa cada película
+MAX_TERMS_PER_MOVIE = 24
+# Por término sólo se comparan las películas donde más pesa (acota el costo de los términos comunes)
+MAX_POSTINGS_PER_TERM = 200
+# Términos presentes en más de esta fracción de las películas no sirven para distinguirlas
+MAX_DF_RATIO = 0.2
+# Cantidad máxima de pares (película, candidata) que se acumulan por bloque
+BLOCK_PAIRS = 2_000_000
+# Las palabras del título pesan como si aparecieran esta cantidad de veces
+TITLE_WEIGHT = 2
+
+TOKEN_RE = re.compile(r'\w{3,}')
+
+def build_neighbors(documents: Iterable[Tuple[int, str]], movie_names: List[str],
+                    k: int = NEIGHBORS_PER_MOVIE) -> array:
+    """Calcula las k películas más parecidas a cada una según el TF-IDF de sus frases y título
+
+    documents recorre pares (id de película, texto de sus frases); una película puede
+    aparecer en varios pares.
+
+    Cada película es un vector TF-IDF de palabras (podado a sus términos de más peso) y la
+    similitud es el coseno, acumulado por bloques a través de un índice invertido para no
+    comparar todos los pares de películas.
+
+    Returns:
+        array('i') de len(movie_names) * k ids de película, ordenados del más parecido al
+        menos parecido; -1 donde una película tiene menos de k vecinos
+    """
+    num_movies = len(movie_names)
+    if num_movies < 2 or k <= 0:
+        return array('i', [-1]) * (num_movies * max(k, 0))
+
+    # numpy sólo se carga al calcular el índice (el corpus compilado ya lo trae)
+    import numpy as np
+
+    neighbors = np.full(num_movies * k, -1, dtype=np.int32)
+
+    # Pares (película, término) de todas las frases y títulos; un término nuevo recibe
+    # como id el tamaño del vocabulario (así el mapeo de tokens corre todo en C)
+    vocabulary = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    pair_movies, pair_terms = array('i'), array('i')
+    for movie_id, document in documents:
+        term_ids = list(map(vocabulary.__getitem__, TOKEN_RE.findall(document.lower())))
+        pair_terms.extend(term_ids)
+        pair_movies.extend([movie_id] * len(term_ids))
+    for movie_id, name in enumerate(movie_names):
+        term_ids = list(map(vocabulary.__getitem__, TOKEN_RE.findall(name)))
+        pair_terms.extend(term_ids * TITLE_WEIGHT)
+        pair_movies.extend([movie_id] * (len(term_ids) * TITLE_WEIGHT))
+    if not vocabulary:
+        return array('i', neighbors.tobytes())
+
+    # Frecuencia de cada término por película y cantidad de películas que lo usan
+    num_terms = len(vocabulary)
+    keys, tf = np.unique(np.frombuffer(pair_movies, dtype=np.int32).astype(np.int64) * num_terms
+                         + np.frombuffer(pair_terms, dtype=np.int32), return_counts=True)
+    movies, terms = keys // num_terms, keys % num_terms
+    df = np.bincount(terms, minlength=num_terms)
+    useful = (df[terms] >= 2) & (df[terms] <= max(2, MAX_DF_RATIO * num_movies))
+    movies, terms, tf = movies[useful], terms[useful], tf[useful]
+    weights = (1 + np.log(tf)) * np.log(num_movies / df[terms])
+
+    # Vector de cada película: sus términos de más peso, normalizado
+    order = np.lexsort((-weights, movies))
+    movies, terms, weights = movies[order], terms[order], weights[order]
+    keep = _rank_in_groups(movies) < MAX_TERMS_PER_MOVIE
+    movies, terms, weights = movies[keep], terms[keep], weights[keep]
+    norms = np.sqrt(np.bincount(movies, weights * weights, minlength=num_movies))
+    weights = weights / norms[movies]
+
+    # Índice invertido: por término, las películas donde más pesa
+    order = np.lexsort((-weights, terms))
+    post_terms, post_movies, post_weights = terms[order], movies[order], weights[order]
+    keep = _rank_in_groups(post_terms) < MAX_POSTINGS_PER_TERM
+    post_terms, post_movies, post_weights = post_terms[keep], post_movies[keep], post_weights[keep]
+    term_start = np.searchsorted(post_terms, np.arange(num_terms))
+    term_end = np.searchsorted(post_terms, np.arange(num_terms), side='right')
+
+    # Similitudes por bloques de películas consecutivas (cada término une a las películas de su lista)
+    counts = term_end[terms] - term_start[terms]
+    pairs_before = np.concatenate(([0], np.cumsum(np.bincount(movies, counts, minlength=num_movies))))
+    entry_start = np.searchsorted(movies, np.arange(num_movies + 1))
+    block_first = 0
+    while block_first < num_movies:
+        block_last = int(np.searchsorted(pairs_before, pairs_before[block_first] + BLOCK_PAIRS, side='right')) - 1
+        block_last = min(max(block_last, block_first + 1), num_movies)
+        first_entry, last_entry = entry_start[block_first], entry_start[block_last]
+        _score_block(neighbors, k, num_movies, block_first,
+                     movies[first_entry:last_entry], weights[first_entry:last_entry],
+                     term_start[terms[first_entry:last_entry]], counts[first_entry:last_entry],
+                     post_movies, post_weights)
+        block_first = block_last
+
+    return array('i', neighbors.tobytes())
+
+def _score_block(neighbors, k: int, num_movies: int, block_first: int, query_movies, query_weights,
+                 starts, counts, post_movies, post_weights):
+    """Acumula las similitudes de un bloque de películas y guarda sus k vecinos"""
+    import numpy as np
+
+    total = int(counts.sum())
+    if total == 0:
+        return
+    # Expandir cada término de la película a todas las películas de su lista
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    positions = np.arange(total) - offsets + np.repeat(starts, counts)
+    queries = np.repeat(query_movies, counts)
+    targets = post_movies[positions]
+    scores = np.repeat(query_weights, counts) * post_weights[positions]
+    different = queries != targets
+    queries, targets, scores = queries[different], targets[different], scores[different]
+
+    # Sumar por par (película, candidata) y quedarse con las k de mayor similitud
+    keys, inverse = np.unique((queries - block_first) * num_movies + targets, return_inverse=True)
+    sums = np.bincount(inverse, scores)
+    queries, targets = keys // num_movies + block_first, keys % num_movies
+    order = np.lexsort((targets, -sums, queries))
+    queries, targets = queries[order], targets[order]
+    ranks = _rank_in_groups(queries)
+    top = ranks < k
+    neighbors[queries[top] * k + ranks[top]] = targets[top]
+
+def _rank_in_groups(groups):
+    """Posición de cada elemento dentro de su grupo (el array debe estar agrupado)"""
+    import numpy as np
+
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.int64)
+    boundaries = np.flatnonzero(np.diff(groups)) + 1
+    group_starts = np.concatenate(([0], boundaries))
+    group_sizes = np.diff(np.concatenate((group_starts, [len(groups)])))
+    return np.arange(len(groups)) - np.repeat(group_starts, group_sizes)
@@ -1,83 +1,282 @@
 import random
 import json
+import hashlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Iterator, Sequence
 import os
+import threading
+from modules.history_stats import HistoryStats, START_TIME_FORMAT
+from modules.history_index import HistoryIndex, PAGE_SIZE, decode_cursor
+from modules.player_index import PlayerIndex, LEADERBOARD_SIZE
+from modules.phrase_store import PhraseStore, corpus_fingerprint, source_stamp
+from modules.movie_index import MovieIndex, MOVIES_PAGE_SIZE
+
+# Cantidad de opciones que se muestran en cada pregunta
+NUM_OPTIONS = 3
+
+# Dificultades: cuántos distractores se eligen entre las películas parecidas a la correcta
+DIFFICULTY_SIMILAR_OPTIONS = {'facil': 0, 'media': 1, 'dificil': NUM_OPTIONS - 1}
+DEFAULT_DIFFICULTY = 'facil'
+
+# Versión del formato con que GameSession se guarda en la sesión de Flask
+SESSION_SCHEMA_VERSION = 2
+
+# Generaciones del corpus que se conservan para las partidas empezadas antes de una recarga
+KEEP_GENERATIONS = 3
+
+def generation_id(stamp: Optional[Tuple[int, int]], compiled_stamp: Optional[Tuple[int, int]] = None) -> str:
+    """Identificador de una versión del corpus a partir del tamaño y mtime del texto fuente
+
+    Si el corpus se sirve desde el compilado también cuentan su tamaño y mtime, así
+    recompilarlo sin tocar el texto es otra generación. Es igual en todos los procesos
+    que cargaron los mismos archivos.
+    """
+    return hashlib.sha1(repr((stamp, compiled_stamp)).encode('utf-8')).hexdigest()[:12]
+
+class PhraseIndex:
+    """Índice precalculado de frases y películas, direccionable por id entero"""
+    def __init__(self, store: PhraseStore):
+        # Tabla de películas únicas (en minúsculas, ordenadas alfabéticamente) e id de
+        # película (int32) de cada frase, en el mismo orden que el almacén
+        self.movie_names, self.phrase_movie_ids = store.folded_movies()
+        self.movie_ids = {name: movie_id for movie_id, name in enumerate(self.movie_names)}
+        
+        # Películas más parecidas a cada una (TF-IDF de sus frases): las trae el corpus
+        # compilado o se calculan al cargarlo (warm_up o antes de publicar una recarga);
+        # si todavía no están, la primera pregunta que las usa las espera
+        self._store = store
+        self._neighbors = None
+        self._neighbors_lock = threading.Lock()
+    
+    def movie_neighbors(self) -> Tuple[int, Sequence]:
+        """Vecinos de cada película: (k, ids) con k vecinos por película (-1 si faltan)"""
+        if self._neighbors is None:
+            with self._neighbors_lock:
+                if self._neighbors is None:
+                    self._neighbors = self._store.movie_neighbors()
+        return self._neighbors
+    
+    def warm_up(self):
+        """Calcula los vecinos en un hilo aparte para que la primera pregunta difícil no los espere"""
+        threading.Thread(target=self.movie_neighbors, daemon=True).start()
+    
+    def num_phrases(self) -> int:
+        """Retorna la cantidad de frases indexadas"""
+        return len(self.phrase_movie_ids)
+    
+    def num_movies(self) -> int:
+        """Retorna la cantidad de películas únicas indexadas"""
+        return len(self.movie_names)
+    
+    def draw_options(self, phrase_id: int, num_options: int = NUM_OPTIONS,
+                     difficulty: str = DEFAULT_DIFFICULTY) -> List[int]:
+        """Sortea los ids de las opciones de una frase (incluye la correcta, ya mezcladas)"""
+        correct_id = self.phrase_movie_ids[phrase_id]
+        options = [correct_id]
+        num_movies = len(self.movie_names)
+        
+        # Distractores parecidos: se sortean entre los vecinos precalculados de la película
+        num_similar = min(DIFFICULTY_SIMILAR_OPTIONS.get(difficulty, 0), num_options - 1)
+        if num_similar:
+            neighbors_k, neighbors = self.movie_neighbors()
+            start = correct_id * neighbors_k
+            similar = [movie_id for movie_id in neighbors[start:start + neighbors_k] if movie_id >= 0]
+            options.extend(random.sample(similar, min(num_similar, len(similar))))
+        
+        # Muestreo por rechazo: con muchas películas casi nunca se repite un candidato
+        while len(options) < num_options:
+            candidate = random.randrange(num_movies)
+            if candidate not in options:
+                options.append(candidate)
+        
+        random.shuffle(options)
+        return options
+
+class CorpusGeneration:
+    """Una versión cargada del corpus: frases e índice, que no cambian una vez armados"""
+    def __init__(self, generation: str, phrases_data: PhraseStore, fingerprint: Tuple = None):
+        self.generation = generation
+        # phrases_data es una vista de sólo lectura: cada frase se arma como
+        # {'phrase', 'movie'} al accederla, el texto vive en un buffer compacto
+        self.phrases_data = phrases_data
+        self.index = PhraseIndex(phrases_data)
+        self.movies_list = self.index.movie_names
+        self.movie_index = MovieIndex(self.movies_list)
+        self.fingerprint = fingerprint
 
 class TriviaGame:
-    def __init__(self, data_file: str = "data/frases_de_peliculas.txt"):
+    def __init__(self, data_file: str = "data/frases_de_peliculas.txt",
+                 keep_generations: int = KEEP_GENERATIONS, similar_distractors: bool = True):
         self.data_file = data_file
-        self.phrases_data = []
-        self.movies_list = []
+        self.keep_generations = keep_generations
+        # Si las dificultades media y difícil están activas, los vecinos se arman al cargar
+        self.similar_distractors = similar_distractors
+        self.corpus = CorpusGeneration(generation_id(None), PhraseStore())
+        self._generations = OrderedDict()
+        self._lock = threading.Lock()
         self.load_data()
+    
+    # El corpus vigente se reemplaza entero al recargar; cada operación lee self.corpus
+    # una sola vez para no mezclar dos generaciones
+    @property
+    def phrases_data(self) -> PhraseStore:
+        return self.corpus.phrases_data
+    
+    @property
+    def index(self) -> PhraseIndex:
+        return self.corpus.index
+    
+    @property
+    def movies_list(self) -> List[str]:
+        return self.corpus.movies_list
+    
+    @property
+    def movie_index(self) -> MovieIndex:
+        return self.corpus.movie_index
+    
+    @property
+    def generation(self) -> str:
+        return self.corpus.generation
         
     def load_data(self):
         """Carga los datos del archivo de frases de películas"""
+        self._install(self._build_corpus())
+    
+    def _build_corpus(self) -> CorpusGeneration:
+        """Lee el corpus del disco y arma su índice (no toca el corpus vigente)"""
+        # El estado del archivo se toma antes de leerlo: si cambia durante la carga,
+        # la próxima verificación lo vuelve a cargar
+        fingerprint = corpus_fingerprint(self.data_file)
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as file:
-                for line in file:
-                    line = line.strip()
-                    if line and ';' in line:
-                        phrase, movie = line.split(';', 1)
-                        self.phrases_data.append({
-                            'phrase': phrase.strip(),
-                            'movie': movie.strip()
-                        })
-            
-            # Extraer lista única de películas (sin duplicados, ordenada alfabéticamente)
-            movies_set = set()
-            for item in self.phrases_data:
-                movies_set.add(item['movie'].lower())
-            
-            self.movies_list = sorted(list(movies_set))
-            
+            # Usa el corpus compilado (mmap) si está al día; si no, parsea el texto
+            phrases_data = PhraseStore.load(self.data_file)
         except FileNotFoundError:
             print(f"Error: No se encontró el archivo {self.data_file}")
-            self.phrases_data = []
-            self.movies_list = []
+            phrases_data = PhraseStore()
+        # Del compilado cuentan el tamaño y el mtime tomados antes de abrirlo
+        compiled_stamp = fingerprint[1][:2] if phrases_data.is_compiled and fingerprint[1] else None
+        return CorpusGeneration(generation_id(source_stamp(self.data_file), compiled_stamp),
+                                phrases_data, fingerprint)
+    
+    def _install(self, corpus: CorpusGeneration):
+        """Publica una generación nueva del corpus con un solo reemplazo de referencia"""
+        with self._lock:
+            self._generations[corpus.generation] = corpus
+            self._generations.move_to_end(corpus.generation)
+            while len(self._generations) > self.keep_generations:
+                self._generations.popitem(last=False)
+            self.corpus = corpus
+    
+    def reload_if_changed(self) -> bool:
+        """Recarga el corpus si el archivo cambió en disco; retorna True si hubo recarga
+        
+        La carga y el índice se arman antes de publicar la generación nueva, así que quien
+        la llame desde un hilo aparte no frena a los pedidos en curso.
+        """
+        if corpus_fingerprint(self.data_file) == self.corpus.fingerprint:
+            return False
+        corpus = self._build_corpus()
+        # Los trigramas de la búsqueda de películas y los vecinos de los distractores
+        # también se arman antes de publicar
+        corpus.movie_index.trigrams()
+        if self.similar_distractors:
+            corpus.index.movie_neighbors()
+        self._install(corpus)
+        return True
+    
+    def get_generation(self, generation: Optional[str] = None) -> Optional[CorpusGeneration]:
+        """Retorna una generación conservada del corpus (la vigente si no se indica)"""
+        corpus = self.corpus
+        if generation is None or generation == corpus.generation:
+            return corpus
+        with self._lock:
+            return self._generations.get(generation)
     
     def get_movies_list(self) -> List[str]:
         """Retorna la lista de películas disponibles"""
         return self.movies_list
     
+    def search_movies(self, query: str = '', page: int = 1, page_size: int = MOVIES_PAGE_SIZE) -> Dict:
+        """Busca películas por nombre (prefijo o subcadena, sin tildes ni mayúsculas), paginado
+        
+        Returns:
+            dict: {'movies': [{'position', 'title'}], 'page', 'has_more', 'total_movies'};
+            position es el lugar del título en el catálogo completo ordenado
+        """
+        corpus = self.corpus
+        movie_ids, has_more = corpus.movie_index.search(query, (page - 1) * page_size, page_size)
+        return {
+            'movies': [{'position': movie_id + 1, 'title': corpus.movies_list[movie_id]} for movie_id in movie_ids],
+            'page': page,
+            'has_more': has_more,
+            'total_movies': len(corpus.movies_list)
+        }
+    
     def get_random_phrase(self) -> Dict[str, str]:
         """Obtiene una frase aleatoria del juego"""
-        if not self.phrases_data:
+        phrases_data = self.phrases_data
+        if not phrases_data:
             return None
-        return random.choice(self.phrases_data)
+        return random.choice(phrases_data)
     
-    def generate_question(self) -> Dict[str, any]:
+    def generate_question(self, difficulty: str = DEFAULT_DIFFICULTY) -> Dict[str, any]:
         """Genera una pregunta con una frase y 3 opciones de películas"""
-        if len(self.phrases_data) < 4:
+        corpus = self.corpus
+        if len(corpus.phrases_data) < 4 or corpus.index.num_movies() < 3:
             return None
             
-        # Seleccionar frase aleatoria
-        correct_answer = random.choice(self.phrases_data)
-        correct_movie = correct_answer['movie'].lower()
-        
-        # Generar 3 opciones diferentes
-        options = [correct_movie]
-        available_movies = [m for m in self.movies_list if m != correct_movie]
-        
-        # Agregar 2 opciones incorrectas aleatorias
-        if len(available_movies) >= 2:
-            wrong_options = random.sample(available_movies, 2)
-            options.extend(wrong_options)
-        else:
-            # Si no hay suficientes películas, duplicar algunas
-            while len(options) < 3:
-                random_movie = random.choice(self.movies_list)
-                if random_movie not in options:
-                    options.append(random_movie)
-        
-        # Mezclar las opciones
-        random.shuffle(options)
+        # Seleccionar frase aleatoria y sortear las opciones por id
+        phrase_id = random.randrange(len(corpus.phrases_data))
+        option_ids = corpus.index.draw_options(phrase_id, difficulty=difficulty)
+        
+        return self.build_question(phrase_id, option_ids, corpus.generation)
+    
+    def generate_game(self, num_phrases: int,
+                      difficulty: str = DEFAULT_DIFFICULTY) -> Tuple[List[int], List[int], str]:
+        """Sortea de una vez todas las preguntas de una partida
+        
+        Con difficulty 'media' o 'dificil' parte de los distractores son películas parecidas
+        a la correcta.
+        
+        Returns:
+            tuple: (ids_de_frases, ids_de_opciones, generación_del_corpus) con
+            NUM_OPTIONS opciones por pregunta
+        """
+        corpus = self.corpus
+        total_phrases = len(corpus.phrases_data)
+        if total_phrases < 4 or corpus.index.num_movies() < NUM_OPTIONS:
+            return None
+        
+        # Sin frases repetidas dentro de la partida; si se piden más frases que las
+        # disponibles se recorre el corpus completo antes de repetir alguna
+        phrase_ids = []
+        while len(phrase_ids) < num_phrases:
+            phrase_ids.extend(random.sample(range(total_phrases), min(total_phrases, num_phrases - len(phrase_ids))))
+        
+        option_ids = []
+        for phrase_id in phrase_ids:
+            option_ids.extend(corpus.index.draw_options(phrase_id, difficulty=difficulty))
+        
+        return phrase_ids, option_ids, corpus.generation
+    
+    def build_question(self, phrase_id: int, option_ids: List[int],
+                       generation: Optional[str] = None) -> Optional[Dict[str, any]]:
+        """Arma el diccionario de una pregunta a partir de los ids de frase y opciones
+        
+        Los ids se resuelven contra la generación del corpus con que se sortearon;
+        retorna None si esa generación ya no se conserva.
+        """
+        corpus = self.get_generation(generation)
+        if corpus is None:
+            return None
+        correct_id = corpus.index.phrase_movie_ids[phrase_id]
         
         return {
-            'phrase': correct_answer['phrase'],
-            'correct_movie': correct_answer['movie'],
-            'options': options,
-            'correct_index': options.index(correct_movie)
+            'phrase': corpus.phrases_data.phrase(phrase_id),
+            'correct_movie': corpus.phrases_data.movie(phrase_id),
+            'options': [corpus.index.movie_names[movie_id] for movie_id in option_ids],
+            'correct_index': option_ids.index(correct_id)
         }
     
     def check_answer(self, question: Dict, selected_movie: str) -> bool:
@@ -86,10 +285,9 @@ class TriviaGame:
     
     def get_movie_by_name(self, movie_name: str) -> Optional[str]:
         """Busca una película por nombre (ignorando mayúsculas/minúsculas)"""
-        for movie in self.movies_list:
-            if movie.lower() == movie_name.lower():
-                return movie
-        return None
+        corpus = self.corpus
+        movie_id = corpus.movie_index.find(movie_name)
+        return corpus.movies_list[movie_id] if movie_id is not None else None
 
 class GameSession:
     def __init__(self, username: str, num_phrases: int):
@@ -100,11 +298,28 @@ class GameSession:
         self.start_time = datetime.now()
         self.questions = []
         self.answers = []
+        # Preguntas sorteadas al inicio: ids de frases y NUM_OPTIONS ids de opciones por frase
+        self.phrase_ids = []
+        self.option_ids = []
+        # Generación del corpus contra la que se resuelven esos ids
+        self.generation = None
         
     def add_question(self, question: Dict):
         """Agrega una pregunta a la sesión"""
         self.questions.append(question)
     
+    def set_questions(self, phrase_ids: List[int], option_ids: List[int], generation: Optional[str] = None):
+        """Guarda las preguntas sorteadas para toda la partida"""
+        self.phrase_ids = list(phrase_ids)
+        self.option_ids = list(option_ids)
+        self.generation = generation
+    
+    def get_current_ids(self) -> Tuple[int, List[int], Optional[str]]:
+        """Retorna (id_de_frase, ids_de_opciones, generación_del_corpus) de la pregunta actual"""
+        start = self.current_question * NUM_OPTIONS
+        return (self.phrase_ids[self.current_question], self.option_ids[start:start + NUM_OPTIONS],
+                self.generation)
+    
     def add_answer(self, is_correct: bool):
         """Registra una respuesta del usuario"""
         self.answers.append(is_correct)
@@ -122,12 +337,54 @@ class GameSession:
     
     def get_start_time_formatted(self) -> str:
         """Retorna la fecha y hora de inicio formateada"""
-        return self.start_time.strftime("%d/%m/%y %H:%M")
+        return self.start_time.strftime(START_TIME_FORMAT)
+    
+    def to_session_dict(self) -> Dict:
+        """Serializa la sesión sólo con ids enteros, puntaje y cursor"""
+        return {
+            'v': SESSION_SCHEMA_VERSION,
+            'username': self.username,
+            'num_phrases': self.num_phrases,
+            'cursor': self.current_question,
+            'score': self.score,
+            'start_time': int(self.start_time.timestamp()),
+            'phrase_ids': self.phrase_ids,
+            'option_ids': self.option_ids,
+            'generation': self.generation
+        }
+    
+    @classmethod
+    def from_session_dict(cls, data: Dict) -> Optional['GameSession']:
+        """Reconstruye la sesión; retorna None si el formato no es el esperado"""
+        if not data or data.get('v') != SESSION_SCHEMA_VERSION:
+            return None
+        game_session = cls(data['username'], data['num_phrases'])
+        game_session.current_question = data['cursor']
+        game_session.score = data['score']
+        game_session.start_time = datetime.fromtimestamp(data['start_time'])
+        game_session.set_questions(data['phrase_ids'], data['option_ids'], data['generation'])
+        return game_session
 
 class GameHistory:
-    def __init__(self, history_file: str = "data/game_history.json"):
+    def __init__(self, history_file: str = "data/game_history.json", journal: bool = False,
+                 fsync_every: int = 1, compact_every: int = 500):
         self.history_file = history_file
         self.history = []
+        self.stats = HistoryStats()
+        self.index = HistoryIndex()
+        self.players = PlayerIndex()
+        
+        # Modo diario: cada partida se agrega como una línea JSON en un archivo
+        # append-only y cada compact_every partidas se vuelca todo al snapshot
+        self.journal = journal
+        self.journal_file = os.path.splitext(history_file)[0] + '.jsonl'
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self._journal_handle = None
+        self._journal_entries = 0
+        self._pending_fsync = 0
+        self._lock = threading.Lock()
+        
         self.load_history()
     
     def load_history(self):
@@ -140,15 +397,98 @@ class GameHistory:
                 self.history = []
         except (json.JSONDecodeError, FileNotFoundError):
             self.history = []
+        
+        if self.journal:
+            self._replay_journal()
+        
+        # Agregados e índices de orden: se recorren todas las partidas una sola vez al cargar
+        self.stats = HistoryStats.from_games(self.history)
+        self.index = HistoryIndex.from_games(self.history)
+        self.players = PlayerIndex.from_games(self.history)
     
-    def save_history(self):
-        """Guarda el historial de juegos en el archivo"""
+    def _replay_journal(self):
+        """Aplica sobre el snapshot las partidas del diario que aún no fueron compactadas"""
+        self._journal_entries = 0
+        if not os.path.exists(self.journal_file):
+            return
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    entry = None
+                if entry is None or not line.endswith(b'\n'):
+                    # Última línea truncada por una caída durante la escritura
+                    break
+                valid_bytes += len(line)
+                self._journal_entries += 1
+                # 'seq' es la posición de la partida en el historial completo; si ya
+                # está en el snapshot (compactación interrumpida) se descarta
+                if entry['seq'] >= len(self.history):
+                    self.history.append(entry['game'])
+        
+        # Descartar la cola corrupta para que las próximas líneas queden bien formadas
+        if valid_bytes < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as file:
+                file.truncate(valid_bytes)
+    
+    def save_history(self) -> bool:
+        """Guarda el historial de juegos en el archivo; retorna True si se guardó"""
+        tmp_file = self.history_file + '.tmp'
         try:
             os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            with open(self.history_file, 'w', encoding='utf-8') as file:
+            # Escribir a un temporal y reemplazar, para no dejar un snapshot a medias
+            with open(tmp_file, 'w', encoding='utf-8') as file:
                 json.dump(self.history, file, ensure_ascii=False, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_file, self.history_file)
+            return True
         except Exception as e:
             print(f"Error al guardar historial: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return False
+    
+    def _append_journal(self, game_record: Dict):
+        """Agrega una partida al diario con una sola escritura"""
+        try:
+            if self._journal_handle is None:
+                os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+                self._journal_handle = open(self.journal_file, 'a', encoding='utf-8')
+            entry = {'seq': len(self.history) - 1, 'game': game_record}
+            self._journal_handle.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._journal_handle.flush()
+            
+            # fsync por lotes: con fsync_every > 1 se agrupan varias partidas por sincronización
+            self._pending_fsync += 1
+            if self._pending_fsync >= self.fsync_every:
+                os.fsync(self._journal_handle.fileno())
+                self._pending_fsync = 0
+            
+            self._journal_entries += 1
+            if self._journal_entries >= self.compact_every:
+                self.compact()
+        except Exception as e:
+            print(f"Error al escribir el diario del historial: {e}")
+    
+    def compact(self) -> bool:
+        """Vuelca el historial completo al snapshot y vacía el diario; retorna True si compactó
+        
+        El diario sólo se borra después de reemplazar el snapshot: si la escritura falla se
+        conserva entero y la compactación se reintenta con la próxima partida.
+        """
+        if not self.save_history():
+            return False
+        if self._journal_handle is not None:
+            self._journal_handle.close()
+            self._journal_handle = None
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_entries = 0
+        self._pending_fsync = 0
+        return True
     
     def add_game(self, session: GameSession):
         """Agrega una nueva sesión al historial"""
@@ -158,9 +498,52 @@ class GameHistory:
             'start_time': session.get_start_time_formatted(),
             'num_phrases': session.num_phrases
         }
-        self.history.append(game_record)
-        self.save_history()
+        with self._lock:
+            self.history.append(game_record)
+            self.stats.add(game_record)
+            self.index.add(game_record)
+            self.players.add(len(self.history), game_record)
+            if self.journal:
+                self._append_journal(game_record)
+            else:
+                self.save_history()
     
     def get_all_games(self) -> List[Dict]:
         """Retorna todo el historial de juegos"""
         return self.history
+    
+    def get_page(self, sort: str = 'date', descending: bool = True, cursor: Optional[str] = None,
+                 limit: int = PAGE_SIZE) -> Dict:
+        """Retorna una página del historial ordenado y el cursor de la página siguiente
+        
+        Cada partida incluye 'number', su posición de llegada al historial (desde 1).
+        """
+        after = decode_cursor(cursor, sort) if cursor else None
+        with self._lock:
+            seqs, next_cursor = self.index.page(sort, descending, after, limit)
+            games = [dict(self.history[seq], number=seq + 1) for seq in seqs]
+        return {'games': games, 'next_cursor': next_cursor}
+    
+    def get_leaderboard(self, k: int = LEADERBOARD_SIZE, min_games: int = 1) -> List[Dict]:
+        """Retorna los k mejores jugadores según el ranking del índice por jugador"""
+        with self._lock:
+            return self.players.leaderboard(k, min_games)
+    
+    def get_player(self, username: str, recent: int = 10) -> Optional[Dict]:
+        """Retorna el perfil de un jugador con sus últimas partidas, o None si no existe"""
+        with self._lock:
+            profile = self.players.get(username)
+            if profile is None:
+                return None
+            numbers = profile.numbers[-recent:].tolist() if recent > 0 else []
+            recent_games = [dict(self.history[number - 1], number=number) for number in reversed(numbers)]
+            return dict(profile.to_dict(), recent_games=recent_games)
+    
+    def iter_games(self, chunk_size: int = 1000, limit: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Recorre el historial en bloques de chunk_size partidas, en orden de llegada
+        
+        Con limit se recorren sólo las primeras partidas (p. ej. las de una copia de stats).
+        """
+        end = len(self.history) if limit is None else min(limit, len(self.history))
+        for start in range(0, end, chunk_size):
+            yield self.history[start:min(start + chunk_size, end)]
@@ -1,3 +1,5 @@
+from modules.trivia_game import DEFAULT_DIFFICULTY, DIFFICULTY_SIMILAR_OPTIONS
+
 def validate_num_phrases(num_phrases: str) -> tuple[bool, str, int]:
     """
     Valida el número de frases ingresado por el usuario
@@ -18,6 +20,22 @@ def validate_num_phrases(num_phrases: str) -> tuple[bool, str, int]:
     except ValueError:
         return False, "Debe ingresar un número válido", 0
 
+def validate_difficulty(difficulty: str) -> tuple[bool, str, str]:
+    """
+    Valida la dificultad elegida para la partida
+    
+    Args:
+        difficulty: String con la dificultad ('facil', 'media' o 'dificil'); vacío usa la de por defecto
+        
+    Returns:
+        tuple: (es_valido, mensaje_error, dificultad)
+    """
+    if not difficulty:
+        return True, "", DEFAULT_DIFFICULTY
+    if difficulty not in DIFFICULTY_SIMILAR_OPTIONS:
+        return False, "La dificultad debe ser fácil, media o difícil", DEFAULT_DIFFICULTY
+    return True, "", difficulty
+
 def validate_username(username: str) -> tuple[bool, str]:
     """
     Valida el nombre de usuario ingresado
@@ -1,27 +1,76 @@
-from flask import render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import render_template, request, redirect, url_for, session, flash, jsonify, send_file, abort
 from modules.config import app
 from modules.trivia_game import TriviaGame, GameSession, GameHistory
-from modules.validators import validate_num_phrases, validate_username, sanitize_input
-from modules.charts import GameCharts
+from modules.corpus_reloader import CorpusReloader
+from modules.history_db import SQLiteGameHistory
+from modules.validators import validate_num_phrases, validate_username, validate_difficulty, sanitize_input
+from modules.chart_profiles import RENDER_PROFILES
+from modules.chart_cache import ChartCache
+from modules.chart_service import ChartRenderService, CHART_RENDERERS
 from modules.pdf_generator import GameReportPDF
+from modules.report_jobs import ReportJobQueue, REPORT_KINDS
+from modules.history_index import SORT_FIELDS, PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+from modules.player_index import LEADERBOARD_SIZE, MAX_LEADERBOARD_SIZE
+from modules.movie_index import MOVIES_PAGE_SIZE, MAX_MOVIES_PAGE_SIZE, MAX_QUERY_LENGTH
 import os
 
 # Inicializar el juego, historial, gráficas y PDFs
-trivia_game = TriviaGame()
-game_history = GameHistory()
-game_charts = GameCharts()
-pdf_generator = GameReportPDF()
+trivia_game = TriviaGame(similar_distractors=app.config['SIMILAR_DISTRACTORS'])
+if app.config['HISTORY_BACKEND'] == 'sqlite':
+    game_history = SQLiteGameHistory()
+else:
+    game_history = GameHistory(journal=True)
+chart_cache = ChartCache()
+chart_service = ChartRenderService(chart_cache)
+# Los procesos de render se crean (fork) antes de arrancar cualquier hilo: un fork
+# mientras otro hilo importa numpy deja al proceso hijo bloqueado para siempre
+if app.config['CHARTS_WARM_UP']:
+    chart_service.warm_up()
+pdf_generator = GameReportPDF(app.config['REPORTS_DIR'])
+report_jobs = ReportJobQueue(chart_service, pdf_generator)
+
+# Recarga del corpus en segundo plano cuando cambia el archivo de frases
+corpus_reloader = CorpusReloader(trivia_game, app.config['CORPUS_RELOAD_INTERVAL'])
+if app.config['CORPUS_RELOAD_INTERVAL'] > 0:
+    corpus_reloader.start()
+# Índice de trigramas de la búsqueda de películas, armado sin frenar el arranque
+trivia_game.movie_index.warm_up()
+# Vecinos de los distractores parecidos, también en segundo plano
+if trivia_game.similar_distractors:
+    trivia_game.index.warm_up()
 
 @app.route('/')
 def index():
     """Página principal con explicación del juego y formulario de inicio"""
     return render_template('inicio.html')
 
+def movie_search_args() -> dict:
+    """Lee de la query string la búsqueda, la página y el tamaño de página"""
+    return {
+        'query': request.args.get('q', '').strip()[:MAX_QUERY_LENGTH],
+        'page': max(request.args.get('page', 1, type=int), 1),
+        'page_size': min(max(request.args.get('limit', MOVIES_PAGE_SIZE, type=int), 1), MAX_MOVIES_PAGE_SIZE)
+    }
+
 @app.route('/listar_peliculas')
 def listar_peliculas():
-    """Muestra la lista de todas las películas disponibles"""
-    movies = trivia_game.get_movies_list()
-    return render_template('listar_peliculas.html', movies=movies)
+    """Muestra una página de las películas disponibles, opcionalmente filtradas por nombre"""
+    args = movie_search_args()
+    result = trivia_game.search_movies(**args)
+    return render_template('listar_peliculas.html',
+                         movies=result['movies'],
+                         query=args['query'],
+                         page=result['page'],
+                         has_more=result['has_more'],
+                         total_movies=result['total_movies'])
+
+@app.route('/api/movies')
+def api_movies():
+    """Búsqueda de películas en JSON (mismos parámetros que la lista de películas)"""
+    args = movie_search_args()
+    result = trivia_game.search_movies(**args)
+    result.update({'query': args['query'], 'limit': args['page_size']})
+    return jsonify(result)
 
 @app.route('/iniciar_juego', methods=['POST'])
 def iniciar_juego():
@@ -32,6 +81,7 @@ def iniciar_juego():
     # Validar entrada
     is_valid_username, username_error = validate_username(username)
     is_valid_phrases, phrases_error, num_phrases_int = validate_num_phrases(num_phrases)
+    is_valid_difficulty, difficulty_error, difficulty = validate_difficulty(request.form.get('dificultad', ''))
     
     if not is_valid_username:
         flash(username_error, 'error')
@@ -41,36 +91,40 @@ def iniciar_juego():
         flash(phrases_error, 'error')
         return redirect(url_for('index'))
     
-    # Crear nueva sesión de juego
-    game_session = GameSession(username, num_phrases_int)
-    session['game_session'] = {
-        'username': username,
-        'num_phrases': num_phrases_int,
-        'current_question': 0,
-        'score': 0,
-        'start_time': game_session.start_time.isoformat()
-    }
+    if not is_valid_difficulty:
+        flash(difficulty_error, 'error')
+        return redirect(url_for('index'))
     
-    # Generar primera pregunta
-    question = trivia_game.generate_question()
-    if question:
-        session['current_question'] = question
-        return redirect(url_for('jugar_pregunta'))
-    else:
+    # Sortear todas las preguntas de la partida de una sola vez
+    questions = trivia_game.generate_game(num_phrases_int, difficulty)
+    if not questions:
         flash('Error al generar la pregunta. Intente nuevamente.', 'error')
         return redirect(url_for('index'))
+    
+    # Crear nueva sesión de juego; en la sesión de Flask sólo se guardan ids
+    game_session = GameSession(username, num_phrases_int)
+    game_session.set_questions(*questions)
+    session['game_session'] = game_session.to_session_dict()
+    
+    return redirect(url_for('jugar_pregunta'))
+
+def expired_game():
+    """Descarta una partida cuya generación del corpus ya no se conserva"""
+    session.pop('game_session', None)
+    flash('Las frases del juego se actualizaron. Inicie una nueva partida.', 'error')
+    return redirect(url_for('index'))
 
 @app.route('/jugar_pregunta')
 def jugar_pregunta():
     """Muestra la pregunta actual del juego"""
-    if 'game_session' not in session:
-        return redirect(url_for('index'))
-    
-    if 'current_question' not in session:
+    game_session = GameSession.from_session_dict(session.get('game_session'))
+    if not game_session:
         return redirect(url_for('index'))
     
-    question = session['current_question']
-    game_session = session['game_session']
+    # El texto de la pregunta se reconstruye desde el índice en memoria
+    question = trivia_game.build_question(*game_session.get_current_ids())
+    if question is None:
+        return expired_game()
     
     return render_template('pregunta.html', 
                          question=question, 
@@ -79,37 +133,30 @@ def jugar_pregunta():
 @app.route('/responder', methods=['POST'])
 def responder():
     """Procesa la respuesta del usuario"""
-    if 'game_session' not in session:
+    game_session = GameSession.from_session_dict(session.get('game_session'))
+    if not game_session:
         return redirect(url_for('index'))
     
     selected_movie = request.form.get('selected_movie', '')
-    current_question = session.get('current_question', {})
-    
-    if not selected_movie or not current_question:
+    if not selected_movie:
         return redirect(url_for('index'))
     
-    # Verificar respuesta
+    # Verificar respuesta contra la pregunta actual
+    current_question = trivia_game.build_question(*game_session.get_current_ids())
+    if current_question is None:
+        return expired_game()
     is_correct = trivia_game.check_answer(current_question, selected_movie)
     
     # Actualizar sesión
-    session['game_session']['current_question'] += 1
-    if is_correct:
-        session['game_session']['score'] += 1
+    game_session.add_answer(is_correct)
     
     # Verificar si el juego ha terminado
-    if session['game_session']['current_question'] >= session['game_session']['num_phrases']:
+    if game_session.is_finished():
         # Juego terminado, guardar en historial
-        game_session = GameSession(
-            session['game_session']['username'],
-            session['game_session']['num_phrases']
-        )
-        game_session.score = session['game_session']['score']
-        game_session.current_question = session['game_session']['current_question']
         game_history.add_game(game_session)
         
         # Limpiar sesión
         session.pop('game_session', None)
-        session.pop('current_question', None)
         
         return render_template('resultado_final.html', 
                              username=game_session.username,
@@ -117,51 +164,167 @@ def responder():
                              is_correct=is_correct,
                              correct_movie=current_question['correct_movie'])
     
-    # Generar siguiente pregunta
-    next_question = trivia_game.generate_question()
-    if next_question:
-        session['current_question'] = next_question
-        return render_template('pregunta.html', 
-                             question=next_question, 
-                             game_session=session['game_session'])
-    else:
-        flash('Error al generar la siguiente pregunta.', 'error')
-        return redirect(url_for('index'))
+    # Avanzar a la siguiente pregunta ya sorteada
+    session['game_session'] = game_session.to_session_dict()
+    next_question = trivia_game.build_question(*game_session.get_current_ids())
+    if next_question is None:
+        return expired_game()
+    return render_template('pregunta.html', 
+                         question=next_question, 
+                         game_session=game_session)
+
+def history_page_args() -> dict:
+    """Lee de la query string el orden, la dirección, el cursor y el tamaño de página"""
+    sort = request.args.get('sort', 'date')
+    order = request.args.get('order', 'desc')
+    return {
+        'sort': sort if sort in SORT_FIELDS else 'date',
+        'descending': order != 'asc',
+        'cursor': request.args.get('cursor') or None,
+        'limit': min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    }
 
 @app.route('/resultados_historicos')
 def resultados_historicos():
-    """Muestra el historial de todos los juegos con gráficas"""
-    games = game_history.get_all_games()
+    """Muestra una página del historial (ordenada en el servidor) con gráficas y resumen"""
+    stats = game_history.stats
+    page_args = history_page_args()
+    page = game_history.get_page(**page_args)
     
-    # Generar gráficas si hay datos
-    charts_paths = {}
+    # Gráficas: se piden en segundo plano y mientras tanto se muestran las últimas generadas
+    charts_status = None
     line_chart_url = None
     pie_chart_url = None
     pdf_report_url = None
     
-    if games:
-        charts_paths = game_charts.generate_charts(games)
-        
-        if charts_paths.get('line_chart'):
-            line_chart_url = game_charts.get_chart_url(charts_paths['line_chart'])
+    if stats.total_games:
+        version = stats.version()
+        charts_status = 'ready'
+        if not chart_cache.is_fresh(version, 'web'):
+            # El historial completo sólo se lee si hay que volver a renderizar
+            charts_status = chart_service.request_render(version, game_history.get_all_games(),
+                                                         stats, profile='web')
+        charts_urls = chart_cache.get_chart_urls('web')
+        line_chart_url = charts_urls.get('line_chart')
+        pie_chart_url = charts_urls.get('pie_chart')
         
-        if charts_paths.get('pie_chart'):
-            pie_chart_url = game_charts.get_chart_url(charts_paths['pie_chart'])
-        
-        # Verificar si ya existe un reporte PDF
-        reports_dir = "static/reports"
-        if os.path.exists(reports_dir):
-            pdf_files = [f for f in os.listdir(reports_dir) if f.endswith('.pdf')]
-            if pdf_files:
-                # Tomar el más reciente
-                latest_pdf = max(pdf_files, key=lambda x: os.path.getctime(os.path.join(reports_dir, x)))
-                pdf_report_url = f'/static/reports/{latest_pdf}'
+        # Último reporte PDF generado, según el índice de reportes
+        latest_report = pdf_generator.get_latest_report()
+        if latest_report:
+            pdf_report_url = pdf_generator.get_report_url(latest_report['path'])
     
     return render_template('resultados_historicos.html', 
-                         games=games,
+                         games=page['games'],
+                         next_cursor=page['next_cursor'],
+                         sort=page_args['sort'],
+                         order='desc' if page_args['descending'] else 'asc',
+                         summary=stats.to_dict(),
                          line_chart_url=line_chart_url,
                          pie_chart_url=pie_chart_url,
-                         pdf_report_url=pdf_report_url)
+                         charts_status=charts_status,
+                         pdf_report_url=pdf_report_url,
+                         report_job=report_jobs.get_job(request.args.get('reporte', '')))
+
+@app.route('/api/history')
+def api_history():
+    """Historial paginado en JSON (mismos parámetros que la página de resultados)"""
+    page_args = history_page_args()
+    if page_args['cursor'] and decode_cursor(page_args['cursor'], page_args['sort']) is None:
+        return jsonify({'error': 'Cursor inválido para el orden pedido'}), 400
+    page = game_history.get_page(**page_args)
+    return jsonify({
+        'games': page['games'],
+        'next_cursor': page['next_cursor'],
+        'sort': page_args['sort'],
+        'order': 'desc' if page_args['descending'] else 'asc',
+        'limit': page_args['limit'],
+        'total_games': game_history.stats.total_games,
+        'version': game_history.stats.version()
+    })
+
+def leaderboard_args() -> dict:
+    """Lee de la query string el tamaño del ranking y el mínimo de partidas por jugador"""
+    return {
+        'k': min(max(request.args.get('k', LEADERBOARD_SIZE, type=int), 1), MAX_LEADERBOARD_SIZE),
+        'min_games': max(request.args.get('min_partidas', 1, type=int), 1)
+    }
+
+@app.route('/ranking')
+def ranking():
+    """Muestra el ranking de jugadores (top-K del índice por jugador)"""
+    args = leaderboard_args()
+    return render_template('ranking.html',
+                         players=game_history.get_leaderboard(**args),
+                         min_games=args['min_games'],
+                         summary=game_history.stats.to_dict())
+
+@app.route('/api/leaderboard')
+def api_leaderboard():
+    """Ranking de jugadores en JSON"""
+    args = leaderboard_args()
+    return jsonify({
+        'players': game_history.get_leaderboard(**args),
+        'k': args['k'],
+        'min_games': args['min_games'],
+        'version': game_history.stats.version()
+    })
+
+@app.route('/api/players/<username>')
+def api_player(username):
+    """Perfil de un jugador en JSON: aciertos, promedio, mejor partida, rachas y últimas partidas"""
+    recent = min(max(request.args.get('recientes', 10, type=int), 0), MAX_PAGE_SIZE)
+    player = game_history.get_player(username, recent)
+    if player is None:
+        return jsonify({'error': 'Jugador no encontrado'}), 404
+    return jsonify(player)
+
+@app.route('/estado_graficas')
+def estado_graficas():
+    """Estado del render de gráficas en segundo plano, para consultar desde la página"""
+    profile = request.args.get('perfil', 'web')
+    if profile not in RENDER_PROFILES:
+        abort(404)
+    version = game_history.stats.version()
+    return jsonify({
+        'status': chart_service.status(version, profile),
+        'version': version,
+        'charts': chart_cache.get_chart_urls(profile)
+    })
+
+@app.route('/graficas/<nombre>')
+def servir_grafica(nombre):
+    """Sirve una gráfica en el perfil pedido ('web', 'print' o 'svg'), generándola a pedido
+
+    Nunca espera al render: mientras se regenera se sirve la última versión del perfil y,
+    si el perfil todavía no se generó, se responde 202 para consultar /estado_graficas.
+    """
+    profile = request.args.get('perfil', 'web')
+    if nombre not in CHART_RENDERERS or profile not in RENDER_PROFILES:
+        abort(404)
+    
+    version = game_history.stats.version()
+    charts_status = 'ready'
+    if not chart_cache.is_fresh(version, profile):
+        if not game_history.stats.total_games:
+            abort(404)
+        charts_status = chart_service.request_render(version, game_history.get_all_games(),
+                                                     game_history.stats, profile=profile)
+    
+    chart_path = chart_service.get_last_good_charts(profile).get(nombre)
+    if not chart_path or not os.path.exists(chart_path):
+        if charts_status == 'ready':
+            # Generada pero sin datos suficientes para esta gráfica
+            abort(404)
+        response = jsonify({
+            'status': charts_status,
+            'status_url': url_for('estado_graficas', perfil=profile),
+            'chart_url': url_for('servir_grafica', nombre=nombre, perfil=profile)
+        })
+        if charts_status == 'error':
+            return response, 503
+        response.headers['Retry-After'] = '2'
+        return response, 202
+    return send_file(chart_path, max_age=0)
 
 @app.route('/actualizar_graficas')
 def actualizar_graficas():
@@ -169,44 +332,64 @@ def actualizar_graficas():
     games = game_history.get_all_games()
     
     if games:
-        # Generar nuevas gráficas
-        charts_paths = game_charts.generate_charts(games)
-        flash('Gráficas actualizadas correctamente.', 'info')
+        # Regenerar en segundo plano; mientras tanto se siguen mostrando las gráficas anteriores
+        chart_cache.mark_stale()
+        chart_service.request_render(game_history.stats.version(), games, game_history.stats, profile='web')
+        flash('Las gráficas se están actualizando.', 'info')
     else:
         flash('No hay datos para generar gráficas.', 'error')
     
     return redirect(url_for('resultados_historicos'))
 
-@app.route('/generar_reporte_pdf')
+@app.route('/generar_reporte_pdf', methods=['GET', 'POST'])
 def generar_reporte_pdf():
-    """Genera y descarga un reporte PDF completo"""
-    games = game_history.get_all_games()
+    """Encola la generación del reporte PDF; los pedidos de la misma versión comparten trabajo
     
-    if not games:
+    Con tipo=completo se exportan todas las partidas del historial en tablas paginadas.
+    """
+    kind = request.values.get('tipo', 'trivia')
+    if kind not in REPORT_KINDS:
+        kind = 'trivia'
+    if not game_history.stats.total_games:
+        if request.method == 'POST':
+            return jsonify({'error': 'No hay datos para generar el reporte.'}), 400
         flash('No hay datos para generar el reporte.', 'error')
         return redirect(url_for('resultados_historicos'))
     
-    try:
-        # Generar gráficas primero
-        charts_paths = game_charts.generate_charts(games)
-        import logging
-        app.logger.info(charts_paths)
-        
-        # Generar reporte PDF
-        pdf_path = pdf_generator.generate_report(games, charts_paths)
-        
-        if pdf_path and os.path.exists(pdf_path):
-            # Enviar archivo para descarga
-            return send_file(pdf_path, as_attachment=True, 
-                           download_name=os.path.basename(pdf_path),
-                           cache_timeout=0)
-        else:
-            flash('Error al generar el reporte PDF.', 'error')
-            return redirect(url_for('resultados_historicos'))
-            
-    except Exception as e:
-        flash(f'Error al generar el reporte: {str(e)}', 'error')
+    job = report_jobs.submit(game_history, kind)
+    if request.method == 'POST':
+        return jsonify(report_job_status(job)), 202
+    if job.status == 'done':
+        return redirect(url_for('descargar_reporte', job_id=job.id))
+    # La página de resultados consulta el estado y descarga el PDF cuando está listo
+    return redirect(url_for('resultados_historicos', reporte=job.id))
+
+def report_job_status(job) -> dict:
+    """Estado del trabajo con las URLs para consultarlo y descargarlo"""
+    status = job.to_dict()
+    status['status_url'] = url_for('estado_reporte', job_id=job.id)
+    status['download_url'] = url_for('descargar_reporte', job_id=job.id) if job.status == 'done' else None
+    return status
+
+@app.route('/estado_reporte/<job_id>')
+def estado_reporte(job_id):
+    """Estado de un trabajo de generación de reporte"""
+    job = report_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Trabajo inexistente'}), 404
+    return jsonify(report_job_status(job))
+
+@app.route('/descargar_reporte/<job_id>')
+def descargar_reporte(job_id):
+    """Descarga el PDF de un trabajo terminado"""
+    job = report_jobs.get_job(job_id)
+    if not job or job.status != 'done' or not os.path.exists(job.path):
+        flash('El reporte no está disponible. Genérelo nuevamente.', 'error')
         return redirect(url_for('resultados_historicos'))
+    # send_file transmite el archivo en bloques sin cargarlo entero en memoria
+    return send_file(job.path, as_attachment=True,
+                     download_name=os.path.basename(job.path),
+                     max_age=0)
 
 @app.route('/reiniciar')
 def reiniciar():
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from modules.chart_cache import ChartCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return ChartCache(str(tmp_path / 'charts'))
+
+def write_chart(cache: ChartCache, name: str) -> str:
+    """Crea un archivo de gráfica falso en el directorio de la caché"""
+    path = os.path.join(cache.charts_dir, name)
+    with open(path, 'wb') as file:
+        file.write(b'imagen')
+    return path
+
+def test_store_makes_version_fresh_and_survives_restart(cache):
+    paths = {'line_chart': write_chart(cache, 'line.webp'), 'pie_chart': None}
+    cache.store('v1', paths, 'web')
+
+    assert cache.is_fresh('v1', 'web')
+    assert not cache.is_fresh('v2', 'web')
+    assert not cache.is_fresh('v1', 'print')
+    reopened = ChartCache(cache.charts_dir)
+    assert reopened.is_fresh('v1', 'web')
+    assert reopened.get_cached_paths('web') == paths
+
+def test_modified_file_invalidates_version(cache):
+    path = write_chart(cache, 'line.webp')
+    cache.store('v1', {'line_chart': path}, 'web')
+    os.utime(path, (1, 1))
+
+    assert not cache.is_fresh('v1', 'web')
+
+def test_profiles_keep_their_own_version(cache):
+    cache.store('v1', {'line_chart': write_chart(cache, 'line.webp')}, 'web')
+    cache.store('v2', {'line_chart': write_chart(cache, 'line.png')}, 'print')
+
+    assert cache.is_fresh('v1', 'web')
+    assert cache.is_fresh('v2', 'print')
+
+def test_mark_stale_keeps_serving_previous_charts(cache):
+    path = write_chart(cache, 'line.webp')
+    cache.store('v1', {'line_chart': path}, 'web')
+    cache.mark_stale()
+
+    assert not cache.is_fresh('v1', 'web')
+    assert cache.get_cached_paths('web') == {'line_chart': path}
+    assert cache.get_chart_urls('web')['line_chart'] == '/static/charts/line.webp?v=v1'
+    assert not ChartCache(cache.charts_dir).is_fresh('v1', 'web')
+
+    new_path = write_chart(cache, 'line2.webp')
+    cache.store('v1', {'line_chart': new_path}, 'web')
+    assert cache.is_fresh('v1', 'web')
@@ -0,0 +1,170 @@
+import os
+import signal
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from modules import chart_service as chart_service_module
+from modules.chart_cache import ChartCache
+from modules.chart_service import CHART_RENDERERS, ChartRenderService
+from modules.history_stats import HistoryStats
+
+GAMES = [{'username': f'jugador{i % 3}', 'score': f'{i % 6}/5', 'start_time': f'0{1 + i % 9}/05/24 12:00',
+          'num_phrases': 5} for i in range(12)]
+
+class FakeExecutor:
+    """Pool que guarda las tareas para completarlas a mano desde la prueba"""
+    created = []
+
+    def __init__(self, *args, **kwargs):
+        self.tasks = []
+        self.closed = False
+        FakeExecutor.created.append(self)
+
+    def submit(self, func, *args):
+        if self.closed:
+            raise RuntimeError('cannot schedule new futures after shutdown')
+        future = Future()
+        self.tasks.append((future, func, args))
+        return future
+
+    def finish(self, charts_dir: str):
+        """Completa las tareas pendientes (y las que éstas lancen) con datos y archivos falsos"""
+        pending = [task for task in self.tasks if not task[0].done()]
+        while pending:
+            for future, func, args in pending:
+                if func is chart_service_module._prepare_chart_data:
+                    future.set_result(('datos', len(args[0])))
+                    continue
+                path = os.path.join(charts_dir, f'{args[0]}.png')
+                with open(path, 'wb') as file:
+                    file.write(b'imagen')
+                future.set_result(path)
+            pending = [task for task in self.tasks if not task[0].done()]
+
+    def shutdown(self, wait: bool = True):
+        self.closed = True
+
+    def break_pool(self):
+        """Simula la muerte de un proceso: todas las tareas fallan con BrokenProcessPool"""
+        for future, _, _ in self.tasks:
+            if not future.done():
+                future.set_exception(BrokenProcessPool('proceso terminado'))
+
+class BrokenExecutor:
+    """Pool roto: rechaza toda tarea nueva"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def submit(self, func, *args):
+        raise BrokenProcessPool('pool roto')
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    FakeExecutor.created = []
+    monkeypatch.setattr(chart_service_module, 'ProcessPoolExecutor', FakeExecutor)
+    return ChartRenderService(ChartCache(str(tmp_path / 'charts')))
+
+def test_render_stores_charts_and_reports_ready(service):
+    stats = HistoryStats.from_games(GAMES)
+    assert service.request_render('v1', GAMES, stats, 'web') == 'rendering'
+    assert service.status('v1', 'web') == 'rendering'
+
+    FakeExecutor.created[0].finish(service.chart_cache.charts_dir)
+    assert service.status('v1', 'web') == 'ready'
+    assert set(service.get_last_good_charts('web')) == set(CHART_RENDERERS)
+    assert service._running is None
+
+def test_data_is_prepared_once_and_shared_by_every_chart(service):
+    service.request_render('v1', GAMES, None, 'web')
+    executor = FakeExecutor.created[0]
+    assert [task[1] for task in executor.tasks] == [chart_service_module._prepare_chart_data]
+
+    executor.finish(service.chart_cache.charts_dir)
+    prepare, *renders = executor.tasks
+    assert prepare[2] == (GAMES,)
+    assert {args[0] for _, func, args in renders} == set(CHART_RENDERERS)
+    assert all(func is chart_service_module._render_chart and args[1] == ('datos', len(GAMES))
+               for _, func, args in renders)
+
+def test_requests_during_a_render_collapse_to_the_latest(service):
+    service.request_render('v1', GAMES, None, 'web')
+    service.request_render('v2', GAMES, None, 'web')
+    service.request_render('v3', GAMES, None, 'web')
+
+    executor = FakeExecutor.created[0]
+    executor.finish(service.chart_cache.charts_dir)
+    # Se renderizaron v1 y v3 (preparar + gráficas); v2 se descartó
+    assert len(executor.tasks) == 2 * (1 + len(CHART_RENDERERS))
+    assert service.status('v3', 'web') == 'ready'
+    assert service.status('v2', 'web') == 'rendering'
+    assert service._running is None
+
+def test_broken_pool_on_submit_is_replaced(service):
+    service._executor = BrokenExecutor()
+
+    assert service.request_render('v1', GAMES, None, 'web') == 'rendering'
+    assert service._running == ('v1', 'web')
+    FakeExecutor.created[0].finish(service.chart_cache.charts_dir)
+    assert service.status('v1', 'web') == 'ready'
+
+def test_pool_that_stays_broken_marks_version_failed(service, monkeypatch):
+    monkeypatch.setattr(chart_service_module, 'ProcessPoolExecutor', BrokenExecutor)
+
+    service.request_render('v1', GAMES, None, 'web')
+    assert service._running is None
+    assert service.status('v1', 'web') == 'error'
+    assert service.render_and_wait('v1', GAMES, timeout=5, profile='web') == {}
+
+def test_pool_broken_while_rendering_is_recovered(service):
+    service.request_render('v1', GAMES, None, 'web')
+    service.request_render('v2', GAMES, None, 'print')
+
+    FakeExecutor.created[0].break_pool()
+    assert service.status('v1', 'web') == 'error'
+    assert service._executor is not FakeExecutor.created[0]
+    # El pedido pendiente arrancó en un pool nuevo
+    assert service._running == ('v2', 'print')
+    FakeExecutor.created[1].finish(service.chart_cache.charts_dir)
+    assert service.status('v2', 'print') == 'ready'
+
+    # La versión que falló se puede volver a pedir
+    service.request_render('v1', GAMES, None, 'web')
+    FakeExecutor.created[1].finish(service.chart_cache.charts_dir)
+    assert service.status('v1', 'web') == 'ready'
+
+def test_pool_shut_down_with_pending_requests_fails_them_all(service):
+    service.request_render('v1', GAMES, None, 'web')
+    service.request_render('v2', GAMES, None, 'print')
+    service.request_render('v3', GAMES, None, 'svg')
+    executor = FakeExecutor.created[0]
+    executor.shutdown()
+
+    # Al terminar la preparación ya no se pueden lanzar sus gráficas ni los pendientes
+    executor.finish(service.chart_cache.charts_dir)
+    assert service.status('v1', 'web') == 'error'
+    assert service.status('v2', 'print') == 'error'
+    assert service.status('v3', 'svg') == 'error'
+    assert 'after shutdown' in service.last_error
+    assert service._running is None and service._pending == {}
+    assert service.render_and_wait('v2', GAMES, timeout=5, profile='print') == {}
+
+def test_killed_workers_do_not_wedge_the_service(tmp_path):
+    service = ChartRenderService(ChartCache(str(tmp_path / 'charts')))
+    stats = HistoryStats.from_games(GAMES)
+    assert service.render_and_wait('v1', GAMES, stats, timeout=120, profile='web')
+
+    executor = service._executor
+    for process in list(executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    deadline = time.time() + 30
+    while not executor._broken and time.time() < deadline:
+        time.sleep(0.05)
+
+    stats.add_values('nuevo', 3, 5, None)
+    charts = service.render_and_wait(stats.version(), GAMES, stats, timeout=120, profile='web')
+    assert set(charts) == set(CHART_RENDERERS)
+    assert service.status(stats.version(), 'web') == 'ready'
+    service._executor.shutdown()
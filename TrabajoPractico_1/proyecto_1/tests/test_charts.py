@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pytest
+
+from modules.chart_profiles import RENDER_PROFILES
+from modules.charts import MAX_BARS, TOP_PLAYERS, GameCharts, _bucket_means, _lttb
+from modules.history_stats import HistoryStats
+
+GAMES = [
+    {'username': 'ANA', 'score': '4/5', 'start_time': '11/08/25 14:56', 'num_phrases': 5},
+    {'username': 'LUIS', 'score': '1/5', 'start_time': '12/08/25 09:05', 'num_phrases': 5},
+    {'username': 'ANA', 'score': 'x/5', 'start_time': '13/08/25 22:10', 'num_phrases': 5},
+    {'username': 'SOFIA', 'score': '3/3', 'start_time': 'fecha rota', 'num_phrases': 3},
+]
+
+def test_prepare_columns_parses_dates_scores_and_users(tmp_path):
+    columns = GameCharts(str(tmp_path))._prepare_columns(GAMES)
+
+    # La fecha inválida se descarta; la puntuación mal formada cuenta como 0/0
+    assert columns['dates'].tolist() == [np.datetime64('2025-08-11T14:56'), np.datetime64('2025-08-12T09:05'),
+                                         np.datetime64('2025-08-13T22:10')]
+    assert columns['aciertos'].tolist() == [4, 1, 0]
+    assert columns['totales'].tolist() == [5, 5, 0]
+    assert columns['porcentajes'].tolist() == [80.0, 20.0, 0.0]
+    assert columns['user_names'][columns['user_codes']].tolist() == ['ANA', 'LUIS', 'ANA']
+
+def test_dates_that_do_not_exist_in_the_calendar_are_dropped(tmp_path):
+    games = GAMES[:2] + [
+        {'username': 'PEDRO', 'score': '2/5', 'start_time': '31/02/25 10:00', 'num_phrases': 5},
+        {'username': 'PEDRO', 'score': '5/5', 'start_time': '10/13/25 25:00', 'num_phrases': 5},
+    ]
+    charts = GameCharts(str(tmp_path))
+    columns = charts._prepare_columns(games)
+
+    assert columns['dates'].tolist() == [np.datetime64('2025-08-11T14:56'), np.datetime64('2025-08-12T09:05')]
+    assert columns['aciertos'].tolist() == [4, 1]
+    assert columns['user_names'][columns['user_codes']].tolist() == ['ANA', 'LUIS']
+    assert os.path.exists(charts.generate_performance_dashboard(games))
+
+def test_charts_render_from_prepared_data_without_games(tmp_path):
+    charts = GameCharts(str(tmp_path))
+    data = charts._prepare_data_for_charts(GAMES)
+
+    dashboard = charts.generate_performance_dashboard(None, None, data)
+    circular = charts.generate_circular_performance_chart(None, None, data)
+    assert os.path.exists(dashboard) and os.path.exists(circular)
+
+def test_charts_without_games_or_data_return_none(tmp_path):
+    charts = GameCharts(str(tmp_path))
+    assert charts.generate_charts([]) == {'line_chart': None, 'pie_chart': None}
+
+def test_parallel_charts_match_the_sequential_ones(tmp_path):
+    sequential = GameCharts(str(tmp_path / 'secuencial')).generate_all_charts(GAMES)
+    parallel = GameCharts(str(tmp_path / 'paralelo')).generate_all_charts(GAMES, parallel=True, max_workers=2)
+
+    assert set(parallel) == set(sequential) == {'dashboard', 'circular', 'timeline'}
+    for name, path in parallel.items():
+        assert os.path.exists(path) and os.path.dirname(path) == str(tmp_path / 'paralelo')
+        assert os.path.basename(path) == os.path.basename(sequential[name])
+
+def many_games(count: int) -> list:
+    """Partidas de 25 jugadores con cantidades distintas (sin empates en el ranking)"""
+    usernames = [f'jugador{player}' for player in range(25) for _ in range(player + 1)]
+    return [{'username': usernames[i % len(usernames)], 'score': f'{i % 6}/5',
+             'start_time': f'{1 + i % 28:02d}/05/24 {i % 24:02d}:{i % 60:02d}', 'num_phrases': 5}
+            for i in range(count)]
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    values = np.sin(np.linspace(0, 20, 5000))
+    values[1234] = 5.0
+    selected = _lttb(values, 200)
+
+    assert len(selected) == 200
+    assert selected[0] == 0 and selected[-1] == 4999
+    assert np.all(np.diff(selected) > 0)
+    assert 1234 in selected
+    assert np.array_equal(_lttb(values[:50], 200), np.arange(50))
+
+def test_bucket_means_average_consecutive_games():
+    assert _bucket_means([0, 10, 20, 30, 40, 50], 3).tolist() == [5.0, 25.0, 45.0]
+
+def test_dashboard_aggregates_large_histories_by_player(tmp_path):
+    games = many_games(325 * 10)
+    charts = GameCharts(str(tmp_path))
+    dates, aciertos, desaciertos, _, _, usernames = charts._prepare_data_for_charts(games)
+
+    labels, hits, misses, title = charts._dashboard_bars(dates, aciertos, desaciertos, usernames)
+    assert len(labels) == TOP_PLAYERS and 'Top' in title
+    # Con stats se leen los totales por jugador en lugar de recorrer las partidas
+    stats = HistoryStats.from_games(games)
+    with_stats = charts._dashboard_bars(dates, aciertos, desaciertos, usernames, stats)
+    assert sorted(zip(labels, hits.tolist(), misses.tolist())) == \
+        sorted(zip(with_stats[0], with_stats[1].tolist(), with_stats[2].tolist()))
+
+    few = charts._dashboard_bars(dates[:MAX_BARS], aciertos[:MAX_BARS], desaciertos[:MAX_BARS], usernames[:MAX_BARS])
+    assert len(few[0]) == MAX_BARS
+
+def test_dashboard_renders_a_large_history(tmp_path):
+    games = many_games(20000)
+    paths = GameCharts(str(tmp_path)).generate_charts(games, HistoryStats.from_games(games))
+    assert all(os.path.exists(path) for path in paths.values())
+
+@pytest.mark.parametrize('profile, magic', [('web', b'RIFF'), ('print', b'\x89PNG'), ('svg', b'<?xml')])
+def test_each_profile_writes_its_own_format(tmp_path, profile, magic):
+    charts = GameCharts(str(tmp_path))
+    path = charts.generate_circular_performance_chart(GAMES, profile=profile)
+
+    assert path.endswith(f"_{profile}.{RENDER_PROFILES[profile]['format']}")
+    with open(path, 'rb') as file:
+        assert file.read(5).startswith(magic)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from modules.corpus_reloader import CorpusReloader
+from modules.phrase_store import compile_corpus
+from modules.trivia_game import NUM_OPTIONS, TriviaGame
+
+def write_corpus(path, num_phrases: int, prefix: str = 'Frase'):
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(num_phrases):
+            file.write(f"{prefix} {i};Película {i % 6}\n")
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'frases.txt'
+    write_corpus(path, 20)
+    return str(path)
+
+def test_unchanged_corpus_is_not_reloaded(corpus_path):
+    reloader = CorpusReloader(TriviaGame(corpus_path))
+    assert reloader.check() is False
+    assert reloader.reloads == 0
+
+def test_changed_corpus_is_published_as_a_new_generation(corpus_path):
+    game = TriviaGame(corpus_path)
+    old_generation = game.generation
+    write_corpus(corpus_path, 25, prefix='Nueva')
+
+    reloader = CorpusReloader(game)
+    assert reloader.check() is True
+    assert game.generation != old_generation
+    assert len(game.phrases_data) == 25 and game.phrases_data[0]['phrase'] == 'Nueva 0'
+    # El índice de títulos y los vecinos de la generación nueva ya están armados antes de publicarla
+    assert game.corpus.movie_index._trigrams is not None
+    assert game.corpus.index._neighbors is not None
+
+def test_reload_without_similar_distractors_leaves_the_neighbors_for_later(corpus_path):
+    game = TriviaGame(corpus_path, similar_distractors=False)
+    write_corpus(corpus_path, 25, prefix='Nueva')
+    assert game.reload_if_changed() is True
+    assert game.corpus.index._neighbors is None
+
+def test_game_started_before_a_reload_keeps_its_questions(corpus_path):
+    game = TriviaGame(corpus_path, keep_generations=2)
+    phrase_ids, option_ids, generation = game.generate_game(3)
+    before = game.build_question(phrase_ids[0], option_ids[:NUM_OPTIONS], generation)
+
+    write_corpus(corpus_path, 25, prefix='Nueva')
+    game.reload_if_changed()
+    assert game.build_question(phrase_ids[0], option_ids[:NUM_OPTIONS], generation) == before
+
+    # Pasadas keep_generations recargas la generación vieja se descarta
+    write_corpus(corpus_path, 30, prefix='Otra')
+    game.reload_if_changed()
+    assert game.build_question(phrase_ids[0], option_ids[:NUM_OPTIONS], generation) is None
+
+def test_recompiling_the_corpus_triggers_a_reload(corpus_path):
+    game = TriviaGame(corpus_path)
+    compile_corpus(corpus_path)
+
+    assert game.reload_if_changed() is True
+    assert game.phrases_data._mmap is not None
+    assert game.reload_if_changed() is False
+
+def test_recompiling_without_touching_the_text_is_a_new_generation(corpus_path):
+    compiled_path, _ = compile_corpus(corpus_path)
+    game = TriviaGame(corpus_path, keep_generations=2)
+    assert game.phrases_data.is_compiled
+    phrase_ids, option_ids, generation = game.generate_game(3)
+    before = game.build_question(phrase_ids[0], option_ids[:NUM_OPTIONS], generation)
+
+    # Mismo texto, compilado reescrito con otro mtime
+    stat = os.stat(compiled_path)
+    compile_corpus(corpus_path)
+    os.utime(compiled_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert game.reload_if_changed() is True
+    assert game.generation != generation
+    assert game.build_question(phrase_ids[0], option_ids[:NUM_OPTIONS], generation) == before
+
+def test_failed_reload_keeps_the_current_generation(corpus_path, monkeypatch):
+    game = TriviaGame(corpus_path)
+    corpus = game.corpus
+    write_corpus(corpus_path, 25, prefix='Nueva')
+    def broken_build():
+        raise OSError('disco ilegible')
+    monkeypatch.setattr(game, '_build_corpus', broken_build)
+
+    reloader = CorpusReloader(game)
+    assert reloader.check() is False
+    assert reloader.last_error == 'disco ilegible'
+    assert game.corpus is corpus
+
+def test_background_thread_picks_up_changes(corpus_path):
+    game = TriviaGame(corpus_path)
+    reloader = CorpusReloader(game, interval=0.01)
+    reloader.start()
+    try:
+        write_corpus(corpus_path, 25, prefix='Nueva')
+        deadline = time.time() + 10
+        while reloader.reloads == 0 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        reloader.stop()
+    assert reloader.reloads == 1
+    assert len(game.phrases_data) == 25
@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from modules import trivia_game
+from modules.trivia_game import GameHistory, GameSession
+
+def make_session(username: str, score: int, num_phrases: int = 5, minute: int = 0) -> GameSession:
+    """Sesión terminada con el puntaje indicado"""
+    session = GameSession(username, num_phrases)
+    session.score = score
+    session.start_time = datetime(2024, 5, 1, 12, minute)
+    return session
+
+@pytest.fixture
+def history_file(tmp_path):
+    return str(tmp_path / 'game_history.json')
+
+def test_snapshot_mode_persists_every_game(history_file):
+    history = GameHistory(history_file)
+    history.add_game(make_session('ana', 3))
+    history.add_game(make_session('beto', 5, minute=1))
+
+    with open(history_file, encoding='utf-8') as file:
+        saved = json.load(file)
+    assert [game['username'] for game in saved] == ['ana', 'beto']
+    assert saved[1]['score'] == '5/5'
+    assert GameHistory(history_file).get_all_games() == saved
+
+def test_journal_replay_restores_games_without_snapshot(history_file):
+    history = GameHistory(history_file, journal=True, compact_every=100)
+    for minute in range(4):
+        history.add_game(make_session(f'jugador{minute}', minute, minute=minute))
+
+    assert not os.path.exists(history_file)
+    reloaded = GameHistory(history_file, journal=True)
+    assert [game['username'] for game in reloaded.get_all_games()] == [f'jugador{i}' for i in range(4)]
+    assert reloaded.stats.version() == history.stats.version()
+
+def test_journal_replay_drops_truncated_tail(history_file):
+    history = GameHistory(history_file, journal=True, compact_every=100)
+    history.add_game(make_session('ana', 3))
+    history.add_game(make_session('beto', 4, minute=1))
+    history._journal_handle.close()
+    with open(history.journal_file, 'a', encoding='utf-8') as file:
+        file.write('{"seq": 2, "game": {"username": "cor')
+
+    reloaded = GameHistory(history_file, journal=True)
+    assert [game['username'] for game in reloaded.get_all_games()] == ['ana', 'beto']
+    with open(history.journal_file, 'rb') as file:
+        assert file.read().endswith(b'\n')
+
+def test_compaction_writes_snapshot_and_clears_journal(history_file):
+    history = GameHistory(history_file, journal=True, compact_every=3)
+    for minute in range(4):
+        history.add_game(make_session('ana', minute, minute=minute))
+
+    with open(history_file, encoding='utf-8') as file:
+        assert len(json.load(file)) == 3
+    with open(history.journal_file, encoding='utf-8') as file:
+        assert [json.loads(line)['seq'] for line in file] == [3]
+    assert len(GameHistory(history_file, journal=True).get_all_games()) == 4
+
+def test_replay_skips_entries_already_in_snapshot(history_file):
+    history = GameHistory(history_file, journal=True, compact_every=100)
+    for minute in range(3):
+        history.add_game(make_session('ana', minute, minute=minute))
+    # Compactación interrumpida: el snapshot se escribió pero el diario no se borró
+    history.save_history()
+
+    assert len(GameHistory(history_file, journal=True).get_all_games()) == 3
+
+def test_failed_snapshot_keeps_journal(history_file, monkeypatch):
+    history = GameHistory(history_file, journal=True, compact_every=3)
+
+    def failing_replace(src, dst):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(trivia_game.os, 'replace', failing_replace)
+    for minute in range(3):
+        history.add_game(make_session('ana', minute, minute=minute))
+
+    assert os.path.exists(history.journal_file)
+    assert not os.path.exists(history_file)
+    assert not os.path.exists(history_file + '.tmp')
+    monkeypatch.undo()
+
+    assert len(GameHistory(history_file, journal=True).get_all_games()) == 3
+    # La compactación se reintenta con la próxima partida
+    history.add_game(make_session('ana', 4, minute=4))
+    assert not os.path.exists(history.journal_file)
+    assert len(GameHistory(history_file, journal=True).get_all_games()) == 4
@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from modules.history_db import SQLiteGameHistory
+from modules.history_stats import HistoryStats
+from modules.trivia_game import GameHistory, GameSession
+
+def make_session(username: str, score: int, num_phrases: int = 5, minute: int = 0) -> GameSession:
+    """Sesión terminada con el puntaje indicado"""
+    session = GameSession(username, num_phrases)
+    session.score = score
+    session.start_time = datetime(2024, 5, 1, 12, minute % 60)
+    return session
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / 'game_history.sqlite3')
+
+def test_games_survive_reopening(db_file):
+    history = SQLiteGameHistory(db_file)
+    history.add_game(make_session('ana', 3))
+    history.add_game(make_session('beto', 5, minute=1))
+
+    reopened = SQLiteGameHistory(db_file)
+    assert reopened.get_all_games() == history.get_all_games()
+    assert [game['score'] for game in reopened.get_all_games()] == ['3/5', '5/5']
+    assert reopened.stats.version() == history.stats.version()
+
+def test_aggregates_match_a_full_recount(db_file):
+    history = SQLiteGameHistory(db_file)
+    for minute in range(20):
+        history.add_game(make_session(f'jugador{minute % 3}', minute % 6, minute=minute))
+
+    recount = HistoryStats.from_games(history.get_all_games())
+    assert history.stats.to_dict() == recount.to_dict()
+    assert history.stats.version() == recount.version()
+
+def test_aggregates_follow_games_written_by_another_process(db_file):
+    worker_a = SQLiteGameHistory(db_file)
+    worker_b = SQLiteGameHistory(db_file)
+    worker_a.add_game(make_session('ana', 4))
+    worker_b.add_game(make_session('beto', 2, minute=1))
+
+    for worker in (worker_a, worker_b):
+        assert worker.stats.total_games == 2
+    assert worker_a.stats.version() == worker_b.stats.version()
+    assert worker_a.stats.version() == SQLiteGameHistory(db_file).stats.version()
+
+def test_concurrent_writers_keep_aggregates_consistent(db_file):
+    history = SQLiteGameHistory(db_file)
+
+    def play(thread_id):
+        for game in range(25):
+            history.add_game(make_session(f'jugador{thread_id}', game % 6, minute=game))
+
+    threads = [threading.Thread(target=play, args=(thread_id,)) for thread_id in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert history.stats.total_games == 150
+    assert history.stats.version() == HistoryStats.from_games(history.get_all_games()).version()
+
+def test_cursor_pages_cover_history_without_repeats(db_file):
+    history = SQLiteGameHistory(db_file)
+    for minute in range(23):
+        history.add_game(make_session(f'jugador{minute % 4}', minute % 6, minute=minute))
+
+    for sort in ('date', 'score', 'player'):
+        numbers, cursor = [], None
+        while True:
+            page = history.get_page(sort=sort, descending=True, cursor=cursor, limit=5)
+            numbers.extend(game['number'] for game in page['games'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert sorted(numbers) == list(range(1, 24)), sort
+
+def test_iter_games_reads_in_chunks(db_file):
+    history = SQLiteGameHistory(db_file)
+    for minute in range(7):
+        history.add_game(make_session('ana', minute % 6, minute=minute))
+
+    chunks = list(history.iter_games(chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [len(chunk) for chunk in history.iter_games(chunk_size=3, limit=4)] == [3, 1]
+
+def test_migrate_from_json(db_file, tmp_path):
+    json_history = GameHistory(str(tmp_path / 'game_history.json'), journal=True)
+    for minute in range(3):
+        json_history.add_game(make_session('ana', minute, minute=minute))
+
+    history = SQLiteGameHistory(db_file)
+    assert history.migrate_from_json(json_history.history_file) == 3
+    assert history.stats.total_games == 3
+    assert history.migrate_from_json(json_history.history_file) == 0
+
+def test_leaderboard_agrees_between_processes(db_file):
+    worker_a = SQLiteGameHistory(db_file)
+    worker_b = SQLiteGameHistory(db_file)
+    worker_a.add_game(make_session('ana', 2))
+    worker_b.add_game(make_session('beto', 5, minute=1))
+    worker_a.add_game(make_session('beto', 1, minute=2))
+
+    assert worker_a.get_leaderboard() == worker_b.get_leaderboard()
+    assert [player['username'] for player in worker_b.get_leaderboard()] == ['beto', 'ana']
+    assert worker_b.get_player('beto')['games'] == 2
+
+def test_get_player_returns_recent_games(db_file):
+    history = SQLiteGameHistory(db_file)
+    for minute in range(5):
+        history.add_game(make_session('ana', minute, minute=minute))
+    history.add_game(make_session('beto', 1, minute=9))
+
+    player = history.get_player('ana', recent=2)
+    assert [game['number'] for game in player['recent_games']] == [5, 4]
+    assert player['games'] == 5
+    assert history.get_player('nadie') is None
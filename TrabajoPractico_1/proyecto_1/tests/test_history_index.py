@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from modules.history_index import SORT_FIELDS, HistoryIndex, decode_cursor, encode_cursor, game_sort_keys
+from modules.trivia_game import GameHistory
+
+GAMES = [{'username': f'jugador{i % 5}', 'score': f'{i % 6}/5',
+          'start_time': f'{1 + i % 3:02d}/05/24 12:{i % 7:02d}', 'num_phrases': 5} for i in range(37)]
+
+def expected_order(games, sort: str, descending: bool) -> list:
+    """Orden de referencia: (clave del orden, número de llegada)"""
+    position = SORT_FIELDS.index(sort)
+    return sorted(range(len(games)), key=lambda seq: (game_sort_keys(games[seq])[position], seq),
+                  reverse=descending)
+
+def all_pages(index: HistoryIndex, sort: str, descending: bool, limit: int) -> list:
+    seqs, cursor = index.page(sort, descending, None, limit)
+    while cursor:
+        page, cursor = index.page(sort, descending, decode_cursor(cursor, sort), limit)
+        seqs.extend(page)
+    return seqs
+
+@pytest.mark.parametrize('sort', SORT_FIELDS)
+@pytest.mark.parametrize('descending', [True, False])
+def test_pages_follow_the_sort_without_gaps_or_repeats(sort, descending):
+    index = HistoryIndex.from_games(GAMES)
+    assert all_pages(index, sort, descending, 6) == expected_order(GAMES, sort, descending)
+
+def test_adding_games_matches_building_the_index_at_once():
+    index = HistoryIndex()
+    for game in GAMES:
+        index.add(game)
+    built = HistoryIndex.from_games(GAMES)
+    assert all(index.order[field] == built.order[field] for field in SORT_FIELDS)
+
+def test_cursor_is_stable_while_new_games_arrive():
+    index = HistoryIndex.from_games(GAMES)
+    first, cursor = index.page('score', True, None, 10)
+    # Una partida nueva con el mejor puntaje queda antes del cursor: no se repite ni corre la página
+    index.add({'username': 'nuevo', 'score': '5/5', 'start_time': '03/05/24 12:00', 'num_phrases': 5})
+    second, _ = index.page('score', True, decode_cursor(cursor, 'score'), 10)
+
+    assert not set(first) & set(second)
+    assert first + second == expected_order(GAMES, 'score', True)[:20]
+
+def test_invalid_cursors_are_rejected():
+    assert decode_cursor('no es base64!', 'date') is None
+    assert decode_cursor(encode_cursor('ana', 3), 'date') is None
+    assert decode_cursor(encode_cursor(12.5, 3), 'player') is None
+    assert decode_cursor(encode_cursor(12.5, 3), 'score') == (12.5, 3)
+
+def test_json_history_pages_with_game_numbers(tmp_path):
+    history_file = tmp_path / 'game_history.json'
+    history_file.write_text(json.dumps(GAMES), encoding='utf-8')
+    history = GameHistory(str(history_file))
+
+    numbers, cursor = [], None
+    while True:
+        page = history.get_page(sort='player', descending=False, cursor=cursor, limit=8)
+        numbers.extend(game['number'] for game in page['games'])
+        assert all(GAMES[game['number'] - 1]['username'] == game['username'] for game in page['games'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert numbers == [seq + 1 for seq in expected_order(GAMES, 'player', False)]
@@ -0,0 +1,58 @@
+import pickle
+
+import pytest
+
+from modules.history_stats import HistoryStats, parse_score
+
+GAMES = [
+    {'username': 'ana', 'score': '4/5', 'start_time': '01/05/24 09:10', 'num_phrases': 5},
+    {'username': 'beto', 'score': '1/4', 'start_time': '01/05/24 21:45', 'num_phrases': 4},
+    {'username': 'ana', 'score': '2/2', 'start_time': '02/05/24 09:30', 'num_phrases': 2},
+    {'username': 'caro', 'score': 'roto', 'start_time': 'sin fecha', 'num_phrases': 3},
+]
+
+def test_aggregates_match_a_recount():
+    stats = HistoryStats.from_games(GAMES)
+
+    assert (stats.total_games, stats.total_hits, stats.total_misses) == (4, 7, 4)
+    assert stats.total_phrases == 14
+    assert stats.unique_players() == 3
+    assert stats.accuracy() == pytest.approx(7 / 11 * 100)
+    assert stats.average_percent() == pytest.approx((80 + 25 + 100 + 0) / 4)
+    assert stats.player_accuracy('ana') == pytest.approx(6 / 7 * 100)
+    assert stats.best == (100, 'ana') and stats.worst == (0, 'caro')
+    hourly = stats.hourly_average()
+    assert hourly[9] == pytest.approx(90) and hourly[21] == pytest.approx(25) and hourly[12] == 0
+
+def test_malformed_scores_count_as_zero():
+    assert parse_score('3/5') == (3, 5)
+    assert parse_score('tres/5') == (0, 0)
+    assert parse_score(None) == (0, 0)
+
+def test_version_depends_on_content_and_order():
+    stats = HistoryStats.from_games(GAMES)
+    assert HistoryStats.from_games(GAMES).version() == stats.version()
+    assert HistoryStats.from_games(GAMES[::-1]).version() != stats.version()
+    assert HistoryStats.from_games(GAMES[:3]).version() != stats.version()
+
+def test_adding_a_game_matches_building_from_scratch():
+    stats = HistoryStats.from_games(GAMES[:2])
+    for game in GAMES[2:]:
+        stats.add(game)
+    assert stats.to_dict() == HistoryStats.from_games(GAMES).to_dict()
+
+def test_snapshot_does_not_follow_new_games():
+    stats = HistoryStats.from_games(GAMES)
+    snapshot = stats.snapshot()
+    stats.add(GAMES[0])
+
+    assert snapshot.total_games == 4
+    assert snapshot.version() == HistoryStats.from_games(GAMES).version()
+    assert stats.version() != snapshot.version()
+
+def test_pickled_stats_keep_their_version():
+    stats = HistoryStats.from_games(GAMES)
+    copied = pickle.loads(pickle.dumps(stats))
+
+    assert copied.version() == stats.version()
+    assert copied.to_dict() == stats.to_dict()
@@ -0,0 +1,62 @@
+import pytest
+
+from modules.movie_index import MovieIndex, fold_title
+
+TITLES = sorted(['el padrino', 'el padrino ii', 'la guerra de las galaxias', 'amélie', 'parque jurásico',
+                 'padre de familia', 'el laberinto del fauno', 'la naranja mecánica', 'todo sobre mi madre',
+                 'mar adentro'])
+
+def brute_force(titles, query: str) -> list:
+    """Resultado esperado: primero los que empiezan con query (alfabético), después el resto
+
+    Con menos de tres letras (un trigrama) sólo se busca por prefijo.
+    """
+    key = fold_title(query)
+    prefix = sorted((i for i, title in enumerate(titles) if fold_title(title).startswith(key)),
+                    key=lambda i: fold_title(titles[i]))
+    if len(key) < 3:
+        return prefix
+    rest = [i for i, title in enumerate(titles) if key in fold_title(title) and i not in prefix]
+    return prefix + rest
+
+@pytest.fixture
+def index():
+    return MovieIndex(TITLES)
+
+def test_exact_lookup_ignores_case(index):
+    assert index.find('EL PADRINO') == TITLES.index('el padrino')
+    assert index.find('Amélie') == TITLES.index('amélie')
+    assert index.find('el padrin') is None
+
+def test_titles_are_folded_without_accents_or_extra_spaces():
+    assert fold_title('  Amélie   POULAIN ') == 'amelie poulain'
+    assert fold_title('Ñandú') == 'nandu'
+
+def test_prefix_matches_come_first_in_alphabetical_order(index):
+    ids, has_more = index.search('el pad')
+    assert [TITLES[i] for i in ids] == ['el padrino', 'el padrino ii']
+    assert has_more is False
+
+@pytest.mark.parametrize('query', ['padr', 'adr', 'MECANICA', 'de', 'ame', 'la', 'inexistente', 'ii', 'rin'])
+def test_search_matches_a_linear_scan(index, query):
+    ids, has_more = index.search(query, limit=100)
+    assert ids == brute_force(TITLES, query) and has_more is False
+
+def test_pages_cover_all_matches_once():
+    # Coincidencias por prefijo ('mar...') y por subcadena ('... del mar') que cruzan las páginas
+    titles = [f'marea {i}' for i in range(7)] + [f'historia {i} del mar' for i in range(9)] + ['otra']
+    index = MovieIndex(titles)
+    expected = brute_force(titles, 'mar')
+    assert len(expected) == 16
+    ids, offset = [], 0
+    while True:
+        page, has_more = index.search('mar', offset=offset, limit=3)
+        ids.extend(page)
+        offset += 3
+        if not has_more:
+            break
+    assert ids == expected
+
+def test_empty_query_walks_the_catalog(index):
+    assert index.search('', offset=4, limit=3) == ([4, 5, 6], True)
+    assert index.search('', offset=8, limit=3) == ([8, 9], False)
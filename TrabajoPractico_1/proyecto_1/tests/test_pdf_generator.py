@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+from modules import pdf_generator as pdf_generator_module
+from modules.history_stats import HistoryStats
+from modules.pdf_generator import GameReportPDF
+
+GAMES = [{'username': f'jugador{i % 4}', 'score': f'{i % 6}/5', 'start_time': f'0{1 + i % 9}/05/24 12:00',
+          'num_phrases': 5} for i in range(120)]
+
+@pytest.fixture
+def reports(tmp_path):
+    return GameReportPDF(str(tmp_path / 'reports'))
+
+def leftover_files(reports: GameReportPDF) -> list:
+    return sorted(name for name in os.listdir(reports.output_dir) if not name.startswith('reports_manifest.'))
+
+def test_report_is_written_once_per_version(reports):
+    stats = HistoryStats.from_games(GAMES)
+    path = reports.generate_report(GAMES, {}, stats)
+
+    assert leftover_files(reports) == [os.path.basename(path)]
+    assert reports.generate_report(GAMES, {}, stats) == path
+    assert reports.get_latest_report()['path'] == path
+
+def test_failed_report_build_leaves_no_temporary_file(reports, monkeypatch):
+    def broken_build(self, story, *args, **kwargs):
+        with open(self.filename, 'wb') as file:
+            file.write(b'%PDF a medias')
+        raise OSError('disco lleno')
+    monkeypatch.setattr(pdf_generator_module.SimpleDocTemplate, 'build', broken_build)
+
+    with pytest.raises(OSError):
+        reports.generate_report(GAMES, {}, HistoryStats.from_games(GAMES))
+    assert leftover_files(reports) == []
+    assert reports.get_latest_report() is None
+
+def test_failed_full_report_leaves_no_temporary_file(reports):
+    def chunks():
+        yield GAMES[:100]
+        raise OSError('historial ilegible')
+
+    with pytest.raises(OSError):
+        reports.generate_full_report(chunks(), HistoryStats.from_games(GAMES))
+    assert leftover_files(reports) == []
+    assert reports.get_cached_report(HistoryStats.from_games(GAMES).version(), 'completo') is None
+
+def test_full_report_streams_every_chunk(reports):
+    stats = HistoryStats.from_games(GAMES)
+    path = reports.generate_full_report((GAMES[i:i + 50] for i in range(0, len(GAMES), 50)), stats)
+
+    with open(path, 'rb') as file:
+        content = file.read()
+    assert content.startswith(b'%PDF') and content.rstrip().endswith(b'%%EOF')
+    assert leftover_files(reports) == [os.path.basename(path)]
+
+def test_full_report_is_a_valid_pdf_with_every_game(reports):
+    pypdf = pytest.importorskip('pypdf')
+    stats = HistoryStats.from_games(GAMES)
+    path = reports.generate_full_report((GAMES[i:i + 50] for i in range(0, len(GAMES), 50)), stats)
+
+    pages = pypdf.PdfReader(path, strict=True).pages
+    text = '\n'.join(page.extract_text() for page in pages)
+    assert len(pages) == 3
+    assert 'Historial Completo de Partidas' in text and 'Página 3' in text
+    # Cada celda queda en su propia línea: están los números de todas las partidas
+    assert {str(number) for number in range(1, len(GAMES) + 1)} <= set(text.splitlines())
+
+def test_full_report_of_an_empty_history_says_so(reports):
+    pypdf = pytest.importorskip('pypdf')
+    path = reports.generate_full_report(iter([]), HistoryStats.from_games([]))
+
+    pages = pypdf.PdfReader(path, strict=True).pages
+    assert len(pages) == 1
+    assert 'No hay partidas registradas' in pages[0].extract_text()
+
+def test_reports_are_addressed_by_history_version(reports, monkeypatch):
+    builds = []
+    original_build = pdf_generator_module.SimpleDocTemplate.build
+    def counting_build(self, *args, **kwargs):
+        builds.append(self.filename)
+        return original_build(self, *args, **kwargs)
+    monkeypatch.setattr(pdf_generator_module.SimpleDocTemplate, 'build', counting_build)
+
+    stats = HistoryStats.from_games(GAMES)
+    path = reports.generate_report(GAMES, {}, stats)
+    assert reports.generate_report(GAMES, {}, HistoryStats.from_games(GAMES)) == path
+    # Otro proceso (o un reinicio) con el mismo historial reutiliza el archivo
+    assert GameReportPDF(reports.output_dir).generate_report(GAMES, {}, stats) == path
+    assert len(builds) == 1
+
+    other = reports.generate_report(GAMES[:-1], {}, HistoryStats.from_games(GAMES[:-1]))
+    assert other != path and len(builds) == 2
+    assert reports.get_report_path(stats.version(), 'completo') != path
+
+def make_reports(reports: GameReportPDF, count: int) -> list:
+    """Genera count reportes de versiones distintas del historial"""
+    return [reports.generate_report(GAMES[:10 + i], {}, HistoryStats.from_games(GAMES[:10 + i]))
+            for i in range(count)]
+
+def test_latest_report_comes_from_the_index(reports, monkeypatch):
+    paths = make_reports(reports, 3)
+    assert reports.get_latest_report()['path'] == paths[-1]
+    assert reports.get_latest_report('completo') is None
+
+    # Sin recorrer el directorio: el índice sobrevive a un reinicio
+    def no_scandir(*args):
+        raise AssertionError('no se debe recorrer el directorio')
+    monkeypatch.setattr(pdf_generator_module.os, 'scandir', no_scandir)
+    assert GameReportPDF(reports.output_dir).get_latest_report()['path'] == paths[-1]
+
+def test_missing_index_is_rebuilt_from_the_directory(reports):
+    paths = make_reports(reports, 2)
+    os.remove(reports.manifest_file)
+
+    rebuilt = GameReportPDF(reports.output_dir)
+    assert rebuilt.get_latest_report()['filename'] in {os.path.basename(path) for path in paths}
+    assert os.path.exists(reports.manifest_file)
+
+def test_least_recently_used_reports_are_evicted(tmp_path):
+    reports = GameReportPDF(str(tmp_path / 'reports'), max_reports=3)
+    paths = make_reports(reports, 3)
+    # Usar el más viejo lo vuelve el más reciente: se desaloja el segundo
+    assert reports.get_cached_report(HistoryStats.from_games(GAMES[:10]).version()) == paths[0]
+    newest = reports.generate_report(GAMES[:50], {}, HistoryStats.from_games(GAMES[:50]))
+
+    assert sorted(leftover_files(reports)) == sorted(os.path.basename(path) for path in (paths[0], paths[2], newest))
+    assert not os.path.exists(paths[1])
+
+def test_workers_sharing_the_directory_merge_their_manifests(tmp_path):
+    # Dos procesos del servidor: cada uno con su propia instancia sobre el mismo directorio
+    first = GameReportPDF(str(tmp_path / 'reports'), max_reports=2)
+    second = GameReportPDF(first.output_dir, max_reports=2)
+    old = first.generate_report(GAMES[:10], {}, HistoryStats.from_games(GAMES[:10]))
+    newer = second.generate_report(GAMES[:11], {}, HistoryStats.from_games(GAMES[:11]))
+    assert first.get_latest_report()['path'] == newer
+
+    # El uso del reporte viejo en el otro proceso cuenta para el desalojo
+    assert second.get_cached_report(HistoryStats.from_games(GAMES[:10]).version()) == old
+    newest = first.generate_report(GAMES[:12], {}, HistoryStats.from_games(GAMES[:12]))
+
+    assert leftover_files(first) == sorted(os.path.basename(path) for path in (old, newest))
+    manifest = GameReportPDF(first.output_dir)._reports
+    assert list(manifest) == [os.path.basename(old), os.path.basename(newest)]
+
+def test_report_deleted_from_outside_is_forgotten(reports):
+    path = make_reports(reports, 1)[0]
+    os.remove(path)
+    assert reports.get_cached_report(HistoryStats.from_games(GAMES[:10]).version()) is None
+    assert reports.get_latest_report() is None
+
+def test_report_url_only_for_reports_under_static(reports, tmp_path, monkeypatch):
+    path = make_reports(reports, 1)[0]
+    monkeypatch.chdir(tmp_path)
+    assert reports.get_report_url(path) is None
+
+    static_reports = GameReportPDF(os.path.join('static', 'reports'))
+    static_path = make_reports(static_reports, 1)[0]
+    assert static_reports.get_report_url(static_path) == f'/static/reports/{os.path.basename(static_path)}'
@@ -0,0 +1,70 @@
+import random
+import time
+
+import pytest
+
+from modules.phrase_store import PhraseStore, compile_corpus, compiled_path_for
+from modules.trivia_game import PhraseIndex
+
+TOPIC_WORDS = [['nave', 'galaxia', 'planeta'], ['castillo', 'dragón', 'espada'],
+               ['detective', 'crimen', 'pistola'], ['océano', 'tiburón', 'barco'],
+               ['caballo', 'desierto', 'sheriff'], ['robot', 'máquina', 'futuro'],
+               ['fantasma', 'casa', 'sótano'], ['balón', 'estadio', 'equipo']]
+NUM_TOPICS = len(TOPIC_WORDS)
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    """Corpus con películas agrupadas en temas: las del mismo tema comparten palabras"""
+    path = tmp_path / 'frases.txt'
+    with open(path, 'w', encoding='utf-8') as file:
+        for movie in range(24):
+            words = TOPIC_WORDS[movie % NUM_TOPICS]
+            for phrase in range(3):
+                file.write(f"La {words[phrase]} y la {words[(phrase + 1) % 3]} otra vez;Película {movie}\n")
+    return str(path)
+
+def topic(index: PhraseIndex, movie_id: int) -> int:
+    return int(index.movie_names[movie_id].split()[-1]) % NUM_TOPICS
+
+def test_neighbors_are_built_on_first_use(corpus_path):
+    index = PhraseIndex(PhraseStore.from_file(corpus_path))
+    assert index._neighbors is None
+
+    index.draw_options(0, difficulty='facil')
+    assert index._neighbors is None
+    index.draw_options(0, difficulty='dificil')
+    assert index._neighbors is not None
+
+def test_warm_up_builds_the_neighbors_off_the_request_path(corpus_path):
+    index = PhraseIndex(PhraseStore.from_file(corpus_path))
+    index.warm_up()
+    deadline = time.time() + 10
+    while index._neighbors is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert index._neighbors is not None
+
+def test_compiled_corpus_neighbors_match_text(corpus_path):
+    compile_corpus(corpus_path)
+    from_text = PhraseIndex(PhraseStore.from_file(corpus_path)).movie_neighbors()
+    from_compiled = PhraseIndex(PhraseStore.from_compiled(compiled_path_for(corpus_path))).movie_neighbors()
+
+    assert from_text[0] == from_compiled[0]
+    assert list(from_text[1]) == list(from_compiled[1])
+
+def test_neighbors_are_movies_of_the_same_topic(corpus_path):
+    index = PhraseIndex(PhraseStore.from_file(corpus_path))
+    neighbors_k, neighbors = index.movie_neighbors()
+    for movie_id in range(index.num_movies()):
+        similar = [n for n in neighbors[movie_id * neighbors_k:(movie_id + 1) * neighbors_k] if n >= 0]
+        assert similar and all(topic(index, n) == topic(index, movie_id) for n in similar)
+
+@pytest.mark.parametrize('difficulty, same_topic', [('media', 1), ('dificil', 2)])
+def test_difficulty_draws_distractors_among_neighbors(corpus_path, difficulty, same_topic):
+    random.seed(7)
+    index = PhraseIndex(PhraseStore.from_file(corpus_path))
+    for phrase_id in range(index.num_phrases()):
+        options = index.draw_options(phrase_id, difficulty=difficulty)
+        correct = index.phrase_movie_ids[phrase_id]
+        assert len(set(options)) == 3 and correct in options
+        distractors = [option for option in options if option != correct]
+        assert sum(topic(index, option) == topic(index, correct) for option in distractors) >= same_topic
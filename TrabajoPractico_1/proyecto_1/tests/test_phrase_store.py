@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from modules.phrase_store import (PhraseStore, compile_corpus, compiled_path_for, is_compiled_fresh,
+                                  parse_lines)
+
+PAIRS = [("¿Quién anda ahí?", "El Padrino"), ("Hasta la vista, baby", "Terminator 2"),
+         ("Que la fuerza te acompañe", "Star Wars"), ("Ésta es otra frase", "el padrino"),
+         ("Frase con ñandú y 日本語", "Película Única")]
+
+def test_store_behaves_like_the_list_of_dicts():
+    store = PhraseStore.from_pairs(PAIRS)
+    legacy = [{'phrase': phrase, 'movie': movie} for phrase, movie in PAIRS]
+
+    assert len(store) == len(legacy)
+    assert list(store) == legacy
+    assert store[-1] == legacy[-1]
+    assert store[1:4] == legacy[1:4]
+    assert store.phrase(4) == PAIRS[4][0] and store.movie(4) == PAIRS[4][1]
+    with pytest.raises(IndexError):
+        store[len(PAIRS)]
+
+def test_movie_titles_are_stored_once():
+    store = PhraseStore.from_pairs(PAIRS + PAIRS)
+    assert store.movie_titles == [movie for _, movie in PAIRS]
+    assert list(store.title_ids) == list(range(len(PAIRS))) * 2
+
+def test_folded_movies_merge_titles_that_differ_in_case():
+    movie_names, phrase_movie_ids = PhraseStore.from_pairs(PAIRS).folded_movies()
+    assert movie_names == sorted({movie.lower() for _, movie in PAIRS})
+    assert [movie_names[movie_id] for movie_id in phrase_movie_ids] == [movie.lower() for _, movie in PAIRS]
+
+def test_from_file_skips_malformed_lines(tmp_path):
+    path = tmp_path / 'frases.txt'
+    path.write_text("Una frase;Una película\nsin separador\n\nOtra;Otra película\n", encoding='utf-8')
+    with open(path, encoding='utf-8') as file:
+        pairs = list(parse_lines(file))
+
+    store = PhraseStore.from_file(str(path))
+    assert [(item['phrase'], item['movie']) for item in store] == pairs
+    assert len(store) == 2
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'frases.txt'
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(60):
+            phrase, movie = PAIRS[i % len(PAIRS)]
+            file.write(f"{phrase} {i};{movie} {i % 12}\n")
+    return str(path)
+
+def test_compiled_store_equals_the_text_store(corpus_path):
+    compiled_path, count = compile_corpus(corpus_path)
+    from_text = PhraseStore.from_file(corpus_path)
+    compiled = PhraseStore.from_compiled(compiled_path)
+
+    assert count == len(compiled) == len(from_text)
+    assert list(compiled) == list(from_text)
+    assert compiled.movie_titles == from_text.movie_titles
+    assert list(compiled.title_ids) == list(from_text.title_ids)
+    names, ids = compiled.folded_movies()
+    assert (names, list(ids)) == (from_text.folded_movies()[0], list(from_text.folded_movies()[1]))
+    assert compiled.movie_neighbors()[0] == from_text.movie_neighbors()[0]
+    assert list(compiled.movie_neighbors()[1]) == list(from_text.movie_neighbors()[1])
+    assert list(compiled.movie_documents()) == list(from_text.movie_documents())
+
+def test_compiled_store_is_read_only(corpus_path):
+    compiled = PhraseStore.from_compiled(compile_corpus(corpus_path)[0])
+    with pytest.raises(TypeError):
+        compiled.append('frase', 'película')
+
+def test_load_prefers_a_fresh_compiled_corpus(corpus_path):
+    compile_corpus(corpus_path)
+    assert is_compiled_fresh(corpus_path, compiled_path_for(corpus_path))
+    assert PhraseStore.load(corpus_path)._mmap is not None
+
+def test_load_reads_the_text_when_the_compiled_corpus_is_stale(corpus_path):
+    compile_corpus(corpus_path)
+    with open(corpus_path, 'a', encoding='utf-8') as file:
+        file.write("Frase agregada;Película nueva\n")
+
+    assert not is_compiled_fresh(corpus_path, compiled_path_for(corpus_path))
+    store = PhraseStore.load(corpus_path)
+    assert store._mmap is None and store[-1] == {'phrase': 'Frase agregada', 'movie': 'Película nueva'}
+
+def test_corrupt_compiled_corpus_falls_back_to_the_text(corpus_path):
+    compiled_path, _ = compile_corpus(corpus_path)
+    stat = os.stat(compiled_path)
+    # Truncado pero con el encabezado intacto (sigue pareciendo al día)
+    with open(compiled_path, 'r+b') as file:
+        file.truncate(stat.st_size // 2)
+
+    with pytest.raises(ValueError):
+        PhraseStore.from_compiled(compiled_path)
+    assert list(PhraseStore.load(corpus_path)) == list(PhraseStore.from_file(corpus_path))
@@ -0,0 +1,58 @@
+import random
+from datetime import datetime
+
+from modules.player_index import PlayerIndex
+
+def make_games(count: int, seed: int = 7):
+    """Partidas aleatorias con el formato del historial"""
+    rng = random.Random(seed)
+    games = []
+    for number in range(count):
+        total = rng.randint(3, 10)
+        games.append({'username': f'jugador{rng.randrange(12)}', 'score': f'{rng.randint(0, total)}/{total}',
+                      'start_time': datetime(2024, 1, 1 + number % 28, number % 24).strftime('%d/%m/%y %H:%M'),
+                      'num_phrases': total})
+    return games
+
+def test_incremental_ranking_matches_a_rebuild():
+    games = make_games(300)
+    index = PlayerIndex()
+    for number, game in enumerate(games, 1):
+        index.add(number, game)
+
+    assert index.leaderboard(k=100) == PlayerIndex.from_games(games).leaderboard(k=100)
+
+def test_stale_ranking_keys_are_compacted():
+    index = PlayerIndex()
+    for number, game in enumerate(make_games(500), 1):
+        index.add(number, game)
+        # Las claves viejas nunca superan a las vigentes
+        assert len(index._ranking) <= 2 * len(index.profiles)
+    assert index.leaderboard(k=1, min_games=1000) == []
+
+def test_leaderboard_order_and_min_games():
+    games = [
+        {'username': 'ana', 'score': '5/5', 'start_time': '01/05/24 12:00', 'num_phrases': 5},
+        {'username': 'beto', 'score': '4/5', 'start_time': '01/05/24 12:01', 'num_phrases': 5},
+        {'username': 'beto', 'score': '5/5', 'start_time': '01/05/24 12:02', 'num_phrases': 5},
+        {'username': 'carla', 'score': '9/10', 'start_time': '01/05/24 12:03', 'num_phrases': 10},
+    ]
+    index = PlayerIndex.from_games(games)
+
+    assert [player['username'] for player in index.leaderboard()] == ['ana', 'beto', 'carla']
+    assert [player['rank'] for player in index.leaderboard()] == [1, 2, 3]
+    assert [player['username'] for player in index.leaderboard(min_games=2)] == ['beto']
+    assert len(index.leaderboard(k=1)) == 1
+
+def test_profile_streaks_and_best_game():
+    scores = ['4/5', '5/5', '1/5', '3/5', '3/5', '3/5']
+    games = [{'username': 'ana', 'score': score, 'start_time': f'01/05/24 12:0{i}', 'num_phrases': 5}
+             for i, score in enumerate(scores)]
+    profile = PlayerIndex.from_games(games).get('ana')
+
+    assert profile.games() == 6
+    assert profile.best == 100.0 and profile.best_number == 2
+    assert profile.best_streak == 3
+    assert profile.current_streak == 3
+    assert profile.to_dict()['last_played'] == '01/05/24 12:05'
+    assert list(profile.numbers) == [1, 2, 3, 4, 5, 6]
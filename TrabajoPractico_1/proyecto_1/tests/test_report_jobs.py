@@ -0,0 +1,108 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from modules.pdf_generator import GameReportPDF
+from modules.report_jobs import ReportJobQueue
+from modules.trivia_game import GameHistory, GameSession
+
+class FakeChartService:
+    """Servicio de gráficas que responde lo configurado sin renderizar nada"""
+    def __init__(self):
+        self.charts = {'line_chart': None, 'pie_chart': None}
+        self.failed = False
+        self.last_error = None
+        self.calls = 0
+
+    def render_and_wait(self, version, games, stats=None, timeout=None, profile='web'):
+        self.calls += 1
+        return dict(self.charts)
+
+    def status(self, version, profile='web'):
+        return 'error' if self.failed else 'rendering'
+
+@pytest.fixture
+def history(tmp_path):
+    history = GameHistory(str(tmp_path / 'game_history.json'))
+    for minute in range(3):
+        session = GameSession(f'jugador{minute}', 5)
+        session.score = minute
+        session.start_time = datetime(2024, 5, 1, 12, minute)
+        history.add_game(session)
+    return history
+
+@pytest.fixture
+def charts():
+    return FakeChartService()
+
+@pytest.fixture
+def pdf_generator(tmp_path):
+    return GameReportPDF(str(tmp_path / 'reports'))
+
+def wait_job(job, timeout: float = 30):
+    deadline = time.time() + timeout
+    while not job.is_finished() and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.is_finished()
+    return job
+
+def test_trivia_report_is_generated_and_cached(history, charts, pdf_generator):
+    queue = ReportJobQueue(charts, pdf_generator)
+    job = wait_job(queue.submit(history))
+
+    assert job.status == 'done' and os.path.exists(job.path)
+    assert pdf_generator.get_cached_report(history.stats.version()) == job.path
+    assert queue.submit(history) is job
+    # Otra cola (otro proceso) reutiliza el PDF sin volver a pedir gráficas
+    assert ReportJobQueue(charts, pdf_generator).submit(history).path == job.path
+    assert charts.calls == 1
+
+def test_chart_timeout_fails_the_job_without_caching_a_pdf(history, charts, pdf_generator):
+    charts.charts = {}
+    job = wait_job(ReportJobQueue(charts, pdf_generator).submit(history))
+
+    assert job.status == 'error'
+    assert 'tiempo de espera' in job.error
+    assert job.path is None
+    assert pdf_generator.get_cached_report(history.stats.version()) is None
+    assert pdf_generator.get_latest_report() is None
+    assert [name for name in os.listdir(pdf_generator.output_dir) if name.endswith('.pdf')] == []
+
+def test_incomplete_charts_report_the_render_error(history, charts, pdf_generator):
+    charts.charts = {'line_chart': None}
+    charts.failed, charts.last_error = True, 'proceso terminado'
+    job = wait_job(ReportJobQueue(charts, pdf_generator).submit(history))
+
+    assert job.status == 'error'
+    assert 'pie_chart' in job.error and 'proceso terminado' in job.error
+    assert pdf_generator.get_cached_report(history.stats.version()) is None
+
+def test_pdf_error_fails_the_job(history, charts, pdf_generator, monkeypatch):
+    def broken_report(*args, **kwargs):
+        raise OSError('disco lleno')
+    monkeypatch.setattr(pdf_generator, 'generate_report', broken_report)
+    job = wait_job(ReportJobQueue(charts, pdf_generator).submit(history))
+
+    assert job.status == 'error' and job.error == 'disco lleno'
+
+def test_failed_job_is_retried_on_the_next_submit(history, charts, pdf_generator):
+    queue = ReportJobQueue(charts, pdf_generator)
+    charts.charts = {}
+    failed = wait_job(queue.submit(history))
+    assert failed.status == 'error'
+
+    charts.charts = {'line_chart': None, 'pie_chart': None}
+    retried = wait_job(queue.submit(history))
+    assert retried is not failed
+    assert retried.status == 'done'
+    assert queue.get_job(failed.id).status == 'error'
+
+def test_full_report_does_not_need_charts(history, charts, pdf_generator):
+    charts.charts = {}
+    job = wait_job(ReportJobQueue(charts, pdf_generator).submit(history, kind='completo'))
+
+    assert job.status == 'done' and os.path.exists(job.path)
+    assert charts.calls == 0
+    assert pdf_generator.get_cached_report(history.stats.version(), 'completo') == job.path
@@ -0,0 +1,175 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
+from datetime import datetime
+
+import pytest
+
+from modules import chart_service as chart_service_module
+from modules.chart_cache import ChartCache
+from modules.chart_service import ChartRenderService
+from modules.pdf_generator import GameReportPDF
+from modules.trivia_game import GameHistory, GameSession, TriviaGame
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class IdleExecutor:
+    """Pool cuyas tareas nunca terminan: el render queda siempre en curso"""
+    def __init__(self, *args, **kwargs):
+        self.tasks = []
+
+    def submit(self, func, *args):
+        self.tasks.append(func)
+        return Future()
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Módulo del servidor con historial y gráficas en tmp_path y un pool que no renderiza"""
+    monkeypatch.setenv('TRIVIA_CORPUS_RELOAD_INTERVAL', '0')
+    monkeypatch.setenv('TRIVIA_CHARTS_WARM_UP', '0')
+    # Los reportes nunca se escriben en static/ del proyecto (ni siquiera el índice al importar)
+    monkeypatch.setenv('TRIVIA_REPORTS_DIR', str(tmp_path / 'reports'))
+    monkeypatch.chdir(PROJECT_ROOT)
+    import server
+
+    monkeypatch.setattr(chart_service_module, 'ProcessPoolExecutor', IdleExecutor)
+    history = GameHistory(str(tmp_path / 'game_history.json'))
+    cache = ChartCache(str(tmp_path / 'charts'))
+    monkeypatch.setattr(server, 'game_history', history)
+    monkeypatch.setattr(server, 'chart_cache', cache)
+    monkeypatch.setattr(server, 'chart_service', ChartRenderService(cache))
+    monkeypatch.setattr(server, 'pdf_generator', GameReportPDF(str(tmp_path / 'reports')))
+    return server
+
+def add_game(history: GameHistory, username: str, score: int):
+    session = GameSession(username, 5)
+    session.score = score
+    session.start_time = datetime(2024, 5, 1, 12, len(history.get_all_games()))
+    history.add_game(session)
+
+def store_fake_charts(cache: ChartCache, version: str, profile: str) -> dict:
+    paths = {}
+    for name in chart_service_module.CHART_RENDERERS:
+        paths[name] = os.path.join(cache.charts_dir, f'{name}_{profile}.png')
+        with open(paths[name], 'wb') as file:
+            file.write(b'imagen ' + version.encode())
+    cache.store(version, paths, profile)
+    return paths
+
+def test_chart_never_rendered_returns_202_without_waiting(server):
+    add_game(server.game_history, 'ana', 3)
+    client = server.app.test_client()
+
+    response = client.get('/graficas/line_chart?perfil=print')
+    assert response.status_code == 202
+    assert response.headers['Retry-After']
+    assert response.json['status'] == 'rendering'
+    assert response.json['status_url'] == '/estado_graficas?perfil=print'
+    assert server.chart_service._running == (server.game_history.stats.version(), 'print')
+
+    status = client.get(response.json['status_url'])
+    assert status.json['status'] == 'rendering'
+
+def test_stale_chart_serves_last_good_image_while_rendering(server):
+    add_game(server.game_history, 'ana', 3)
+    store_fake_charts(server.chart_cache, 'version-anterior', 'print')
+    client = server.app.test_client()
+
+    response = client.get('/graficas/pie_chart?perfil=print')
+    assert response.status_code == 200
+    assert response.data == b'imagen version-anterior'
+    assert server.chart_service._running == (server.game_history.stats.version(), 'print')
+
+def test_fresh_chart_is_served_without_rendering(server):
+    add_game(server.game_history, 'ana', 3)
+    version = server.game_history.stats.version()
+    store_fake_charts(server.chart_cache, version, 'web')
+    client = server.app.test_client()
+
+    response = client.get('/graficas/line_chart')
+    assert response.status_code == 200
+    assert server.chart_service._running is None
+    assert client.get('/estado_graficas').json['status'] == 'ready'
+
+def test_unknown_chart_profile_or_empty_history_is_404(server):
+    client = server.app.test_client()
+    assert client.get('/graficas/otra').status_code == 404
+    assert client.get('/graficas/line_chart?perfil=gif').status_code == 404
+    assert client.get('/estado_graficas?perfil=gif').status_code == 404
+    # Sin partidas no hay nada que renderizar
+    assert client.get('/graficas/line_chart').status_code == 404
+
+def test_session_with_an_old_schema_goes_back_to_the_start(server):
+    client = server.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['game_session'] = {'v': 1, 'username': 'ana', 'num_phrases': 3, 'cursor': 0,
+                                         'score': 0, 'start_time': 0, 'phrase_ids': [0, 1, 2],
+                                         'option_ids': [0, 1, 2] * 3}
+
+    response = client.get('/jugar_pregunta')
+    assert response.status_code == 302 and response.location.endswith('/')
+    assert client.post('/responder', data={'selected_movie': 'x'}).status_code == 302
+
+def test_web_process_does_not_import_the_plotting_stack(tmp_path):
+    """El servidor arranca sin matplotlib ni seaborn: sólo los cargan los procesos de render"""
+    code = ("import sys, server; "
+            "print(sorted(m for m in ('matplotlib', 'seaborn') if m in sys.modules))")
+    env = dict(os.environ, TRIVIA_CHARTS_WARM_UP='0', TRIVIA_CORPUS_RELOAD_INTERVAL='0',
+               TRIVIA_REPORTS_DIR=str(tmp_path / 'reports'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+def test_web_process_imports_numpy_only_for_similar_distractors(tmp_path):
+    """Sin precálculo, con el corpus de texto los vecinos (numpy) se calculan con la primera pregunta difícil"""
+    corpus = tmp_path / 'frases.txt'
+    with open(corpus, 'w', encoding='utf-8') as file:
+        for i in range(40):
+            file.write(f"Frase {i} con palabras del tema {i % 5};Película {i % 10}\n")
+    code = ("import sys, server; from modules.trivia_game import TriviaGame; "
+            f"game = TriviaGame({str(corpus)!r}, similar_distractors=False); loaded = ['numpy' in sys.modules]; "
+            "game.generate_game(5, 'facil'); loaded.append('numpy' in sys.modules); "
+            "game.generate_game(5, 'dificil'); loaded.append('numpy' in sys.modules); print(loaded)")
+    env = dict(os.environ, TRIVIA_CHARTS_WARM_UP='0', TRIVIA_CORPUS_RELOAD_INTERVAL='0',
+               TRIVIA_SIMILAR_DISTRACTORS='0', TRIVIA_REPORTS_DIR=str(tmp_path / 'reports'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[False, False, True]'
+
+def test_history_api_pages_and_rejects_foreign_cursors(server):
+    for score in range(7):
+        add_game(server.game_history, f'jugador{score % 3}', score % 6)
+    client = server.app.test_client()
+
+    first = client.get('/api/history?sort=score&limit=4').json
+    assert len(first['games']) == 4 and first['total_games'] == 7
+    second = client.get(f"/api/history?sort=score&limit=4&cursor={first['next_cursor']}").json
+    assert len(second['games']) == 3 and second['next_cursor'] is None
+    assert {game['number'] for game in first['games'] + second['games']} == set(range(1, 8))
+
+    response = client.get(f"/api/history?sort=player&cursor={first['next_cursor']}")
+    assert response.status_code == 400
+
+def test_movie_search_pages_and_clamps_the_limit(server, tmp_path, monkeypatch):
+    corpus_path = tmp_path / 'frases.txt'
+    corpus_path.write_text(''.join(f"Frase {i};Película {i:02d}\n" for i in range(12)) + "Otra;El Padrino\n",
+                           encoding='utf-8')
+    monkeypatch.setattr(server, 'trivia_game', TriviaGame(str(corpus_path)))
+    client = server.app.test_client()
+
+    first = client.get('/api/movies?q=PELICULA&limit=5').json
+    assert first['query'] == 'PELICULA' and first['limit'] == 5 and first['total_movies'] == 13
+    assert [movie['title'] for movie in first['movies']] == [f'película {i:02d}' for i in range(5)]
+    assert first['page'] == 1 and first['has_more'] is True
+    last = client.get('/api/movies?q=pelicula&limit=5&page=3').json
+    assert len(last['movies']) == 2 and last['has_more'] is False
+
+    assert client.get('/api/movies?q=padrino').json['movies'] == [{'position': 1, 'title': 'el padrino'}]
+    clamped = client.get('/api/movies?limit=0&page=-2').json
+    assert (clamped['limit'], clamped['page']) == (1, 1)
+
+    response = client.get('/listar_peliculas?q=padrino')
+    assert response.status_code == 200 and 'el padrino' in response.get_data(as_text=True)
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from flask import Flask, session
+
+from modules.session_backends import CacheSessionInterface, MemorySessionCache, SQLiteSessionCache
+
+def make_app(cache, use_signer: bool = True) -> Flask:
+    """Aplicación mínima que cuenta visitas en la sesión"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'clave de prueba'
+    app.session_interface = CacheSessionInterface(cache, use_signer=use_signer)
+
+    @app.route('/visitar')
+    def visitar():
+        session['visitas'] = session.get('visitas', 0) + 1
+        return str(session['visitas'])
+
+    @app.route('/salir')
+    def salir():
+        session.clear()
+        return ''
+
+    return app
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemorySessionCache(threshold=2)
+    cache.set('a', {'n': 1})
+    cache.set('b', {'n': 2})
+    cache.get('a')
+    cache.set('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('c') == {'n': 3}
+
+def test_memory_cache_expires_entries():
+    cache = MemorySessionCache()
+    cache.set('a', {'n': 1}, timeout=1)
+    cache._data['a'] = (time.time() - 1, cache._data['a'][1])
+
+    assert cache.get('a') is None
+
+def test_memory_cache_returns_independent_copies():
+    cache = MemorySessionCache()
+    value = {'phrase_ids': [1, 2, 3], 'option_ids': [[4, 5], [6, 7]]}
+    cache.set('a', value)
+    value['phrase_ids'].append(99)
+
+    first = cache.get('a')
+    first['option_ids'][0].append(99)
+    # Ni el valor original ni una copia entregada cambian lo guardado
+    assert cache.get('a') == {'phrase_ids': [1, 2, 3], 'option_ids': [[4, 5], [6, 7]]}
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite3')
+    SQLiteSessionCache(path).set('a', {'cursor': 3})
+
+    other = SQLiteSessionCache(path)
+    assert other.get('a') == {'cursor': 3}
+    assert other.delete('a')
+    assert other.get('a') is None
+
+@pytest.mark.parametrize('use_signer', [False, True])
+def test_interface_keeps_data_on_the_server(use_signer):
+    cache = MemorySessionCache()
+    client = make_app(cache, use_signer).test_client()
+
+    assert client.get('/visitar').get_data(as_text=True) == '1'
+    assert client.get('/visitar').get_data(as_text=True) == '2'
+    cookie = client.get_cookie('session')
+    assert 'visitas' not in cookie.value
+    assert len(cache._data) == 1
+
+def test_interface_rejects_tampered_signed_cookie():
+    client = make_app(MemorySessionCache(), use_signer=True).test_client()
+    client.get('/visitar')
+    client.set_cookie('session', client.get_cookie('session').value + 'x')
+
+    assert client.get('/visitar').get_data(as_text=True) == '1'
+
+@pytest.mark.parametrize('use_signer', [False, True])
+def test_interface_does_not_adopt_unknown_session_ids(use_signer):
+    cache = MemorySessionCache()
+    app = make_app(cache, use_signer)
+    client = app.test_client()
+    planted = 'id-elegido-por-el-atacante'
+    if use_signer:
+        planted_cookie = app.session_interface._get_signer(app).sign(planted.encode()).decode()
+    else:
+        planted_cookie = planted
+    client.set_cookie('session', planted_cookie)
+
+    assert client.get('/visitar').get_data(as_text=True) == '1'
+    assert 'session:' + planted not in cache._data
+    assert client.get_cookie('session').value != planted_cookie
+
+def test_interface_deletes_cleared_session():
+    cache = MemorySessionCache()
+    client = make_app(cache).test_client()
+    client.get('/visitar')
+    client.get('/salir')
+
+    assert len(cache._data) == 0
+    assert client.get_cookie('session') is None
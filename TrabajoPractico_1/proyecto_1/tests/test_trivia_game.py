@@ -0,0 +1,94 @@
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from modules.trivia_game import NUM_OPTIONS, SESSION_SCHEMA_VERSION, GameSession, TriviaGame
+
+PHRASES = [(f"Frase número {i}", f"Película {i % 7}") for i in range(30)]
+
+def write_corpus(path, phrases=PHRASES):
+    with open(path, 'w', encoding='utf-8') as file:
+        for phrase, movie in phrases:
+            file.write(f"{phrase};{movie}\n")
+    return str(path)
+
+@pytest.fixture
+def game(tmp_path):
+    random.seed(3)
+    return TriviaGame(write_corpus(tmp_path / 'frases.txt'))
+
+def test_index_maps_each_phrase_to_its_folded_movie(game):
+    index = game.index
+    assert index.movie_names == sorted({movie.lower() for _, movie in PHRASES})
+    assert [index.movie_names[movie_id] for movie_id in index.phrase_movie_ids] == \
+        [movie.lower() for _, movie in PHRASES]
+
+def test_question_has_distinct_options_including_the_answer(game):
+    for _ in range(200):
+        question = game.generate_question()
+        assert len(question['options']) == len(set(question['options'])) == NUM_OPTIONS
+        assert question['options'][question['correct_index']] == question['correct_movie'].lower()
+        assert (question['phrase'], question['correct_movie']) in PHRASES
+        assert game.check_answer(question, question['correct_movie'].upper())
+
+def test_every_movie_can_be_a_distractor(game):
+    seen = set()
+    for _ in range(500):
+        question = game.generate_question()
+        seen.update(question['options'])
+    assert seen == set(game.movies_list)
+
+def test_small_corpus_does_not_generate_questions(tmp_path):
+    game = TriviaGame(write_corpus(tmp_path / 'frases.txt', PHRASES[:3]))
+    assert game.generate_question() is None
+
+def test_movie_lookup_ignores_case(game):
+    assert game.get_movie_by_name('PELÍCULA 3') == 'película 3'
+    assert game.get_movie_by_name('Película 70') is None
+
+def test_game_is_drawn_up_front_without_repeated_phrases(game):
+    phrase_ids, option_ids, generation = game.generate_game(10)
+
+    assert len(phrase_ids) == len(set(phrase_ids)) == 10
+    assert len(option_ids) == 10 * NUM_OPTIONS
+    assert generation == game.generation
+    for number, phrase_id in enumerate(phrase_ids):
+        options = option_ids[number * NUM_OPTIONS:(number + 1) * NUM_OPTIONS]
+        question = game.build_question(phrase_id, options, generation)
+        assert question['phrase'] == PHRASES[phrase_id][0]
+        assert question['options'][question['correct_index']] == PHRASES[phrase_id][1].lower()
+
+def test_game_longer_than_the_corpus_covers_it_before_repeating(game):
+    phrase_ids, _, _ = game.generate_game(len(PHRASES) + 5)
+    assert sorted(phrase_ids[:len(PHRASES)]) == list(range(len(PHRASES)))
+    assert len(phrase_ids) == len(PHRASES) + 5
+
+def test_session_round_trips_through_a_json_payload(game):
+    game_session = GameSession('ana', 4)
+    game_session.start_time = datetime(2024, 5, 1, 12, 30)
+    game_session.set_questions(*game.generate_game(4))
+    game_session.add_answer(True)
+    game_session.add_answer(False)
+
+    payload = json.loads(json.dumps(game_session.to_session_dict()))
+    assert payload['v'] == SESSION_SCHEMA_VERSION
+    # Sólo ids enteros: nada del texto de las preguntas viaja en la sesión
+    assert all(isinstance(value, int) for value in payload['phrase_ids'] + payload['option_ids'])
+
+    restored = GameSession.from_session_dict(payload)
+    assert (restored.username, restored.num_phrases, restored.current_question, restored.score) == ('ana', 4, 2, 1)
+    assert restored.start_time == game_session.start_time
+    assert restored.get_current_ids() == game_session.get_current_ids()
+    assert game.build_question(*restored.get_current_ids()) == game.build_question(*game_session.get_current_ids())
+
+def test_session_with_another_schema_version_is_rejected(game):
+    payload = GameSession('ana', 4).to_session_dict()
+    # Versión 1: sin la generación del corpus
+    legacy = dict(payload, v=1)
+    del legacy['generation']
+
+    assert GameSession.from_session_dict(legacy) is None
+    assert GameSession.from_session_dict({}) is None
+    assert GameSession.from_session_dict(None) is None